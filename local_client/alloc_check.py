@@ -0,0 +1,151 @@
+"""Allocation check of the client's frame loops without a camera or MediaPipe.
+
+client.py --alloc-check measures the real thing but needs a webcam and a
+working MediaPipe. This runs the same HandsFreeClient loops on a synthetic
+camera and a stub hand graph, so the numbers reproduce on any machine:
+
+    python alloc_check.py                  # serial loop
+    python alloc_check.py --pipelined      # capture / inference / actuation threads
+    python alloc_check.py --mode cursor --frames 600
+
+The camera draws two moving hands into the caller's buffer (as
+cv2.VideoCapture.read(image) does) and the stub graph returns the same
+result object every frame with its landmarks moved, so neither adds
+allocations of its own; input goes to a backend that only counts events.
+Exits non-zero when heap growth exceeds the budget.
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from client import HandsFreeClient
+from governor import CaptureGovernor
+from input_backends import InputBackend
+from pipeline import STATS_WINDOW
+from profiler import AllocationCheck
+
+# Hand at rest in hand-size units, wrist at the origin: (x, y) of the 21
+# landmarks with fingers extended; `curl` pulls the finger joints in
+_PALM = [(0.0, 0.0), (-0.35, -0.2), (-0.55, -0.45), (-0.7, -0.7), (-0.8, -0.9)]
+_FINGER_X = (-0.3, -0.1, 0.1, 0.3)
+
+
+def _hand_shape(curl):
+    points = list(_PALM)
+    for x in _FINGER_X:
+        for joint in range(4):
+            points.append((x, -1.0 - 0.35 * joint * (1.0 - curl)))
+    return points
+
+
+class SyntheticCamera:
+    """cv2.VideoCapture stand-in: two hands swaying in front of a plain background, paced at `fps`."""
+
+    def __init__(self, width=1280, height=720, fps=60.0):
+        self.props = {cv2.CAP_PROP_FRAME_WIDTH: width, cv2.CAP_PROP_FRAME_HEIGHT: height,
+                      cv2.CAP_PROP_FPS: fps, cv2.CAP_PROP_BUFFERSIZE: 1}
+        self.count = 0
+        self._due = None
+
+    def set(self, prop, value):
+        return False  # fixed mode, like a driver that ignores the request
+
+    def get(self, prop):
+        return self.props.get(prop, -1)
+
+    def read(self, image=None):
+        w, h = int(self.props[cv2.CAP_PROP_FRAME_WIDTH]), int(self.props[cv2.CAP_PROP_FRAME_HEIGHT])
+        if image is None or image.shape != (h, w, 3):
+            image = np.empty((h, w, 3), dtype=np.uint8)
+        image.fill(60)
+        t = self.count / self.props[cv2.CAP_PROP_FPS]
+        for side in (-1, 1):
+            cx = int(w * (0.5 + 0.2 * side + 0.05 * math.sin(t)))
+            cy = int(h * (0.55 + 0.05 * math.cos(1.3 * t)))
+            cv2.rectangle(image, (cx - 40, cy - 60), (cx + 40, cy + 60), (170, 190, 230), -1)
+        self.count += 1
+
+        now = time.perf_counter()
+        self._due = now if self._due is None else self._due + 1.0 / self.props[cv2.CAP_PROP_FPS]
+        if self._due > now:
+            time.sleep(self._due - now)
+        else:
+            self._due = now  # fell behind; a camera drops frames rather than queueing them
+        return True, image
+
+    def release(self):
+        pass
+
+    def __str__(self):
+        return "synthetic"
+
+
+class StubHands:
+    """mediapipe Hands stand-in: one result object, landmarks moved on every process()."""
+
+    def __init__(self, max_num_hands=2, min_detection_confidence=0.7, min_tracking_confidence=0.7):
+        self.calls = 0
+        hands, handedness = [], []
+        for label in ("Left", "Right")[:max_num_hands]:
+            hands.append(SimpleNamespace(landmark=[SimpleNamespace(x=0.0, y=0.0, z=0.0) for _ in range(21)]))
+            handedness.append(SimpleNamespace(classification=[SimpleNamespace(label=label, score=0.95)]))
+        self.result = SimpleNamespace(multi_hand_landmarks=hands, multi_handedness=handedness)
+
+    def process(self, rgb):
+        t = self.calls / 30.0
+        self.calls += 1
+        for i, hand in enumerate(self.result.multi_hand_landmarks):
+            side = 1 if i else -1
+            cx, cy = 0.5 + 0.2 * side + 0.05 * math.sin(t), 0.6 + 0.05 * math.cos(1.3 * t)
+            curl = 0.5 + 0.5 * math.sin(0.8 * t + i)  # open and close now and then
+            for lm, (x, y) in zip(hand.landmark, _hand_shape(curl)):
+                lm.x, lm.y = cx + 0.08 * x, cy + 0.08 * y
+        return self.result
+
+
+class CountingBackend(InputBackend):
+    """Input sink that counts events and keeps none (StubBackend's log would be measured as growth)."""
+    name = "counting"
+
+    def __init__(self):
+        self.events = 0
+
+    def apply(self, batch):
+        self.events += len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Client allocation check on a synthetic camera and stub hand graph")
+    parser.add_argument("--pipelined", action="store_true", help="check the threaded pipeline instead")
+    parser.add_argument("--mode", default="fps", help="profiles.json mode to drive")
+    parser.add_argument("--frames", type=int, default=300, help="frames measured")
+    parser.add_argument("--warmup", type=int, default=STATS_WINDOW,
+                        help=f"frames before measuring (at least {STATS_WINDOW}, so the latency windows are full)")
+    parser.add_argument("--budget-kib", type=float, default=64.0, help="allowed heap growth")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=float, default=60.0)
+    args = parser.parse_args()
+    if args.warmup < STATS_WINDOW:
+        parser.error(f"--warmup must be at least {STATS_WINDOW}: the latency windows filling up "
+                     "would show as growth")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        client = HandsFreeClient(
+            pipelined=args.pipelined, backend=CountingBackend(), headless=True, quit_hotkey="", mode=args.mode,
+            governor=CaptureGovernor(width=args.width, height=args.height, fps=args.fps),
+            source=SyntheticCamera(args.width, args.height, args.fps), hands_factory=StubHands,
+            calibration_path=os.path.join(tmp, "calibration.json"),
+            alloc_check=AllocationCheck(args.frames, args.warmup, budget_bytes=int(args.budget_kib * 1024)))
+        return client.run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""Multi-camera arcade sessions: one player per camera, shared inference processes.
+
+Each player has its own camera source (device index, video file or stream
+URL), binding mode and InputController. Frames are downscaled on the
+player's capture thread straight into a shared-memory FrameRing and
+inferred in a pool of worker processes sized to the machine's cores, so
+MediaPipe runs in parallel instead of contending for one interpreter, and
+only (ring, sequence number) crosses the process boundary. Players are
+pinned to a worker because MediaPipe tracks hands from frame to frame; a
+worker keeps one hand graph per player.
+
+    python arcade.py --player 0=fps --player 1=fps_p2
+    python arcade.py --player p1.mp4=fps --player p2.mp4=fps_p2 --workers 2
+
+Give each player a mode with its own keys (e.g. fps / fps_p2) so the players'
+inputs don't fight over the same key.
+"""
+import argparse
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+
+import cv2
+
+from bindings import load_profiles
+from filters import LandmarkSmoother
+from frame_ring import FrameRing
+from gesture_engine import compute_features
+from gesture_mapper import GestureMapper
+from hand_tracker import HandTracker
+from input_controller import InputController
+from pipeline import LatestSlot, StageStats
+
+
+def _inference_worker(worker_id, tasks, results, max_num_hands):
+    """Worker process: run hand inference for the players pinned to it."""
+    from gesture_engine import GestureEngine
+    engines = {}
+    rings = {}
+    while True:
+        task = tasks.get()
+        if task is None:
+            break
+        player, spec, seq, t_capture = task
+        engine = engines.get(player)
+        if engine is None:
+            # Frames arrive unmirrored; the engine mirrors landmarks instead
+            engine = engines[player] = GestureEngine(max_num_hands=max_num_hands, flip_frame=False)
+            rings[player] = FrameRing(spec["shape"], spec["slots"], name=spec["name"], create=False)
+        ring = rings[player]
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        item = ring.read(seq)
+        points, labels = None, None
+        if item is not None:
+            result, _ = engine.process_frame(item[2])  # a view onto shared memory, no copy
+            if ring.valid(seq):
+                points, labels = engine.landmark_batch(result)
+                points = points.copy()  # the queue pickles on a feeder thread, after the next frame
+        # points=None: the capture side lapped the ring mid-inference, result is discarded
+        results.put((player, t_capture, points, labels, worker_id,
+                     time.perf_counter() - wall0, time.process_time() - cpu0))
+    for ring in rings.values():
+        ring.close()
+
+
+def parse_source(text):
+    return int(text) if text.isdigit() else text
+
+
+class Player:
+    """One camera, its binding mode and its own input controller."""
+
+    def __init__(self, index, source, mode, modes, backend="auto", hysteresis=0.25, work_width=640,
+                 ring_slots=8):
+        self.index = index
+        self.source = source
+        self.mode = mode
+        self.work_width = work_width
+        self.cap = cv2.VideoCapture(source)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"player {index}: could not open source {source!r}")
+        # Video files stand in for live cameras, so play them at their native rate
+        self.pace = 0.0
+        if isinstance(source, str) and "://" not in source:
+            self.pace = 1.0 / (self.cap.get(cv2.CAP_PROP_FPS) or 30.0)
+
+        self.controller = InputController(backend=backend, hysteresis=hysteresis)
+        self.controller.current_profile = mode
+        self.mapper = GestureMapper(self.controller, modes, mode, hysteresis)
+        self.controller.prepare(self.mapper.devices())
+        self.tracker = HandTracker()
+        self.smoother = LandmarkSmoother()
+        self.stats = StageStats()
+
+        self.ring = None  # created at the first frame, once the size is known
+        self.ring_slots = ring_slots
+        self.frames = LatestSlot()  # newest (ring spec, seq, t_capture) to infer
+        self.in_flight = False
+        self.processed = 0
+        self.stale = 0
+        self.ended = threading.Event()
+        self._thread = threading.Thread(target=self._capture_loop, name=f"capture-{index}", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def _capture_loop(self):
+        next_frame = time.perf_counter()
+        while not self.ended.is_set():
+            t0 = time.perf_counter()
+            success, frame = self.cap.read()
+            if not success:
+                break
+            t_capture = time.perf_counter()
+            self.stats.add("capture", t_capture - t0)
+            h, w = frame.shape[:2]
+            if self.ring is None:
+                size = (self.work_width, int(round(h * self.work_width / w))) if w > self.work_width else (w, h)
+                self.ring = FrameRing((size[1], size[0], 3), slots=self.ring_slots)
+                self.ring_spec = self.ring.spec()
+            seq, slot = self.ring.claim()
+            if slot.shape[:2] != (h, w):
+                cv2.resize(frame, (slot.shape[1], slot.shape[0]), dst=slot, interpolation=cv2.INTER_AREA)
+            else:
+                slot[:] = frame
+            self.ring.publish(seq, t_capture)
+            self.frames.put((self.ring_spec, seq, t_capture))
+            if self.pace:
+                next_frame += self.pace
+                delay = next_frame - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+        self.ended.set()
+
+    def apply(self, t_capture, points, labels):
+        """Track, smooth, map and inject one inferred frame."""
+        if points is None:
+            self.stale += 1
+            return
+        t0 = time.perf_counter()
+        points, labels = self.tracker.update(points, labels, t_capture)
+        self.smoother.apply(points, self.tracker.ids, t_capture)
+        self.mapper.apply(compute_features(points, labels))
+        self.controller.flush()
+        t1 = time.perf_counter()
+        self.stats.add("actuation", t1 - t0)
+        self.stats.add("glass_to_key", t1 - t_capture)
+        self.processed += 1
+
+    def close(self):
+        self.ended.set()
+        self._thread.join(timeout=1.0)
+        self.controller.close()
+        self.cap.release()
+        if self.ring is not None:
+            self.ring.close()
+
+
+class ArcadeSession:
+    """Schedules every player's newest frame onto the inference worker pool.
+
+    run() returns 0, or 1 when every inference worker died.
+    """
+
+    def __init__(self, players, workers=None, max_num_hands=2, report_interval=5.0):
+        self.players = players
+        cores = os.cpu_count() or 1
+        # More workers than players would idle: each player has at most one frame in flight
+        self.workers = max(1, min(workers or max(1, cores - 1), len(players)))
+        self.max_num_hands = max_num_hands
+        self.report_interval = report_interval
+        self.infer_stats = StageStats()
+        self.cpu_seconds = 0.0
+        self.inferences = 0
+        self.per_worker = [0] * self.workers
+        self.assignment = {}  # player index -> worker
+        self.dead_workers = set()
+
+    def _assign(self, player):
+        return self.assignment.setdefault(player.index, player.index % self.workers)
+
+    def _check_workers(self, procs):
+        """Move the players of dead workers onto live ones; False once none is left.
+
+        A worker that dies (crash, failed model load) takes its queued frame
+        with it, so its players are no longer in flight either.
+        """
+        alive = [i for i, proc in enumerate(procs) if proc.is_alive()]
+        for i, proc in enumerate(procs):
+            if i in alive or i in self.dead_workers:
+                continue
+            self.dead_workers.add(i)
+            moved = [p for p in self.players if self.assignment.get(p.index) == i]
+            for player in moved:
+                player.in_flight = False
+                if alive:
+                    self.assignment[player.index] = alive[player.index % len(alive)]
+            if alive:
+                print(f">> WORKER {i} died (exit code {proc.exitcode}); players "
+                      f"{[p.index for p in moved]} moved to workers {alive}")
+        if not alive:
+            codes = [proc.exitcode for proc in procs]
+            print(f">> FAIL | every inference worker died (exit codes {codes})")
+        return bool(alive)
+
+    def run(self):
+        ctx = multiprocessing.get_context("spawn")
+        tasks = [ctx.Queue() for _ in range(self.workers)]
+        results = ctx.Queue()
+        procs = [ctx.Process(target=_inference_worker, args=(i, tasks[i], results, self.max_num_hands),
+                             name=f"inference-{i}", daemon=True)
+                 for i in range(self.workers)]
+        for p in procs:
+            p.start()
+        for player in self.players:
+            player.start()
+        print(f">> ARCADE | {len(self.players)} players on {self.workers} inference workers "
+              f"({os.cpu_count()} cores)")
+
+        by_index = {p.index: p for p in self.players}
+        start = last_report = time.perf_counter()
+        failed = False
+        try:
+            while True:
+                # Hand each idle player's newest frame to its worker (stale ones were dropped)
+                for player in self.players:
+                    if not player.in_flight:
+                        item = player.frames.get(timeout=0)
+                        if item is not None:
+                            tasks[self._assign(player)].put((player.index, *item))
+                            player.in_flight = True
+                if all(p.ended.is_set() and not p.in_flight for p in self.players):
+                    break
+
+                try:
+                    index, t_capture, points, labels, worker, wall, cpu = results.get(timeout=0.005)
+                except queue.Empty:
+                    if not self._check_workers(procs):
+                        failed = True
+                        break
+                    continue
+                player = by_index[index]
+                player.in_flight = False
+                self.infer_stats.add("inference", wall)
+                self.cpu_seconds += cpu
+                self.inferences += 1
+                self.per_worker[worker] += 1
+                player.apply(t_capture, points, labels)
+
+                now = time.perf_counter()
+                if now - last_report >= self.report_interval:
+                    self.report(now - start)
+                    last_report = now
+        except KeyboardInterrupt:
+            print(">> INTERRUPTED")
+        finally:
+            for q in tasks:
+                q.put(None)
+            for p in procs:
+                p.join(timeout=2.0)
+            for player in self.players:
+                player.close()
+        self.report(time.perf_counter() - start, final=True)
+        return 1 if failed else 0
+
+    def report(self, elapsed, final=False):
+        """Per-player fps/latency and pool throughput, for sizing arcade hardware."""
+        prefix = ">> FINAL" if final else ">>"
+        for player in self.players:
+            lat = player.stats.summary().get("glass_to_key")
+            lat_text = f"glass_to_key p50={lat[0]:.1f}ms p95={lat[1]:.1f}ms" if lat else "no frames yet"
+            print(f"{prefix} PLAYER {player.index} [{player.mode}] | {player.processed / elapsed:5.1f} fps | "
+                  f"{lat_text} | dropped={player.frames.dropped} stale={player.stale}")
+        if self.inferences:
+            infer = self.infer_stats.summary()["inference"]
+            cpu_ms = self.cpu_seconds / self.inferences * 1000
+            rate = self.inferences / elapsed
+            print(f"{prefix} POOL | {rate:.1f} inferences/s on {self.workers} workers "
+                  f"({rate / self.workers:.1f}/s per worker, split {self.per_worker}) | "
+                  f"inference p50={infer[0]:.1f}ms p95={infer[1]:.1f}ms | "
+                  f"{cpu_ms:.1f}ms CPU/frame = ~{1000 / max(cpu_ms, 1e-6):.0f} frames/s per core")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-camera HandsFreePlay arcade session")
+    parser.add_argument("--player", action="append", required=True, metavar="SOURCE=MODE",
+                        help="camera index, video file or stream URL, and the profiles.json mode "
+                             "for that player (repeat per player)")
+    parser.add_argument("--workers", type=int, help="inference processes (default: cores - 1)")
+    parser.add_argument("--work-width", type=int, default=640, help="max frame width sent to inference")
+    parser.add_argument("--backend", default="auto",
+                        choices=["auto", "pyautogui", "keyboard", "uinput", "stub"],
+                        help="input injection backend")
+    parser.add_argument("--hysteresis", type=float, default=0.25,
+                        help="release band as a fraction of each threshold")
+    parser.add_argument("--profiles", default="profiles.json", help="profiles file to load modes from")
+    args = parser.parse_args()
+
+    _, default_mode, modes = load_profiles(args.profiles)
+    players = []
+    for index, spec in enumerate(args.player):
+        source, _, mode = spec.rpartition("=") if "=" in spec else (spec, "", default_mode)
+        if mode not in modes:
+            parser.error(f"unknown mode {mode!r} for player {index} (have: {', '.join(modes)})")
+        players.append(Player(index, parse_source(source), mode, modes, backend=args.backend,
+                              hysteresis=args.hysteresis, work_width=args.work_width))
+    return ArcadeSession(players, workers=args.workers).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
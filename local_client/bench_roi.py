@@ -0,0 +1,180 @@
+"""Per-frame inference cost of ROI tracking vs. full-frame inference.
+
+    python bench_roi.py                      # simulated hand graph, no MediaPipe needed
+    python bench_roi.py --video hands.mp4    # the real MediaPipe graph on a recording
+
+The simulated graph behaves like a video-mode MediaPipe Hands graph: it
+keeps last frame's hand boxes in normalized coordinates of its previous
+input and only tracks a hand found inside its box again; with fewer hands
+tracked than it can see it runs palm detection. Hands are bright
+rectangles on a dark frame, two of them drifting with a quick reach now
+and then. Inference time is the engine's own work (colour conversion,
+crop bookkeeping, remapping), measured, plus a modelled cost for the
+graph: MediaPipe's models take fixed-size inputs (192 px palm detection,
+224 px landmarks), so each palm detection and each hand's landmark pass
+costs a fixed time whatever the crop (--detect-ms, --landmark-ms; take
+them from a profile of the real graph). The simulator's own blob search
+is not counted.
+"""
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from gesture_engine import GestureEngine
+
+
+class SimLandmark:
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x, y):
+        self.x, self.y, self.z = x, y, 0.0
+
+
+class SimHands:
+    """Stand-in for mediapipe's video-mode Hands graph with a fixed cost per model run.
+
+    modelled_ms adds up the graph's modelled cost; own_seconds the time the
+    simulation itself took, which callers subtract from what they measure.
+    """
+
+    def __init__(self, max_num_hands=2, detect_ms=0.0, landmark_ms=0.0):
+        self.max_num_hands = max_num_hands
+        self.detect_ms = detect_ms
+        self.landmark_ms = landmark_ms
+        self.boxes = []  # normalized (u0, v0, u1, v1) of last frame's hands
+        self.detections = 0
+        self.modelled_ms = 0.0
+        self.own_seconds = 0.0
+
+    def process(self, rgb):
+        t0 = time.perf_counter()
+        result = self._process(rgb)
+        self.own_seconds += time.perf_counter() - t0
+        return result
+
+    def _process(self, rgb):
+        h, w = rgb.shape[:2]
+        count, _, stats, _ = cv2.connectedComponentsWithStats((rgb[:, :, 0] > 127).astype(np.uint8))
+        blobs = [stats[i, :4] for i in range(1, count) if stats[i, 4] >= 50]
+        tracked = 0
+        for bx, by, bw, bh in blobs:
+            cu, cv = (bx + bw / 2.0) / w, (by + bh / 2.0) / h
+            tracked += any(u0 <= cu <= u1 and v0 <= cv <= v1 and bw / w <= 1.5 * (u1 - u0)
+                           for u0, v0, u1, v1 in self.boxes)
+        if tracked < min(len(blobs), self.max_num_hands) or not blobs:
+            self.detections += 1
+            self.modelled_ms += self.detect_ms
+        blobs = sorted(blobs, key=lambda b: b[0])[:self.max_num_hands]
+        self.modelled_ms += len(blobs) * self.landmark_ms
+        self.boxes = [((bx - 0.2 * bw) / w, (by - 0.2 * bh) / h, (bx + 1.2 * bw) / w, (by + 1.2 * bh) / h)
+                      for bx, by, bw, bh in blobs]
+        hands, handedness = [], []
+        for i, (bx, by, bw, bh) in enumerate(blobs):
+            grid = [(bx + bw * (k % 5) / 4.0, by + bh * (k // 5) / 4.0) for k in range(20)]
+            points = [(bx + bw / 2.0, by + bh)] + grid  # wrist at the bottom centre
+            hands.append(type("Hand", (), {"landmark": [SimLandmark(x / w, y / h) for x, y in points]})())
+            label = "Left" if i == 0 and len(blobs) > 1 else "Right"
+            handedness.append(type("Handedness", (), {
+                "classification": [type("Class", (), {"label": label})()]})())
+        return type("Result", (), {"multi_hand_landmarks": hands or None,
+                                   "multi_handedness": handedness or None})()
+
+
+def sim_frames(frames, size):
+    """Two hands as 40x50 px boxes on a 640x360 scene, scaled to `size`."""
+    w, h = size
+    s = w / 640.0
+    frame = np.zeros((h, w, 3), dtype=np.uint8)
+    for i in range(frames):
+        t = i / 30.0
+        frame[:] = 0
+        dart = 120 * (np.sin(t * 0.9) > 0.97)  # a quick reach now and then
+        for cx, cy in ((270 + 30 * np.sin(t) + dart, 200 + 20 * np.cos(1.3 * t)),
+                       (370 + 30 * np.cos(0.8 * t), 190 + 25 * np.sin(t))):
+            frame[int(s * (cy - 25)):int(s * (cy + 25)), int(s * (cx - 20)):int(s * (cx + 20))] = 255
+        yield frame
+
+
+def video_frames(path, size):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        sys.exit(f">> could not open {path}")
+    frames = []
+    while True:
+        success, frame = cap.read()
+        if not success:
+            break
+        frames.append(cv2.resize(frame, size, interpolation=cv2.INTER_AREA))
+    cap.release()
+    return frames
+
+
+def run(engine, frames, graphs=()):
+    """Time process_frame over `frames`; returns (per-frame ms, share of the frame's pixels inferred).
+
+    With simulated graphs, their own time is replaced by their modelled cost.
+    """
+    times, pixels = [], 0
+    for frame in frames:
+        h, w = frame.shape[:2]
+        roi = engine.next_roi()
+        pixels += (roi[2] - roi[0]) * (roi[3] - roi[1]) / (w * h) if roi is not None else 1.0
+        before = [(g.own_seconds, g.modelled_ms) for g in graphs]
+        t0 = time.perf_counter()
+        engine.process_frame(frame)
+        ms = (time.perf_counter() - t0) * 1000.0
+        for g, (own, modelled) in zip(graphs, before):
+            ms += (g.modelled_ms - modelled) - (g.own_seconds - own) * 1000.0
+        times.append(ms)
+    return times, pixels / max(len(times), 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ROI tracking vs. full-frame inference cost")
+    parser.add_argument("--video", help="run the real MediaPipe graph on this recording instead")
+    parser.add_argument("--frames", type=int, default=900, help="simulated frames")
+    parser.add_argument("--width", type=int, default=640, help="working image width")
+    parser.add_argument("--height", type=int, default=360, help="working image height")
+    parser.add_argument("--detect-ms", type=float, default=8.0, help="simulated palm detection cost")
+    parser.add_argument("--landmark-ms", type=float, default=4.0, help="simulated landmark cost per hand")
+    args = parser.parse_args()
+    size = (args.width, args.height)
+
+    if args.video:
+        frames = video_frames(args.video, size)
+        factory = None
+        print(f">> ROI BENCH (MediaPipe) | {args.video}, {len(frames)} frames at {size[0]}x{size[1]}")
+    else:
+        frames = [frame.copy() for frame in sim_frames(args.frames, size)]
+        factory = lambda: SimHands(2, args.detect_ms, args.landmark_ms)
+        print(f">> ROI BENCH (simulated graph) | {size[0]}x{size[1]}, {len(frames)} frames, "
+              f"palm detection {args.detect_ms}ms, landmarks {args.landmark_ms}ms per hand")
+
+    baseline = None
+    for name, roi_tracking in (("full frame", False), ("roi", True)):
+        engine = GestureEngine(flip_frame=False, roi_tracking=roi_tracking, hands_factory=factory,
+                               warmup_size=size)
+        graphs = [g for g in (engine.hands, engine.roi_hands) if g is not None] if factory else []
+        for graph in graphs:
+            graph.detections = 0  # not the warm-up frame
+        times, pixels = run(engine, frames, graphs)
+        mean = sum(times) / len(times)
+        times.sort()
+        detect_text = ""
+        if factory:
+            detections = sum(g.detections for g in graphs)
+            detect_text = f"palm detections {detections / len(frames):5.1%} of frames | "
+        saving = f" ({mean / baseline - 1:+.0%} vs full frame)" if baseline else ""
+        print(f">> {name:<10} | inference mean={mean:5.2f}ms{saving} p50={times[len(times) // 2]:5.2f}ms "
+              f"p95={times[int(len(times) * 0.95)]:5.2f}ms | {detect_text}"
+              f"full passes {engine.full_frames:4d} crop passes {engine.roi_frames:4d} | "
+              f"{pixels:5.1%} of the frame's pixels inferred")
+        baseline = baseline or mean
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
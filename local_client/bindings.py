@@ -0,0 +1,169 @@
+"""Data-driven gesture -> action bindings.
+
+profiles.json maps window titles to modes and defines each mode as a list
+of bindings. A binding compares one named feature against a threshold and
+drives a key, a mouse button or an analog axis:
+
+    {"feature": "both.tilt", "op": "<", "on": -0.02, "action": {"key": "a"}}
+    {"feature": "left.openness", "op": "<", "on": 0.08, "off": 0.1,
+     "action": {"mouse": "left"}}
+    {"feature": "steer.strength", "action": {"axis": "steering"}}
+
+Optional fields: "off" (release level, default derived from the global
+hysteresis fraction) and "missing" ("release" or "hold": what to do when the
+feature is unavailable, e.g. a hand is out of frame).
+
+A mode may also drive the mouse pointer from a fingertip (see cursor.py):
+
+    "cursor": {"hand": "right", "landmark": 8, "box": [0.25, 0.2, 0.75, 0.7],
+               "rate": 240, "lead": 0.5, "min_gain": 0.6, "max_gain": 2.0}
+
+Per-user features come from calibration.py: "<side>.grip" (0 = hand open,
+1 = fist, relative to the user's own hands and independent of camera
+distance), "both.height_delta" and "both.tilt_delta" (offsets from the
+user's neutral pose). Until a neutral pose is fitted the deltas are
+unavailable and a mode that binds them starts a calibration; grip falls back
+to typical hand proportions, so one-handed modes work without one.
+
+With a gesture model loaded (client.py --classifier) each hand also has
+class probabilities, e.g. "left.gesture.fist"; without one they are
+unavailable.
+
+At load time each mode is compiled into flat NumPy arrays, so evaluating a
+frame is a handful of vectorized operations regardless of binding count.
+"""
+import json
+
+import numpy as np
+
+from calibration import UNCALIBRATED
+from gesture_classifier import GESTURES
+
+SIDES = ("left", "right")
+HAND_FEATURES = (("openness", "tilt", "height", "steering",
+                  "pinch_index", "pinch_middle", "pinch_ring", "pinch_pinky", "grip")
+                 + tuple(f"gesture.{name}" for name in GESTURES))
+FEATURE_NAMES = ([f"{side}.{name}" for side in SIDES for name in HAND_FEATURES]
+                 + ["both.tilt", "both.tilt_delta", "both.height", "both.height_delta",
+                    "steer.angle", "steer.strength"])
+FEATURE_INDEX = {name: i for i, name in enumerate(FEATURE_NAMES)}
+# Features that need the user's neutral pose (a two-hand fit); grip works uncalibrated
+CALIBRATED_FEATURES = {"both.height_delta", "both.tilt_delta"}
+STEER_RANGE_DEG = 45.0  # hand angle that maps to full steering lock
+
+
+def load_profiles(path="profiles.json"):
+    """Return (window title -> mode, default mode, {mode: definition})."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    if "modes" not in data:
+        # Legacy flat {"Window title": "mode"} file: titles only, no bindings
+        print(">> profiles.json has no 'modes' section; gestures are disabled")
+        default_mode = data.pop("default", "default")  # the fallback mode, not a window title
+        return data, default_mode, {}
+    return data.get("windows", {}), data.get("default_mode", "default"), data["modes"]
+
+
+def feature_vector(features, calibration, out):
+    """Fill `out` (len(FEATURE_NAMES),) from one frame's FrameFeatures; NaN = unavailable.
+
+    calibration: the user's calibration.Calibration, or None before one is fitted.
+    """
+    calibration = calibration or UNCALIBRATED
+    out.fill(np.nan)
+    for base, hand in ((0, features.left), (len(HAND_FEATURES), features.right)):
+        if hand is not None:
+            out[base:base + 4] = (hand.openness, hand.tilt, hand.height, hand.steering_angle)
+            out[base + 4:base + 8] = hand.pinch
+            out[base + 8] = calibration.grip(hand)
+            if hand.gestures is not None:
+                out[base + 9:base + 9 + len(GESTURES)] = hand.gestures
+
+    left, right = features.left, features.right
+    if left is not None and right is not None:
+        tilt = (left.tilt + right.tilt) / 2
+        height = (left.height + right.height) / 2
+        out[FEATURE_INDEX["both.tilt"]] = tilt
+        out[FEATURE_INDEX["both.height"]] = height
+        if calibration.neutral_height is not None:
+            out[FEATURE_INDEX["both.tilt_delta"]] = tilt - calibration.neutral_tilt
+            out[FEATURE_INDEX["both.height_delta"]] = height - calibration.neutral_height
+
+    steer = right if right is not None else left
+    if steer is not None:
+        out[FEATURE_INDEX["steer.angle"]] = steer.steering_angle
+        out[FEATURE_INDEX["steer.strength"]] = max(-1.0, min(1.0, steer.steering_angle / STEER_RANGE_DEG))
+    return out
+
+
+class BindingTable:
+    """One mode's bindings compiled into flat arrays."""
+
+    def __init__(self, name, definition, hysteresis=0.25):
+        self.name = name
+        self.banner = definition.get("banner", f"MODE: {name.upper()}")
+        self.color = tuple(definition.get("color", (255, 255, 255)))
+
+        switches = [b for b in definition.get("bindings", []) if "axis" not in b["action"]]
+        axes = [b for b in definition.get("bindings", []) if "axis" in b["action"]]
+
+        self.feature_idx = np.array([FEATURE_INDEX[b["feature"]] for b in switches], dtype=np.intp)
+        self.below = np.array([b.get("op", ">") == "<" for b in switches], dtype=bool)
+        self.on = np.array([b["on"] for b in switches], dtype=np.float32)
+        margin = np.abs(self.on) * hysteresis
+        default_off = np.where(self.below, self.on + margin, self.on - margin)
+        self.off = np.array([b.get("off", d) for b, d in zip(switches, default_off)], dtype=np.float32)
+        self.hold_missing = np.array([b.get("missing", "release") == "hold" for b in switches], dtype=bool)
+
+        # Several bindings may drive the same key; the key is held if any of them is on
+        self.targets = []
+        target_idx = []
+        for b in switches:
+            action = b["action"]
+            target = ("mouse", action["mouse"]) if "mouse" in action else ("key", action["key"])
+            if target not in self.targets:
+                self.targets.append(target)
+            target_idx.append(self.targets.index(target))
+        self.target_idx = np.array(target_idx, dtype=np.intp)
+
+        self.axes = [(FEATURE_INDEX[b["feature"]], b["action"]["axis"], b.get("scale", 1.0)) for b in axes]
+        # Pointer: hand + landmark to follow, the rest goes to cursor.CursorOutput
+        self.cursor = None
+        if "cursor" in definition:
+            self.cursor = dict(definition["cursor"])
+            self.cursor_hand = self.cursor.pop("hand", "right")
+            self.cursor_landmark = self.cursor.pop("landmark", 8)
+
+        self.uses_calibration = any(b["feature"] in CALIBRATED_FEATURES for b in switches + axes)
+
+        self.state = np.zeros(len(switches), dtype=bool)
+        self._raw = np.zeros(len(switches), dtype=bool)
+        self.toggles = 0
+        self.suppressed = 0
+
+    def reset(self):
+        self.state[:] = False
+        self._raw[:] = False
+
+    def evaluate(self, f):
+        """Run all bindings on feature vector f; returns held flag per target."""
+        v = f[self.feature_idx]
+        missing = np.isnan(v)
+        with np.errstate(invalid="ignore"):
+            engage = np.where(self.below, v < self.on, v > self.on)
+            stay = np.where(self.below, v < self.off, v > self.off)
+        new = np.where(self.state, stay, engage)
+        new = np.where(missing, self.hold_missing & self.state, new)
+
+        # Chatter accounting: a plain threshold at `on` would have flipped here
+        flipped = new != self.state
+        self.suppressed += int(np.count_nonzero((engage != self._raw) & ~flipped & ~missing))
+        self.toggles += int(np.count_nonzero(flipped))
+        self._raw = np.where(missing, self._raw, engage)
+        self.state = new
+
+        return np.bincount(self.target_idx, weights=new, minlength=len(self.targets)) > 0
+
+
+def compile_modes(modes, hysteresis=0.25):
+    return {name: BindingTable(name, definition, hysteresis) for name, definition in modes.items()}
@@ -0,0 +1,243 @@
+"""Per-user calibration: neutral pose and hand-closure range, persisted per camera.
+
+Hands differ in size, people rest them at different heights and angles, and
+the camera sits in a different place on every desk, so fixed thresholds on
+raw image coordinates misfire. A Calibration holds what is fitted for one
+user in front of one camera:
+
+    neutral_height  mean wrist height of both hands at rest  -> both.height_delta
+    neutral_tilt    mean wrist -> index MCP x offset at rest  -> both.tilt_delta
+    open_ratio      tip-to-wrist distance / hand size, open   -> <side>.grip
+    closed_ratio    the same with a fist                        (0 open .. 1 fist)
+
+Hand size is the wrist -> middle-finger MCP distance, so grip does not change
+as the hands move toward or away from the camera. The Calibrator fits these
+from a short window of live frames (neutral pose, then optionally fists);
+CalibrationStore keeps them on disk keyed by user and camera, so the client
+starts calibrated and profile switches never recalibrate.
+
+    python calibration.py show
+    python calibration.py fit session.npz --user alice --camera 0@1280x720
+    python calibration.py clear --user alice
+"""
+import argparse
+import getpass
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".handsfreeplay", "calibration.json")
+# Typical tip-to-wrist / hand-size ratios (used until a user has calibrated)
+DEFAULT_OPEN_RATIO = 1.7
+DEFAULT_CLOSED_RATIO = 0.9
+FIST_FRACTION = 0.75  # both hands below this fraction of open_ratio count as fists
+
+
+def camera_key(source, width, height):
+    """Store key for a capture source at a resolution, e.g. '0@1280x720'."""
+    return f"{source}@{width}x{height}"
+
+
+def hand_ratio(hand):
+    """Tip-to-wrist distance relative to hand size for one HandFeatures."""
+    return hand.openness / max(hand.hand_size, 1e-6)
+
+
+class Calibration:
+    """Fitted neutral pose and closure range for one user and camera."""
+
+    def __init__(self, neutral_height, neutral_tilt, open_ratio=DEFAULT_OPEN_RATIO,
+                 closed_ratio=DEFAULT_CLOSED_RATIO, frames=0, fitted_at=None):
+        self.neutral_height = neutral_height
+        self.neutral_tilt = neutral_tilt
+        self.open_ratio = open_ratio
+        self.closed_ratio = closed_ratio
+        self.frames = frames  # frames the fit used
+        self.fitted_at = fitted_at or time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def grip(self, hand):
+        """0 for a hand as open as at calibration, 1 for a calibrated fist."""
+        return (self.open_ratio - hand_ratio(hand)) / (self.open_ratio - self.closed_ratio)
+
+    def to_dict(self):
+        return {"neutral_height": self.neutral_height, "neutral_tilt": self.neutral_tilt,
+                "open_ratio": self.open_ratio, "closed_ratio": self.closed_ratio,
+                "frames": self.frames, "fitted_at": self.fitted_at}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{k: data[k] for k in ("neutral_height", "neutral_tilt", "open_ratio",
+                                           "closed_ratio", "frames", "fitted_at") if k in data})
+
+    def describe(self):
+        return (f"neutral height={self.neutral_height:.3f} tilt={self.neutral_tilt:+.3f} | "
+                f"open={self.open_ratio:.2f} closed={self.closed_ratio:.2f} hand sizes")
+
+
+# Grip before any calibration: same formula on typical ratios, no neutral pose
+UNCALIBRATED = Calibration(None, None, frames=0, fitted_at="default")
+
+
+class Calibrator:
+    """Fits a Calibration from live frames; feed it with add() until it returns one.
+
+    Only frames with both hands count. The neutral phase takes `frames` of
+    them (hands open, resting where nothing should be pressed) and uses the
+    medians, so a hand still settling into place does not set the pose. With
+    fists=True a second phase waits for `frames` two-fist frames to fit
+    closed_ratio; otherwise (or if no fist shows up within fist_timeout
+    frames) closed_ratio keeps the default proportion to the fitted open_ratio.
+    """
+
+    def __init__(self, frames=30, fists=False, fist_timeout=300):
+        self.frames = frames
+        self.fists = fists
+        self.fist_timeout = fist_timeout
+        self.phase = "neutral"
+        self._heights, self._tilts, self._open, self._closed = [], [], [], []
+        self._fist_wait = 0
+        self._neutral = None
+
+    @property
+    def prompt(self):
+        if self.phase == "neutral":
+            return f"CALIBRATING: BOTH HANDS OPEN AT REST ({len(self._heights)}/{self.frames})"
+        return f"CALIBRATING: MAKE TWO FISTS ({len(self._closed) // 2}/{self.frames})"
+
+    def add(self, features):
+        left, right = features.left, features.right
+        if self.phase == "fist":
+            self._fist_wait += 1
+        if left is None or right is None:
+            return self._timed_out()
+        ratios = (hand_ratio(left), hand_ratio(right))
+
+        if self.phase == "neutral":
+            self._heights.append((left.height + right.height) / 2)
+            self._tilts.append((left.tilt + right.tilt) / 2)
+            self._open.extend(ratios)
+            if len(self._heights) < self.frames:
+                return None
+            open_ratio = float(np.median(self._open))
+            self._neutral = (float(np.median(self._heights)), float(np.median(self._tilts)), open_ratio)
+            if not self.fists:
+                return self._result(open_ratio * DEFAULT_CLOSED_RATIO / DEFAULT_OPEN_RATIO)
+            self.phase = "fist"
+            return None
+
+        if max(ratios) < self._neutral[2] * FIST_FRACTION:
+            self._closed.extend(ratios)
+            if len(self._closed) >= 2 * self.frames:
+                return self._result(float(np.median(self._closed)))
+        return self._timed_out()
+
+    def _timed_out(self):
+        if self.phase != "fist" or self._fist_wait < self.fist_timeout:
+            return None
+        print(">> CALIBRATION | no fists seen, keeping the default closed-hand ratio")
+        return self._result(self._neutral[2] * DEFAULT_CLOSED_RATIO / DEFAULT_OPEN_RATIO)
+
+    def _result(self, closed_ratio):
+        height, tilt, open_ratio = self._neutral
+        return Calibration(height, tilt, open_ratio, closed_ratio,
+                           frames=len(self._heights) + len(self._closed) // 2)
+
+
+class CalibrationStore:
+    """Calibrations on disk as JSON: {"users": {user: {camera key: calibration}}}."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self.data = {"users": {}}
+        if os.path.exists(path):
+            try:
+                with open(path, "r") as f:
+                    self.data = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f">> CALIBRATION | could not read {path} ({e}); starting empty")
+
+    def load(self, user, camera):
+        entry = self.data["users"].get(user, {}).get(camera)
+        return Calibration.from_dict(entry) if entry else None
+
+    def save(self, user, camera, calibration):
+        self.data["users"].setdefault(user, {})[camera] = calibration.to_dict()
+        self.write()
+
+    def write(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(tmp, self.path)  # atomic: a crash mid-write keeps the old file
+
+    def clear(self, user, camera=None):
+        """Forget one camera of a user, or the whole user; returns how many entries went."""
+        cameras = self.data["users"].get(user, {})
+        if camera is None:
+            removed = len(cameras)
+            self.data["users"].pop(user, None)
+        else:
+            removed = 1 if cameras.pop(camera, None) else 0
+        return removed
+
+
+def fit_session(session, frames=30, fists=True):
+    """Run a Calibrator over a recorded session; returns a Calibration or None."""
+    from gesture_engine import compute_features
+    calibrator = Calibrator(frames, fists=fists, fist_timeout=len(session))
+    for _, points, labels in session.frames():
+        result = calibrator.add(compute_features(points, labels))
+        if result is not None:
+            return result
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-user calibration profiles")
+    parser.add_argument("--store", default=DEFAULT_PATH, help="calibration file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("show", help="list stored calibrations")
+    fit = sub.add_parser("fit", help="fit from a session recorded with client.py --record")
+    fit.add_argument("session")
+    fit.add_argument("--user", default=getpass.getuser())
+    fit.add_argument("--camera", default=camera_key(0, 1280, 720),
+                     help="camera key as the client builds it: SOURCE@WIDTHxHEIGHT")
+    fit.add_argument("--frames", type=int, default=30, help="two-hand frames per phase")
+    fit.add_argument("--no-fists", action="store_true", help="session has no fist phase")
+    clear = sub.add_parser("clear", help="forget a user's calibration")
+    clear.add_argument("--user", default=getpass.getuser())
+    clear.add_argument("--camera", help="only this camera key")
+    args = parser.parse_args()
+
+    store = CalibrationStore(args.store)
+    if args.command == "show":
+        users = store.data["users"]
+        if not users:
+            print(f">> no calibrations in {args.store}")
+        for user, cameras in sorted(users.items()):
+            for camera, entry in sorted(cameras.items()):
+                cal = Calibration.from_dict(entry)
+                print(f">> {user} @ {camera} | {cal.describe()} | {cal.frames} frames, {cal.fitted_at}")
+        return 0
+    if args.command == "clear":
+        removed = store.clear(args.user, args.camera)
+        if removed:
+            store.write()
+        print(f">> CALIBRATION | removed {removed} entries for {args.user}")
+        return 0
+    from recording import Session
+    calibration = fit_session(Session(args.session), args.frames, fists=not args.no_fists)
+    if calibration is None:
+        print(f">> FAIL | fewer than {args.frames} two-hand frames in {args.session}")
+        return 1
+    store.save(args.user, args.camera, calibration)
+    print(f">> CALIBRATION saved for {args.user} @ {args.camera} | {calibration.describe()}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
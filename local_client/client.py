@@ -1,128 +1,560 @@
-import cv2
-import json
 import time
-import pygetwindow as gw
+T_START = time.perf_counter()  # before the heavy imports, for time-to-first-action
+
+import argparse
+import getpass
+import os
+import sys
+import cv2
+import threading
+from bindings import load_profiles
+from calibration import DEFAULT_PATH as CALIBRATION_PATH, CalibrationStore, camera_key
+from filters import LandmarkSmoother
+from gesture_classifier import GestureClassifier
 from gesture_engine import GestureEngine
+from gesture_mapper import GestureMapper
+from hand_tracker import HandTracker
+from governor import CaptureGovernor
 from input_controller import InputController
+from pipeline import STATS_WINDOW, BufferPool, LatestSlot, StageStats, PeriodicReporter
+from profiler import AllocationCheck, Profiler
+from recording import SessionRecorder
+from telemetry import TelemetryEmitter
+from window_watcher import ProfileMatcher, WindowWatcher
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.json")
+# Frames a pipelined run holds at once: one per thread and slot (capture, frame
+# slot, inference, result / display slot, actuation / preview)
+PIPELINE_BUFFERS = 5
+# How long the preview shows a hand model load error before the client exits
+LOAD_ERROR_SECONDS = 5.0
+
+def _release_frame(item):
+    """Release a pipelined item's buffer sets (its last element); also LatestSlot's on_drop."""
+    for buffers in item[-1]:
+        buffers.release()
+
 
 class HandsFreeClient:
-    def __init__(self):
-        self.engine = GestureEngine()
-        self.controller = InputController()
-        self.cap = cv2.VideoCapture(0)
-        self.neutral_height = None
-        self.profiles = self._load_profiles()
-        self.last_check = 0
-        
-        print(">> CLIENT INITIALIZED")
-        print(">> PRESS 'ESC' TO EXIT")
+    def __init__(self, pipelined=False, roi_tracking=False, governor=None, record_path=None,
+                 backend="auto", steering="keys", smoothing=True, predict_ms=0.0,
+                 hysteresis=0.25, telemetry_url=None, profile=False, profile_out=None,
+                 headless=False, preview_fps=0.0, quit_hotkey="ctrl+shift+q", eager_start=False,
+                 classifier_path=None, source=0, mode=None, alloc_check=None, user=None,
+                 calibration_path=CALIBRATION_PATH, recalibrate=False, tracking=True,
+                 hands_factory=None):
+        self.pipelined = pipelined
+        self.headless = headless
+        self.preview_interval = 1.0 / preview_fps if preview_fps > 0 else None
+        self._next_preview = 0.0
+        self.quit_event = threading.Event()
+        self.stats = StageStats()
+        self.profiler = Profiler(enabled=profile)
+        self.profile_out = profile_out
+        self.startup = {}  # milestone -> ms since process start
+        self._startup_reported = False
+        self._load_failed_at = None
+        self.governor = governor or CaptureGovernor()
+
+        # --- FAST START ---
+        # The hand model loads and warms up on a background thread while the
+        # camera opens and the preview runs; input backends are only built for
+        # the devices the active profile drives, on the actuator thread.
+        # eager_start restores the old load-everything-first order for comparison.
+        req = self.governor.requested
+        warm_w = min(req["width"], self.governor.work_width)
+        warmup_size = (warm_w, int(round(req["height"] * warm_w / req["width"])))
+        smoother = LandmarkSmoother(predict_ms=predict_ms) if smoothing else None
+        classifier = GestureClassifier.load(classifier_path) if classifier_path else None
+        # Pipelined, every frame's buffer sets are owned: handed along with the
+        # frame and released by the threads that used it, never overwritten early
+        depth = PIPELINE_BUFFERS if pipelined else 1
+        self.engine = GestureEngine(roi_tracking=roi_tracking, smoother=smoother,
+                                    flip_frame=not headless, background_load=not eager_start,
+                                    warmup_size=warmup_size, classifier=classifier,
+                                    pool=BufferPool(depth, owned=pipelined),
+                                    tracker=HandTracker() if tracking else None, hands_factory=hands_factory)
+        self.capture_pool = BufferPool(depth, owned=pipelined)
+        self.alloc_check = alloc_check
+        self.controller = InputController(backend=backend, stats=self.stats, steering=steering,
+                                          hysteresis=hysteresis)
+        windows, default_mode, modes = self._load_profiles()
+        if mode is not None:
+            windows, default_mode = {}, mode  # pinned: no switching on the active window
+        self.controller.current_profile = default_mode
+
+        # --- CALIBRATION ---
+        # Fitted once per user and camera and kept on disk; without a stored
+        # one the mapper fits it from the first two-hand frames and we save it
+        self.calibrations = CalibrationStore(calibration_path)
+        self.calibration_key = (user or getpass.getuser(), camera_key(source, req["width"], req["height"]))
+        calibration = None if recalibrate else self.calibrations.load(*self.calibration_key)
+        if calibration is not None:
+            print(">> CALIBRATION | {} @ {} | ".format(*self.calibration_key) + calibration.describe())
+        self.mapper = GestureMapper(self.controller, modes, default_mode, hysteresis,
+                                    calibration=calibration, on_calibrated=self._save_calibration)
+        if recalibrate:
+            self.mapper.recalibrate()
+        if eager_start:
+            self.controller.backend.prepare(("key", "mouse"))
+        else:
+            self.controller.prepare(self.mapper.devices())
+        self.recorder = SessionRecorder(record_path) if record_path else None
+        self.engine.keep_raw = self.recorder is not None
+        self.cap = self.governor.open(source)
+        self._mark("camera_open")
+        self.last_result = None
+        self.matcher = ProfileMatcher(windows, default=default_mode)
+        self.profile_updates = LatestSlot()
+        self.published_profile = self.controller.current_profile
+        self.watcher = WindowWatcher(self._on_window_title).start() if windows else None
+        self.telemetry = None
+        if telemetry_url:
+            self.telemetry = TelemetryEmitter(telemetry_url, self.stats, state=self._telemetry_state).start()
+            self.controller.on_change = self.telemetry.key_changes
+
+        print(">> CLIENT INITIALIZED" + (" (PIPELINED)" if pipelined else "")
+              + (" (HEADLESS)" if headless else "")
+              + f" | input backend: {self.controller.backend.name}")
+        if headless:
+            self._register_quit_hotkey(quit_hotkey)
+            print(f">> PRESS {quit_hotkey.upper()} OR CTRL+C TO EXIT" if quit_hotkey else ">> PRESS CTRL+C TO EXIT")
+        else:
+            print(">> PRESS 'ESC' TO EXIT, 'P' TO TOGGLE THE PROFILER, 'C' TO CALIBRATE THE CURSOR, "
+                  "'K' TO RECALIBRATE HANDS")
+
+    def _register_quit_hotkey(self, hotkey):
+        """Global exit hotkey for headless mode, where there is no window to press ESC in."""
+        if not hotkey:
+            return
+        try:
+            import keyboard
+            keyboard.add_hotkey(hotkey, self.quit_event.set)
+        except Exception as e:  # keyboard needs root on Linux
+            print(f">> QUIT HOTKEY unavailable ({e}); use Ctrl+C")
 
     def _load_profiles(self):
         try:
-            with open('profiles.json', 'r') as f:
-                return json.load(f)
+            return load_profiles(PROFILES_PATH)
         except Exception as e:
             print(f"Error loading profiles: {e}")
-            return {}
+            return {}, "default", {}
+
+    def _save_calibration(self, calibration):
+        try:
+            self.calibrations.save(*self.calibration_key, calibration)
+            print(">> CALIBRATION saved for {} @ {}".format(*self.calibration_key))
+        except OSError as e:
+            print(f">> CALIBRATION not saved ({e})")
+
+    def _on_window_title(self, title):
+        """Runs on the watcher thread: resolve the title and publish any profile change."""
+        profile = self.matcher.match(title)
+        if profile != self.published_profile:
+            self.published_profile = profile
+            self.profile_updates.put(profile)
+
+    def _telemetry_state(self):
+        """Extra telemetry fields, read on the telemetry thread."""
+        return {"profile": self.controller.current_profile,
+                "op": self.governor.describe()}
 
     def auto_switch_profile(self):
-        """Check active window and switch profile if needed."""
-        # Rate limit checks to every 1 second
-        if time.time() - self.last_check < 1.0:
+        """Apply a profile change published by the window watcher (never blocks)."""
+        profile = self.profile_updates.get(timeout=0)
+        if profile is None or profile == self.controller.current_profile:
             return
+        self.controller.set_profile(profile)
+        self.controller.reset_inputs()
+        self.controller.prepare(self.mapper.devices())
+        self.mapper.reset()  # Binding states only; the calibration carries over
 
-        try:
-            active_window = gw.getActiveWindow()
-            if active_window:
-                title = active_window.title
-                # Simple substring matching
-                found_profile = False
-                for game, profile in self.profiles.items():
-                    if game.lower() in title.lower():
-                        if self.controller.current_profile != profile:
-                            self.controller.set_profile(profile)
-                            self.controller.reset_inputs()
-                            self.neutral_height = None # Reset WASD neutral point
-                        found_profile = True
-                        break
-                
-                # If no specific profile found, switch to default if not already
-                if not found_profile and self.controller.current_profile != "default":
-                     self.controller.set_profile("default")
-                     self.controller.reset_inputs()
-                
-        except Exception as e:
-            pass
-            
-        self.last_check = time.time()
+    def _mark(self, milestone):
+        if milestone not in self.startup:
+            self.startup[milestone] = (time.perf_counter() - T_START) * 1000
+
+    def _report_startup(self):
+        self._mark("first_action")
+        if self.engine.ready_at is not None:
+            self.startup["model_ready"] = (self.engine.ready_at - T_START) * 1000
+        order = ("camera_open", "first_frame", "model_ready", "first_action")
+        print(">> STARTUP | " + " | ".join(f"{k}={self.startup[k]:.0f}ms" for k in order if k in self.startup))
+        self._startup_reported = True
+
+    def handle_key(self, key):
+        """Preview window keys; returns True when the client should exit."""
+        if key == ord('p'):
+            self.profiler.toggle()
+        elif key == ord('c'):
+            cursor = self.controller.cursor
+            if cursor is not None and cursor.last_raw is not None:
+                cursor.transform.calibrate(*cursor.last_raw)
+        elif key == ord('k'):
+            self.mapper.recalibrate()
+        return key == 27
+
+    def draw_hud(self, frame, result):
+        """Landmarks + mode banner for the preview window."""
+        if result is not None:
+            with self.profiler.span("draw_landmarks"):
+                self.engine.draw_landmarks(frame, result)
+        table = self.mapper.table()
+        if table is not None:
+            cv2.putText(frame, table.banner, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, table.color, 2)
+        if table is not None and table.cursor is not None and self.controller.cursor is not None:
+            # Reach box of the pointing hand ('c' at top-left then bottom-right to recalibrate)
+            h, w = frame.shape[:2]
+            x0, y0, x1, y1 = self.controller.cursor.transform.box
+            cv2.rectangle(frame, (int(x0 * w), int(y0 * h)), (int(x1 * w), int(y1 * h)), (255, 200, 0), 1)
+        if self.engine.roi is not None:
+            scale = frame.shape[1] / self.engine.roi_dims[0]
+            x0, y0, x1, y1 = (int(v * scale) for v in self.engine.roi)
+            cv2.rectangle(frame, (x0, y0), (x1, y1), (255, 255, 0), 1)
+        cv2.putText(frame, f"{self.governor.describe()} {self.governor.frame_ms:.0f}ms",
+                    (10, frame.shape[0] - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (200, 200, 200), 1)
+        if self.engine.load_error is not None:
+            cv2.putText(frame, "HAND MODEL FAILED TO LOAD - EXITING", (10, 60),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            cv2.putText(frame, str(self.engine.load_error)[:90], (10, 85),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 1)
+        elif not self.engine.ready.is_set():
+            cv2.putText(frame, "LOADING HAND MODEL...", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 200, 255), 2)
+        else:
+            calibrator = self.mapper.calibrator
+            if calibrator is not None:
+                cv2.putText(frame, calibrator.prompt, (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        if self.profiler.enabled:
+            self.profiler.overlay(frame)
+
+    def draw_thumbnail(self, frame, result, width=320):
+        """Small mirrored preview for headless mode; the full frame is never flipped or drawn on."""
+        h, w = frame.shape[:2]
+        thumb = cv2.resize(frame, (width, int(h * width / w)), interpolation=cv2.INTER_NEAREST)
+        if not self.engine.flip_frame:
+            thumb = cv2.flip(thumb, 1)  # landmarks are already in the mirrored view
+        if result is not None:
+            self.engine.draw_landmarks(thumb, result)
+        table = self.mapper.table()
+        if table is not None:
+            cv2.putText(thumb, table.banner, (5, 15), cv2.FONT_HERSHEY_PLAIN, 1.0, table.color, 1)
+        return thumb
+
+    def present(self, frame, result):
+        """Show a frame (None = nothing new) and poll for exit; returns True to quit.
+
+        Headless mode skips the HUD and full-rate preview entirely and at most
+        shows a thumbnail every preview_interval seconds.
+        """
+        if self.headless:
+            now = time.perf_counter()
+            if frame is None or self.preview_interval is None or now < self._next_preview:
+                return self.quit_event.is_set()
+            self._next_preview = now + self.preview_interval
+            frame = self.draw_thumbnail(frame, result)
+        elif frame is not None:
+            self.draw_hud(frame, result)
+        if frame is not None:
+            with self.profiler.span("imshow"):
+                cv2.imshow("HandsFreePlay Client", frame)
+        with self.profiler.span("waitKey"):
+            key = cv2.waitKey(1) & 0xFF
+        return self.handle_key(key) or self.quit_event.is_set()
 
     def run(self):
+        try:
+            if self.pipelined:
+                self._run_pipelined()
+            else:
+                self._run_serial()
+        except KeyboardInterrupt:
+            print(">> INTERRUPTED")
+
+        # Cleanup
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.controller.close()
+        if self.telemetry is not None:
+            self.telemetry.stop()
+        self.cap.release()
+        cv2.destroyAllWindows()
+        self.stats.report(">> FINAL LATENCY")
+        if self.recorder is not None:
+            self.recorder.save()
+        print(f">> OPERATING POINT | {self.governor.operating_point()}")
+        toggles, suppressed = self.mapper.chatter()
+        print(f">> CHATTER | toggles={toggles} suppressed={suppressed}")
+        tracker = self.engine.tracker
+        if tracker is not None:
+            print(f">> TRACKING | hand-frames coasted={tracker.coasted} side changes={tracker.side_changes}")
+        if self.pipelined:
+            print(f">> BUFFER SETS | capture={self.capture_pool.depth} engine={self.engine.pool.depth} "
+                  f"(preallocated {PIPELINE_BUFFERS}; more means every set was in use at once)")
+        if self.engine.roi_tracking:
+            print(f">> ROI | crop_frames={self.engine.roi_frames} full_frames={self.engine.full_frames}")
+        cursor = self.controller.cursor
+        if cursor is not None:
+            print(f">> CURSOR | camera samples={cursor.samples} pointer moves={cursor.updates}")
+        self.profiler.report()
+        if self.profile_out:
+            self.profiler.export(self.profile_out)
+        if self.engine.load_error is not None:
+            print(f">> FAIL | hand model did not load: {self.engine.load_error!r}")
+            return 1
+        if self.alloc_check is not None:
+            return 0 if self.alloc_check.report() else 1
+        return 0
+
+    def _load_failed(self):
+        """True once a failed model load has been on screen long enough to read (at once headless)."""
+        if self.engine.load_error is None:
+            return False
+        now = time.perf_counter()
+        if self._load_failed_at is None:
+            self._load_failed_at = now
+        return self.headless or now - self._load_failed_at >= LOAD_ERROR_SECONDS
+
+    def _infer(self, frame, t_frame):
+        """Run hand inference unless the governor skips this frame.
+
+        Returns (result, display_frame, features); result and features are
+        None on skipped frames.
+        """
+        if not self.governor.should_infer():
+            return None, self.engine.skip_frame(frame), None
+        with self.profiler.span("process_frame"):
+            result, frame = self.engine.process_frame(frame, self.governor.infer_size(frame))
+        with self.profiler.span("extract_features"):
+            features = self.engine.extract_features(result, t_frame)
+        if self.recorder is not None:
+            # Here, on the inference thread: the next frame replaces raw_landmarks
+            self.recorder.add(t_frame, *self.engine.raw_landmarks)
+        return result, frame, features
+
+    def _actuate(self, t_frame, features):
+        """Apply one frame's features; returns the finish time."""
+        t0 = time.perf_counter()
+        with self.profiler.span("mapper.apply"):
+            self.mapper.apply(features)
+        with self.profiler.span("controller.flush"):
+            self.controller.flush()
+        if self.telemetry is not None:
+            self.telemetry.frame()
+        t1 = time.perf_counter()
+        self.stats.add("actuation", t1 - t0)
+        self.stats.add("glass_to_key", t1 - t_frame)
+        if not self._startup_reported and self.engine.ready.is_set():
+            self._report_startup()  # first frame that ran through the real model
+        return t1
+
+    def _read_frame(self):
+        """cap.read() into a reused buffer; returns (success, frame, its buffer set)."""
+        buffers = self.capture_pool.next()
+        success, frame = self.cap.read(buffers.peek("capture"))
+        if success:
+            buffers.keep("capture", frame)
+        else:
+            buffers.release()
+        return success, frame, buffers
+
+    def _run_serial(self):
+        reporter = PeriodicReporter(self.stats)
         while True:
-            self.auto_switch_profile()
-            
-            success, frame = self.cap.read()
+            with self.profiler.span("auto_switch_profile"):
+                self.auto_switch_profile()
+
+            t0 = time.perf_counter()
+            with self.profiler.span("capture"):
+                success, frame, _ = self._read_frame()
             if not success:
                 break
+            t_frame = time.perf_counter()
+            self.stats.add("capture", t_frame - t0)
+            self._mark("first_frame")
+
+            result, frame, features = self._infer(frame, t_frame)
+            t1 = t2 = time.perf_counter()
+            if features is not None:
+                self.stats.add("inference", t1 - t_frame)
+                t2 = self._actuate(t_frame, features)
+                self.governor.record(t2 - t_frame)
+                self.last_result = result
 
-            result, frame = self.engine.process_frame(frame)
-            self.engine.draw_landmarks(frame, result)
-
-            left_hand = right_hand = None
-            if result.multi_handedness:
-                for idx, hand_meta in enumerate(result.multi_handedness):
-                    label = hand_meta.classification[0].label
-                    if label == "Left":
-                        left_hand = result.multi_hand_landmarks[idx]
-                    else:
-                        right_hand = result.multi_hand_landmarks[idx]
-
-            # --- CONTROL LOGIC BASED ON PROFILE ---
-            mode = self.controller.current_profile
-
-            if mode == "mouse" or mode == "default":
-                # Logic: Left Hand = Left Click, Right Hand = Right Click
-                left_closed = self.engine.is_hand_closed(left_hand.landmark) if left_hand else False
-                right_closed = self.engine.is_hand_closed(right_hand.landmark) if right_hand else False
-                self.controller.handle_mouse_clicks(left_closed, right_closed)
-                
-                cv2.putText(frame, "MODE: MOUSE (Click Enabled)", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-
-            elif mode == "fps":
-                # Logic: Both Hands for WASD
-                if left_hand and right_hand:
-                    l_tilt, l_height = self.engine.get_hand_tilt_and_height(left_hand.landmark)
-                    r_tilt, r_height = self.engine.get_hand_tilt_and_height(right_hand.landmark)
-                    
-                    avg_tilt = (l_tilt + r_tilt) / 2
-                    avg_height = (l_height + r_height) / 2
-
-                    if self.neutral_height is None:
-                        self.neutral_height = avg_height
-                        cv2.putText(frame, "CALIBRATING...", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                    else:
-                        self.controller.handle_wasd(avg_tilt, avg_height, self.neutral_height)
-
-                cv2.putText(frame, "MODE: FPS (WASD)", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-
-            elif mode == "racing":
-                # Logic: Single or Double hand steering
-                if right_hand or left_hand:
-                    hand_to_use = right_hand if right_hand else left_hand
-                    angle = self.engine.get_steering_angle(hand_to_use)
-                    self.controller.handle_steering(angle)
-                
-                cv2.putText(frame, "MODE: RACING (Steer)", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 255), 2)
-
-            cv2.imshow("HandsFreePlay Client", frame)
-
-            if cv2.waitKey(1) & 0xFF == 27:
+            quit_requested = self.present(frame, self.last_result)
+            self.stats.add("display", time.perf_counter() - t2)
+            reporter.tick()
+
+            if quit_requested or self._load_failed():
+                break
+            # Steady state only starts once the hand model is running
+            if self.alloc_check is not None and self.engine.ready.is_set() and self.alloc_check.tick():
                 break
 
-        # Cleanup
-        self.controller.reset_inputs()
-        self.cap.release()
-        cv2.destroyAllWindows()
+    # --- PIPELINED MODE ---
+    # capture -> inference -> actuation each run on their own thread, joined by
+    # single-slot queues so stale frames are dropped instead of queued. The
+    # preview stays on the main thread (OpenCV GUI calls are not thread safe)
+    # and only ever gets the newest processed frame. Each item carries the
+    # buffer sets its frame lives in; whoever consumes or drops it releases them.
+
+    def _capture_loop(self):
+        while not self.stop_event.is_set():
+            t0 = time.perf_counter()
+            with self.profiler.span("capture"):
+                success, frame, captured = self._read_frame()
+            if not success:
+                self.stop_event.set()
+                break
+            t_frame = time.perf_counter()
+            self.stats.add("capture", t_frame - t0)
+            self._mark("first_frame")
+            self.frame_slot.put((t_frame, frame, (captured,)))
+
+    def _inference_loop(self):
+        while not self.stop_event.is_set():
+            item = self.frame_slot.get(timeout=0.1)
+            if item is None:
+                continue
+            t_frame, frame, (captured,) = item
+            t0 = time.perf_counter()
+            result, frame, features = self._infer(frame, t_frame)
+            buffers = self.engine.frame_buffers  # mirrored frame, landmarks, features
+            if features is not None:
+                elapsed = time.perf_counter() - t0
+                self.stats.add("inference", elapsed)
+                self.governor.record(elapsed)
+                self.result_slot.put((t_frame, features, (buffers.retain(),)))
+                self.last_result = result
+            # Headless, the preview frame is the capture buffer itself
+            self.display_slot.put((frame, self.last_result, (captured, buffers)))
+            if self.alloc_check is not None and self.engine.ready.is_set() and self.alloc_check.tick():
+                self.stop_event.set()
+
+    def _actuation_loop(self):
+        while not self.stop_event.is_set():
+            with self.profiler.span("auto_switch_profile"):
+                self.auto_switch_profile()
+            item = self.result_slot.get(timeout=0.1)
+            if item is None:
+                continue
+            t_frame, features, _ = item
+            self._actuate(t_frame, features)
+            _release_frame(item)
+
+    def _run_pipelined(self):
+        self.stop_event = threading.Event()
+        self.frame_slot = LatestSlot(on_drop=_release_frame)
+        self.result_slot = LatestSlot(on_drop=_release_frame)
+        self.display_slot = LatestSlot(on_drop=_release_frame)
+
+        workers = [
+            threading.Thread(target=self._capture_loop, name="capture", daemon=True),
+            threading.Thread(target=self._inference_loop, name="inference", daemon=True),
+            threading.Thread(target=self._actuation_loop, name="actuation", daemon=True),
+        ]
+        for t in workers:
+            t.start()
+
+        reporter = PeriodicReporter(self.stats)
+        try:
+            while not self.stop_event.is_set():
+                item = self.display_slot.get(timeout=0.1)
+                frame, result, _ = item if item is not None else (None, None, None)
+                t0 = time.perf_counter()
+                if self.present(frame, result) or self._load_failed():
+                    self.stop_event.set()
+                if item is not None:
+                    _release_frame(item)
+                    self.stats.add("display", time.perf_counter() - t0)
+                reporter.tick(f">> DROPPED | frames={self.frame_slot.dropped} "
+                              f"results={self.result_slot.dropped}")
+        finally:
+            self.stop_event.set()
+            for t in workers:
+                t.join(timeout=1.0)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HandsFreePlay local client")
+    parser.add_argument("--pipelined", action="store_true",
+                        help="run capture, inference and actuation on separate threads")
+    parser.add_argument("--roi", action="store_true",
+                        help="run hand inference on a crop around the last known hands; saves only "
+                             "per-pixel work, so it pays off at large --work-width (see bench_roi.py)")
+    parser.add_argument("--width", type=int, default=1280, help="requested capture width")
+    parser.add_argument("--height", type=int, default=720, help="requested capture height")
+    parser.add_argument("--fps", type=int, default=60, help="requested capture FPS")
+    parser.add_argument("--work-width", type=int, default=640,
+                        help="max frame width passed to hand inference")
+    parser.add_argument("--budget-ms", type=float, default=25.0,
+                        help="per-frame latency budget before the governor degrades quality")
+    parser.add_argument("--record", metavar="PATH",
+                        help="save detected landmarks to PATH (.npz) for replay.py")
+    parser.add_argument("--backend", default="auto",
+                        choices=["auto", "pyautogui", "keyboard", "uinput", "stub"],
+                        help="input injection backend")
+    parser.add_argument("--steering", default="keys", choices=["keys", "pwm", "gamepad"],
+                        help="racing output: on/off keys, PWM-modulated keys or virtual gamepad axis")
+    parser.add_argument("--no-smoothing", action="store_true", help="disable One Euro landmark filtering")
+    parser.add_argument("--predict-ms", type=float, default=0.0,
+                        help="extrapolate smoothed landmarks this far ahead to hide pipeline lag")
+    parser.add_argument("--hysteresis", type=float, default=0.25,
+                        help="release band as a fraction of each threshold (0 = plain thresholds)")
+    parser.add_argument("--telemetry", metavar="URL",
+                        help="stream live telemetry to the dashboard, e.g. ws://localhost:8000/ws/telemetry")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the hot-path profiler on (toggle with 'p' in the preview)")
+    parser.add_argument("--profile-out", metavar="PATH",
+                        help="on exit, write profiler spans/histograms to PATH (Chrome trace JSON)")
+    parser.add_argument("--headless", action="store_true",
+                        help="no preview window, HUD or frame mirroring (exit with the quit hotkey or Ctrl+C)")
+    parser.add_argument("--preview-fps", type=float, default=0.0,
+                        help="headless only: show a small thumbnail preview this many times per second")
+    parser.add_argument("--quit-hotkey", default="ctrl+shift+q",
+                        help="headless only: global hotkey that stops the client ('' to disable)")
+    parser.add_argument("--eager-start", action="store_true",
+                        help="load the hand model and all input backends before opening the camera "
+                             "(the old startup order, to compare time-to-first-action)")
+    parser.add_argument("--classifier", metavar="MODEL",
+                        help="gesture model from gesture_classifier.py train; bindings can use "
+                             "left/right.gesture.* probabilities")
+    parser.add_argument("--source", default="0",
+                        help="camera index, video file or stream URL to read frames from")
+    parser.add_argument("--mode", help="pin one profiles.json mode instead of following the active window")
+    parser.add_argument("--alloc-check", type=int, metavar="FRAMES",
+                        help="run FRAMES steady-state frames under tracemalloc, report heap growth "
+                             "and exit (non-zero if it exceeds the budget)")
+    parser.add_argument("--alloc-warmup", type=int, default=STATS_WINDOW,
+                        help=f"frames before --alloc-check starts (at least {STATS_WINDOW}, so the "
+                             "latency windows are full)")
+    parser.add_argument("--no-tracking", action="store_true",
+                        help="take left/right from MediaPipe's per-frame handedness instead of tracking hands")
+    parser.add_argument("--user", help="calibration profile to use (default: the login name)")
+    parser.add_argument("--calibration", default=CALIBRATION_PATH, metavar="PATH",
+                        help="file the per-user, per-camera calibrations are kept in")
+    parser.add_argument("--recalibrate", action="store_true",
+                        help="ignore the stored calibration and fit a new one (neutral pose, then fists)")
+    args = parser.parse_args(argv)
+    if args.alloc_check and args.alloc_warmup < STATS_WINDOW:
+        parser.error(f"--alloc-warmup must be at least {STATS_WINDOW}: the latency windows "
+                     "filling up would show as growth")
+
+    governor = CaptureGovernor(width=args.width, height=args.height, fps=args.fps,
+                               work_width=args.work_width, budget_ms=args.budget_ms)
+    client = HandsFreeClient(pipelined=args.pipelined, roi_tracking=args.roi, governor=governor,
+                             record_path=args.record, backend=args.backend,
+                             steering=args.steering, smoothing=not args.no_smoothing,
+                             predict_ms=args.predict_ms, hysteresis=args.hysteresis,
+                             telemetry_url=args.telemetry, profile=args.profile,
+                             profile_out=args.profile_out, headless=args.headless,
+                             preview_fps=args.preview_fps, quit_hotkey=args.quit_hotkey,
+                             eager_start=args.eager_start, classifier_path=args.classifier,
+                             source=int(args.source) if args.source.isdigit() else args.source,
+                             mode=args.mode, user=args.user, calibration_path=args.calibration,
+                             recalibrate=args.recalibrate, tracking=not args.no_tracking,
+                             alloc_check=AllocationCheck(args.alloc_check, args.alloc_warmup)
+                             if args.alloc_check else None)
+    return client.run()
+
 
 if __name__ == "__main__":
-    client = HandsFreeClient()
-    client.run()
+    sys.exit(main())
@@ -0,0 +1,254 @@
+"""Cursor control: a fingertip drives relative mouse motion.
+
+The camera delivers a fingertip position 30-60 times a second; moving the
+mouse only then makes the cursor jump. CursorOutput turns each sample into
+a target and a pointer thread walks the cursor toward it at display rate,
+spreading each camera step over the expected time to the next sample.
+Interpolating costs up to one camera interval of lag; `lead` wins part of
+it back by aiming that fraction of the last step past the target (it
+overshoots by at most that much when the hand stops, then settles):
+
+    sample -> ScreenTransform (camera box -> screen px) -> acceleration
+           -> target; pointer thread: interpolate -> ("pointer", "move", (dx, dy))
+
+Motion is relative (like a trackpad), so a hand that leaves the frame and
+comes back somewhere else does not teleport the cursor. Moves go through
+emit(batch), normally the controller's own injection path, as PwmSteering
+does for keys.
+
+    python cursor.py --bench   # pointer update rate and lag, jump vs interpolated
+"""
+import math
+import threading
+import time
+
+
+def screen_size(default=(1920, 1080)):
+    try:
+        import pyautogui
+        width, height = pyautogui.size()
+        return int(width), int(height)
+    except Exception:
+        print(f">> screen size unknown, assuming {default[0]}x{default[1]}")
+        return default
+
+
+class ScreenTransform:
+    """Maps a box of the (mirrored, normalized) camera image onto the screen.
+
+    The box is the comfortable reach of the pointing hand; calibrate it by
+    pointing at the top-left and then bottom-right corner and calling
+    calibrate() at each (the 'c' key in the client preview).
+    """
+
+    def __init__(self, box=(0.25, 0.2, 0.75, 0.7), screen=None):
+        self.box = tuple(box)
+        self.screen = tuple(screen) if screen else screen_size()
+        self._corner = None
+
+    def map(self, x, y):
+        x0, y0, x1, y1 = self.box
+        return ((x - x0) / (x1 - x0) * self.screen[0], (y - y0) / (y1 - y0) * self.screen[1])
+
+    def calibrate(self, x, y):
+        """Record one corner; returns True once both corners are set and the box is updated."""
+        if self._corner is None:
+            self._corner = (x, y)
+            print(f">> CURSOR CALIBRATION | top-left ({x:.2f}, {y:.2f}), now point at bottom-right")
+            return False
+        (ax, ay), self._corner = self._corner, None
+        if abs(x - ax) < 0.05 or abs(y - ay) < 0.05:
+            print(">> CURSOR CALIBRATION | corners too close, keeping the previous box")
+            return False
+        self.box = (min(ax, x), min(ay, y), max(ax, x), max(ay, y))
+        print(">> CURSOR CALIBRATION | box = ({:.2f}, {:.2f}, {:.2f}, {:.2f})".format(*self.box))
+        return True
+
+
+def accel_gain(speed, min_gain=0.6, max_gain=2.0, slow=200.0, fast=2000.0):
+    """Pointer acceleration: min_gain below `slow` px/s, ramping to max_gain at `fast`."""
+    if speed <= slow:
+        return min_gain
+    if speed >= fast:
+        return max_gain
+    u = (speed - slow) / (fast - slow)
+    return min_gain + (max_gain - min_gain) * u * u * (3 - 2 * u)  # smoothstep
+
+
+class CursorOutput:
+    """Relative mouse motion from fingertip samples, interpolated on its own thread.
+
+    rate=0 sends each camera step directly instead (no thread, no interpolation;
+    with a session clock this makes replayed event streams deterministic).
+    The thread starts with the first sample; stop() ends it until the next one.
+    """
+
+    def __init__(self, emit, box=(0.25, 0.2, 0.75, 0.7), screen=None, rate=240.0, lead=0.5,
+                 min_gain=0.6, max_gain=2.0, accel_slow=200.0, accel_fast=2000.0, clock=time.perf_counter):
+        self.emit = emit
+        self.transform = ScreenTransform(box, screen)
+        self.rate = rate
+        self.lead = lead
+        self.min_gain, self.max_gain = min_gain, max_gain
+        self.accel_slow, self.accel_fast = accel_slow, accel_fast
+        self.clock = clock
+        self.last_raw = None   # newest camera-space sample, for calibration
+        self._last = None      # (t, screen x, screen y) of the previous sample
+        self._interval = 1.0 / 30  # smoothed time between samples
+        self._target = (0.0, 0.0)  # accelerated virtual position, px
+        # Segment the pointer thread is walking: from start to target over duration from t0
+        self._segment = (0.0, 0.0, 0.0, 0.0, 0.0, self._interval)
+        self._emitted = (0.0, 0.0)  # position already sent (integer moves; remainder carries)
+        self.samples = 0
+        self.updates = 0  # move events sent, for reporting
+        self._stop = threading.Event()
+        self._thread = None
+
+    def update(self, x, y):
+        """Feed one fingertip sample in normalized camera coordinates."""
+        if self.rate > 0 and self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name="cursor", daemon=True)
+            self._thread.start()
+        now = self.clock()
+        self.last_raw = (x, y)
+        sx, sy = self.transform.map(x, y)
+        last, self._last = self._last, (now, sx, sy)
+        self.samples += 1
+        if last is None:
+            return  # first sample after (re)acquiring the hand only anchors
+        dt = max(now - last[0], 1e-3)
+        if dt < 0.25:
+            self._interval += 0.2 * (min(dt, 0.1) - self._interval)
+        dx, dy = sx - last[1], sy - last[2]
+        gain = accel_gain(math.hypot(dx, dy) / dt, self.min_gain, self.max_gain,
+                          self.accel_slow, self.accel_fast)
+        dx, dy = dx * gain, dy * gain
+        tx, ty = self._target[0] + dx, self._target[1] + dy
+        self._target = (tx, ty)
+        if self.rate <= 0:
+            self._send_to(tx, ty)
+        else:
+            # Start from where the cursor is now, so a late sample never jumps
+            px, py = self.position(now)
+            self._segment = (now, px, py, tx + dx * self.lead, ty + dy * self.lead, self._interval)
+
+    def release(self):
+        """Hand lost: the next sample re-anchors instead of moving."""
+        self._last = None
+
+    def position(self, now):
+        """Interpolated virtual position at time `now`."""
+        t0, x0, y0, x1, y1, duration = self._segment
+        u = min(1.0, (now - t0) / duration)
+        return x0 + (x1 - x0) * u, y0 + (y1 - y0) * u
+
+    def _send_to(self, x, y):
+        ex, ey = self._emitted
+        dx, dy = int(round(x - ex)), int(round(y - ey))
+        if dx or dy:
+            self._emitted = (ex + dx, ey + dy)
+            self.updates += 1
+            self.emit([("pointer", "move", (dx, dy))])
+
+    def _loop(self):
+        tick = 1.0 / self.rate
+        next_tick = self.clock()
+        while not self._stop.is_set():
+            self._send_to(*self.position(self.clock()))
+            next_tick += tick
+            delay = next_tick - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = self.clock()  # fell behind; don't try to catch up
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+
+# --- BENCHMARK ---
+# A fingertip tracing a circle is sampled at camera rate, each sample reaching
+# the cursor `pipeline_ms` after the moment it shows (capture + inference).
+# Gain is fixed at 1 so the cursor path can be compared with the hand path:
+# lag is the time shift that best aligns them.
+
+def _bench(seconds=4.0, fps=30.0, rate=240.0, pipeline_ms=40.0, default_lead=0.5):
+    screen = (1920, 1080)
+
+    def hand(t):
+        a = 2 * math.pi * 0.5 * t
+        return 0.5 + 0.2 * math.cos(a), 0.45 + 0.2 * math.sin(a)
+
+    for name, out_rate, lead in (("jump", 0.0, 0.0), ("interpolated", rate, 0.0),
+                                 (f"lead={default_lead}", rate, default_lead)):
+        moves = []
+        start = time.perf_counter()
+
+        def emit(batch, moves=moves):
+            for _, _, (dx, dy) in batch:
+                moves.append((time.perf_counter() - start, dx, dy))
+
+        cursor = CursorOutput(emit, box=(0.0, 0.0, 1.0, 1.0), screen=screen, rate=out_rate,
+                              lead=lead, min_gain=1.0, max_gain=1.0)
+        frame = 0
+        while True:
+            shown = frame / fps
+            due = shown + pipeline_ms / 1000.0
+            if shown > seconds:
+                break
+            delay = due - (time.perf_counter() - start)
+            if delay > 0:
+                time.sleep(delay)
+            cursor.update(*hand(shown))
+            frame += 1
+        time.sleep(0.1)
+        cursor.stop()
+
+        # Cursor path relative to its start vs. hand path relative to the first sample
+        hx0, hy0 = hand(0.0)
+        times, xs, ys = [], [], []
+        x = y = 0.0
+        for t, dx, dy in moves:
+            x += dx
+            y += dy
+            times.append(t)
+            xs.append(x)
+            ys.append(y)
+
+        def error(shift):
+            total, n = 0.0, 0
+            for t, cx, cy in zip(times, xs, ys):
+                if 0.5 < t < seconds:
+                    hx, hy = hand(max(0.0, t - shift))
+                    total += math.hypot(cx - (hx - hx0) * screen[0], cy - (hy - hy0) * screen[1])
+                    n += 1
+            return total / max(n, 1)
+
+        lag = min((s / 1000.0 for s in range(0, 200)), key=error)
+        steps = sorted(math.hypot(dx, dy) for _, dx, dy in moves)
+        gaps = sorted(b - a for a, b in zip(times, times[1:]))
+        print(f">> CURSOR {name:<12} | {len(moves) / seconds:6.1f} pointer updates/s | "
+              f"step p50={steps[len(steps) // 2]:.1f}px max={steps[-1]:.1f}px | "
+              f"gap p99={gaps[int(len(gaps) * 0.99)] * 1000:.1f}ms | "
+              f"end-to-end lag={lag * 1000:.0f}ms (residual {error(lag):.1f}px)")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Fingertip cursor output")
+    parser.add_argument("--bench", action="store_true", help="compare jump-per-frame with interpolated motion")
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--fps", type=float, default=30.0, help="simulated camera rate")
+    parser.add_argument("--rate", type=float, default=240.0, help="pointer thread rate")
+    parser.add_argument("--lead", type=float, default=0.5, help="lead for the third run")
+    parser.add_argument("--pipeline-ms", type=float, default=40.0,
+                        help="simulated capture-to-mapping latency of each sample")
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.seconds, args.fps, args.rate, args.pipeline_ms, args.lead)
+    else:
+        parser.print_help()
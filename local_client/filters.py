@@ -0,0 +1,83 @@
+"""Landmark smoothing and short-horizon prediction.
+
+Raw MediaPipe landmarks jitter by a few thousandths of the frame per frame,
+which is enough to make a threshold decision flip back and forth (key
+chatter) whenever a hand rests near a threshold. Thresholds themselves get
+hysteresis bands in bindings.py.
+"""
+import math
+
+import numpy as np
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """One Euro filter (Casiez et al.) applied elementwise to an array.
+
+    Low cutoff (heavy smoothing) while the hand is still, rising with speed so
+    fast motion is not lagged. Also tracks a smoothed velocity that predict()
+    uses to extrapolate a short horizon ahead.
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=8.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x = None
+        self.dx = None
+        self.t = None
+
+    def filter(self, x, t):
+        if self.x is None:
+            self.x = x.astype(np.float32, copy=True)
+            self.dx = np.zeros_like(self.x)
+            self.t = t
+            return self.x
+
+        dt = max(t - self.t, 1e-4)
+        dx = (x - self.x) / dt
+        self.dx += _alpha(self.d_cutoff, dt) * (dx - self.dx)
+
+        cutoff = self.min_cutoff + self.beta * np.abs(self.dx)
+        tau = 1.0 / (2.0 * math.pi * cutoff)
+        a = 1.0 / (1.0 + tau / dt)
+        self.x += a * (x - self.x)
+        self.t = t
+        return self.x
+
+    def predict(self, horizon):
+        """Extrapolate the filtered value `horizon` seconds ahead."""
+        return self.x + self.dx * horizon
+
+
+class LandmarkSmoother:
+    """Per-hand One Euro filtering of (21, 3) landmark arrays.
+
+    Hands are keyed by the identity the caller passes: HandTracker track ids
+    when a tracker runs (a corrected side swap then keeps each hand's own
+    state), handedness labels otherwise. A hand that disappears loses its
+    filter state so it does not glide in from its old position.
+    """
+
+    def __init__(self, min_cutoff=1.5, beta=8.0, predict_ms=0.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.horizon = predict_ms / 1000.0
+        self.filters = {}
+
+    def apply(self, batch, keys, t):
+        """Smooth (and optionally predict) a (hands, 21, 3) batch in place; keys name each row's hand."""
+        for key in list(self.filters):
+            if key not in keys:
+                del self.filters[key]
+        for i, key in enumerate(keys):
+            f = self.filters.get(key)
+            if f is None:
+                f = self.filters[key] = OneEuroFilter(self.min_cutoff, self.beta)
+            f.filter(batch[i], t)
+            batch[i] = f.predict(self.horizon) if self.horizon else f.x
+        return batch
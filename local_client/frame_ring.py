@@ -0,0 +1,216 @@
+"""Shared-memory frame ring for passing camera frames between processes.
+
+One producer (the capture side) writes frames into a fixed number of slots
+in a multiprocessing.shared_memory block; consumers in other processes get
+NumPy views straight onto the slot, so nothing is pickled or copied on the
+consumer side. Each slot carries a sequence number:
+
+    writer: seq[slot] = -1 -> fill pixels -> seq[slot] = n -> latest = n
+    reader: n = latest -> view slot n % slots -> ... -> valid(n)?
+
+A reader that is still using a slot when the writer laps the ring sees
+valid(n) turn False and should discard its result (newest frame wins
+anyway). Size the ring so that cannot happen in normal operation: at 60 fps
+and 4 slots the writer needs ~66 ms to come back around.
+
+    python frame_ring.py --bench   # vs. a multiprocessing.Queue of pickled frames
+"""
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+HEADER = 16  # int64 latest sequence number + padding, then per-slot headers
+SLOT_HEADER = 16  # int64 sequence number + float64 timestamp
+
+
+class FrameRing:
+    """Fixed-slot ring of equally shaped frames in shared memory."""
+
+    def __init__(self, shape, slots=4, dtype=np.uint8, name=None, create=True):
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.dtype = np.dtype(dtype)
+        frame_bytes = int(np.prod(self.shape)) * self.dtype.itemsize
+        size = HEADER + slots * SLOT_HEADER + slots * frame_bytes
+        self.shm = shared_memory.SharedMemory(name=name, create=create, size=size if create else 0)
+        # Only the creator unlinks; attach from processes it started (they share
+        # its resource tracker, which cleans up if the creator dies)
+        self.owner = create
+
+        buf = self.shm.buf
+        self._latest = np.ndarray((1,), dtype=np.int64, buffer=buf, offset=0)
+        self._seq = np.ndarray((slots,), dtype=np.int64, buffer=buf, offset=HEADER,
+                               strides=(SLOT_HEADER,))
+        self._time = np.ndarray((slots,), dtype=np.float64, buffer=buf, offset=HEADER + 8,
+                                strides=(SLOT_HEADER,))
+        base = HEADER + slots * SLOT_HEADER
+        self._frames = np.ndarray((slots,) + self.shape, dtype=self.dtype, buffer=buf, offset=base)
+        if create:
+            self._latest[0] = -1
+            self._seq[:] = -1
+        self._next = int(self._latest[0]) + 1
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def spec(self):
+        """What another process needs to attach: FrameRing(**spec, create=False)."""
+        return {"name": self.name, "shape": self.shape, "slots": self.slots, "dtype": self.dtype.str}
+
+    # --- producer ---
+
+    def claim(self):
+        """Return (seq, writable view) of the next slot, for cap.read(view) / cv2.resize(dst=view)."""
+        seq = self._next
+        slot = seq % self.slots
+        self._seq[slot] = -1  # invalidate before any pixel changes
+        return seq, self._frames[slot]
+
+    def publish(self, seq, timestamp):
+        slot = seq % self.slots
+        self._time[slot] = timestamp
+        self._seq[slot] = seq
+        self._latest[0] = seq
+        self._next = seq + 1
+
+    def write(self, frame, timestamp):
+        """Copy a frame in (the one copy on the producer side) and publish it."""
+        seq, view = self.claim()
+        np.copyto(view, frame)
+        self.publish(seq, timestamp)
+        return seq
+
+    # --- consumer ---
+
+    @property
+    def latest(self):
+        return int(self._latest[0])
+
+    def read(self, seq=None):
+        """(seq, timestamp, view) of frame `seq` (newest by default), or None if not available.
+
+        The view aliases shared memory: check valid(seq) after using it.
+        """
+        if seq is None:
+            seq = self.latest
+        if seq < 0:
+            return None
+        slot = seq % self.slots
+        if self._seq[slot] != seq:
+            return None
+        return seq, float(self._time[slot]), self._frames[slot]
+
+    def valid(self, seq):
+        """True while frame `seq` has not been overwritten."""
+        return self._seq[seq % self.slots] == seq
+
+    def close(self):
+        # Views must go before the mapping can be closed
+        self._latest = self._seq = self._time = self._frames = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:  # an attacher's own resource tracker got there first
+                pass
+
+
+# --- MICROBENCHMARK ---
+# Producer process -> consumer process at a fixed frame size, comparing a
+# multiprocessing.Queue of pickled frames with the ring. The consumer reads
+# a strided sample of each frame so both paths actually touch the pixels.
+
+def _produce_queue(q, shape, frames):
+    frame = np.random.randint(0, 255, shape, dtype=np.uint8)
+    for _ in range(frames):
+        q.put((time.perf_counter(), frame))
+    q.put(None)
+
+
+def _produce_ring(spec, ready, frames):
+    ring = FrameRing(spec["shape"], spec["slots"], name=spec["name"], create=False)
+    frame = np.random.randint(0, 255, spec["shape"], dtype=np.uint8)
+    for _ in range(frames):
+        ring.write(frame, time.perf_counter())
+        ready.set()  # producer is unthrottled: the ring drops frames the consumer skips
+    ring.write(frame, -1.0)  # end marker
+    ready.set()
+    ring.close()
+
+
+def _bench(shape, frames, slots):
+    import multiprocessing
+    ctx = multiprocessing.get_context("spawn")
+    frame_bytes = int(np.prod(shape))
+    results = {}
+
+    q = ctx.Queue(maxsize=slots)
+    producer = ctx.Process(target=_produce_queue, args=(q, shape, frames))
+    producer.start()
+    got, latency, touched = 0, [], 0
+    start = None
+    while True:
+        item = q.get()
+        if item is None:
+            break
+        start = start or time.perf_counter()
+        t, frame = item
+        touched += int(frame[::64, ::64].sum())
+        latency.append(time.perf_counter() - t)
+        got += 1
+    elapsed = time.perf_counter() - start
+    producer.join()
+    # pickle on put + unpickle on get, each a full copy
+    results["queue"] = (got / elapsed, 2 * frame_bytes, sorted(latency), got)
+
+    ring = FrameRing(shape, slots)
+    ready = ctx.Event()
+    producer = ctx.Process(target=_produce_ring, args=(ring.spec(), ready, frames))
+    producer.start()
+    got, latency, last = 0, [], -1
+    start = None
+    while True:
+        ready.wait(1.0)
+        ready.clear()
+        item = ring.read()
+        if item is None or item[0] == last:
+            continue
+        seq, t, view = item
+        if t < 0:
+            break
+        start = start or time.perf_counter()
+        touched += int(view[::64, ::64].sum())
+        if ring.valid(seq):
+            latency.append(time.perf_counter() - t)
+            got += 1
+        last = seq
+    elapsed = time.perf_counter() - start
+    producer.join()
+    ring.close()
+    # one copy into the slot on the producer side; the consumer reads in place
+    results["ring"] = (got / elapsed, frame_bytes, sorted(latency), got)
+
+    print(f">> FRAME TRANSPORT | {shape[1]}x{shape[0]} BGR ({frame_bytes / 1e6:.2f} MB/frame), "
+          f"{frames} frames, {slots} slots/queue depth")
+    for name, (fps, copied, lat, n) in results.items():
+        p50 = lat[len(lat) // 2] * 1000
+        p99 = lat[min(len(lat) - 1, int(len(lat) * 0.99))] * 1000
+        print(f">> {name:<6} | {fps:8.1f} frames/s | {copied / 1e6:5.2f} MB copied/frame | "
+              f"latency p50={p50:.2f}ms p99={p99:.2f}ms | delivered {n}/{frames}")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Shared-memory frame ring")
+    parser.add_argument("--bench", action="store_true", help="compare with a pickling queue")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--slots", type=int, default=4)
+    args = parser.parse_args()
+    if args.bench:
+        _bench((args.height, args.width, 3), args.frames, args.slots)
+    else:
+        parser.print_help()
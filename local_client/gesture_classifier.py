@@ -0,0 +1,316 @@
+"""Learned gesture classifier over short windows of hand landmarks.
+
+A small NumPy MLP (one ReLU hidden layer, softmax output) scores the last
+`window` frames of each hand. Windows are normalized before scoring, so the
+model sees hand shape and motion rather than where the hand is or how far it
+is from the camera:
+
+    origin  wrist of the newest frame
+    scale   mean wrist -> middle-finger MCP distance over the window
+    mirror  left hands are flipped onto right hands (x -> -x)
+
+At runtime every hand of a frame is classified in one batched pass, and the
+class probabilities become binding features (left.gesture.fist, ...):
+
+    {"feature": "left.gesture.fist", "op": ">", "on": 0.7, "action": {"mouse": "left"}}
+
+Train from sessions recorded with client.py --record, one gesture per file:
+
+    python gesture_classifier.py train --data fist=fist.npz --data open=open.npz \\
+        --data point=point.npz --out gestures.npz
+    python gesture_classifier.py eval --model gestures.npz --data fist=fist2.npz ...
+    python gesture_classifier.py bench --model gestures.npz --budget-ms 0.5
+    python client.py --classifier gestures.npz
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from recording import Session
+
+# Binding vocabulary: a model may be trained on any subset of these
+GESTURES = ("open", "fist", "point", "pinch", "thumbs_up")
+GESTURE_INDEX = {name: i for i, name in enumerate(GESTURES)}
+
+WRIST = 0
+MIDDLE_MCP = 9
+SIDE_CODES = {"Left": 0, "Right": 1}
+
+
+def normalize_windows(windows, sides):
+    """(N, T, 21, 3) landmark windows -> (N, T*63) float32 model inputs.
+
+    sides (N,) holds 0 for left hands and 1 for right hands.
+    """
+    origin = windows[:, -1:, WRIST:WRIST + 1, :]
+    centered = windows - origin
+    size = np.linalg.norm(windows[:, :, MIDDLE_MCP, :2] - windows[:, :, WRIST, :2], axis=2).mean(axis=1)
+    centered /= np.maximum(size, 1e-6)[:, None, None, None]
+    centered[sides == 0, :, :, 0] *= -1.0
+    return centered.reshape(len(windows), -1).astype(np.float32, copy=False)
+
+
+def session_windows(session, window):
+    """All (window, 21, 3) runs where one hand stays in frame, with their side codes."""
+    out, sides = [], []
+    for side in (0, 1):
+        slot = session.labels == side  # (frames, MAX_HANDS)
+        present = slot.any(axis=1)
+        points = session.points[np.arange(len(session)), slot.argmax(axis=1)]
+        if len(points) < window:
+            continue
+        views = np.lib.stride_tricks.sliding_window_view(points, window, axis=0)  # (n, 21, 3, T)
+        full = np.lib.stride_tricks.sliding_window_view(present, window).all(axis=1)
+        if full.any():
+            out.append(np.moveaxis(views[full], -1, 1))
+            sides.append(np.full(int(full.sum()), side, dtype=np.int8))
+    if not out:
+        return np.empty((0, window, 21, 3), dtype=np.float32), np.empty(0, dtype=np.int8)
+    return np.concatenate(out).astype(np.float32), np.concatenate(sides)
+
+
+def load_dataset(specs, window, test_split=0.0):
+    """Build (x, y) train and test arrays from GESTURE=PATH specs.
+
+    The last test_split of each file's windows (in time) is held out, so test
+    windows never overlap the frames a training window was cut from.
+    """
+    train_x, train_y, test_x, test_y = [], [], [], []
+    for spec in specs:
+        gesture, _, path = spec.partition("=")
+        if gesture not in GESTURE_INDEX:
+            raise ValueError(f"unknown gesture {gesture!r} (have: {', '.join(GESTURES)})")
+        windows, sides = session_windows(Session(path), window)
+        x = normalize_windows(windows, sides)
+        y = np.full(len(x), GESTURE_INDEX[gesture], dtype=np.int64)
+        # Split each side in time, leaving a window-sized gap so no frame is shared
+        for side in (0, 1):
+            idx = np.flatnonzero(sides == side)
+            n_test = min(len(idx), int(round(len(idx) * test_split)))
+            train_idx = idx[:max(0, len(idx) - n_test - window)] if n_test else idx
+            test_idx = idx[len(idx) - n_test:]
+            train_x.append(x[train_idx])
+            train_y.append(y[train_idx])
+            test_x.append(x[test_idx])
+            test_y.append(y[test_idx])
+        print(f">> DATA | {gesture:<10} {path}: {len(x)} windows")
+    return (np.concatenate(train_x), np.concatenate(train_y),
+            np.concatenate(test_x), np.concatenate(test_y))
+
+
+class GestureClassifier:
+    """MLP weights plus the per-hand landmark windows it scores at runtime."""
+
+    def __init__(self, w1, b1, w2, b2, mean, std, classes, window):
+        self.w1, self.b1, self.w2, self.b2 = (np.asarray(a, dtype=np.float32) for a in (w1, b1, w2, b2))
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.inv_std = (1.0 / np.asarray(std, dtype=np.float32)).astype(np.float32)
+        self.classes = list(classes)
+        self.window = int(window)
+        # model output column -> GESTURES column
+        self.columns = np.array([GESTURE_INDEX[c] for c in self.classes])
+
+        # --- RUNTIME STATE ---
+        # Newest `window` frames per side; a side that drops out starts over
+        self._buffer = np.zeros((2, self.window, 21, 3), dtype=np.float32)
+        self._filled = [False, False]
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            model = cls(data["w1"], data["b1"], data["w2"], data["b2"], data["mean"], data["std"],
+                        [str(c) for c in data["classes"]], int(data["window"]))
+        print(f">> GESTURE MODEL {path} | window={model.window} hidden={model.w1.shape[1]} "
+              f"classes={','.join(model.classes)}")
+        return model
+
+    def save(self, path):
+        np.savez(path, w1=self.w1, b1=self.b1, w2=self.w2, b2=self.b2, mean=self.mean,
+                 std=1.0 / self.inv_std, classes=np.array(self.classes), window=self.window)
+        print(f">> GESTURE MODEL saved to {path}")
+
+    def predict(self, x):
+        """(N, T*63) normalized inputs -> (N, classes) probabilities."""
+        h = (x - self.mean) * self.inv_std
+        h = h @ self.w1
+        h += self.b1
+        np.maximum(h, 0.0, out=h)
+        logits = h @ self.w2
+        logits += self.b2
+        logits -= logits.max(axis=1, keepdims=True)
+        np.exp(logits, out=logits)
+        logits /= logits.sum(axis=1, keepdims=True)
+        return logits
+
+    def reset(self):
+        self._filled = [False, False]
+
+    def classify(self, points, labels):
+        """Push one frame's (hands, 21, 3) batch; return (hands, len(GESTURES)) probabilities.
+
+        Gestures the model was not trained on score 0.
+        """
+        out = np.zeros((len(labels), len(GESTURES)), dtype=np.float32)
+        sides = np.array([SIDE_CODES.get(label, 1) for label in labels], dtype=np.int8)
+        for side in (0, 1):
+            if side not in sides:
+                self._filled[side] = False
+        if not len(labels):
+            return out
+        buf = self._buffer
+        pushed = set()
+        for i, side in enumerate(sides):
+            if side in pushed:  # two hands with one label share that side's window
+                continue
+            pushed.add(side)
+            if self._filled[side]:
+                buf[side, :-1] = buf[side, 1:]
+                buf[side, -1] = points[i]
+            else:
+                buf[side] = points[i]  # repeat the first frame until the window fills
+                self._filled[side] = True
+        out[:, self.columns] = self.predict(normalize_windows(buf[sides], sides))
+        return out
+
+
+# --- TRAINING ---
+
+def train(x, y, classes, window, hidden=64, epochs=60, batch=128, lr=3e-3, weight_decay=1e-4, seed=0):
+    """Fit the MLP with mini-batch Adam on cross-entropy; y indexes into GESTURES."""
+    rng = np.random.default_rng(seed)
+    remap = np.full(len(GESTURES), -1)
+    remap[[GESTURE_INDEX[c] for c in classes]] = np.arange(len(classes))
+    target = remap[y]
+    mean = x.mean(axis=0)
+    std = x.std(axis=0) + 1e-3
+    xn = ((x - mean) / std).astype(np.float32)
+
+    d, k = x.shape[1], len(classes)
+    params = [rng.normal(0, np.sqrt(2.0 / d), (d, hidden)).astype(np.float32), np.zeros(hidden, np.float32),
+              rng.normal(0, np.sqrt(1.0 / hidden), (hidden, k)).astype(np.float32), np.zeros(k, np.float32)]
+    m = [np.zeros_like(p) for p in params]
+    v = [np.zeros_like(p) for p in params]
+    step = 0
+    for epoch in range(epochs):
+        order = rng.permutation(len(xn))
+        loss_sum = 0.0
+        for start in range(0, len(order), batch):
+            idx = order[start:start + batch]
+            xb, tb = xn[idx], target[idx]
+            w1, b1, w2, b2 = params
+            pre = xb @ w1 + b1
+            h = np.maximum(pre, 0.0)
+            logits = h @ w2 + b2
+            logits -= logits.max(axis=1, keepdims=True)
+            p = np.exp(logits)
+            p /= p.sum(axis=1, keepdims=True)
+            loss_sum += -np.log(p[np.arange(len(tb)), tb] + 1e-9).sum()
+
+            g = p
+            g[np.arange(len(tb)), tb] -= 1.0
+            g /= len(tb)
+            gh = (g @ w2.T) * (pre > 0)
+            grads = [xb.T @ gh + weight_decay * w1, gh.sum(axis=0), h.T @ g + weight_decay * w2, g.sum(axis=0)]
+            step += 1
+            for i, grad in enumerate(grads):
+                m[i] = 0.9 * m[i] + 0.1 * grad
+                v[i] = 0.999 * v[i] + 0.001 * grad * grad
+                params[i] -= lr * (m[i] / (1 - 0.9 ** step)) / (np.sqrt(v[i] / (1 - 0.999 ** step)) + 1e-8)
+        if epoch % 10 == 0 or epoch == epochs - 1:
+            print(f">> EPOCH {epoch + 1:>3}/{epochs} | loss={loss_sum / len(xn):.4f}")
+    return GestureClassifier(*params, mean, std, classes, window)
+
+
+def evaluate(model, x, y):
+    """Print accuracy and a confusion matrix; return accuracy."""
+    if not len(x):
+        print(">> EVAL | no windows")
+        return 0.0
+    pred = model.columns[model.predict(x).argmax(axis=1)]
+    accuracy = float((pred == y).mean())
+    print(f">> EVAL | accuracy={accuracy * 100:.1f}% on {len(x)} windows")
+    names = [g for g in GESTURES if g in model.classes or GESTURE_INDEX[g] in y]
+    print("   true \\ pred " + "".join(f"{n:>10}" for n in names))
+    for true in names:
+        row = pred[y == GESTURE_INDEX[true]]
+        print(f"   {true:<12} " + "".join(f"{int((row == GESTURE_INDEX[n]).sum()):>10}" for n in names))
+    return accuracy
+
+
+# --- BENCHMARK ---
+
+def bench(model, hands=2, frames=5000):
+    """Per-frame classify() cost on random landmarks; returns (p50_ms, p99_ms)."""
+    rng = np.random.default_rng(0)
+    points = rng.random((frames, hands, 21, 3), dtype=np.float32)
+    labels = ["Left", "Right"][:hands]
+    model.reset()
+    times = np.empty(frames)
+    for i in range(frames):
+        t0 = time.perf_counter()
+        model.classify(points[i], labels)
+        times[i] = time.perf_counter() - t0
+    times *= 1000
+    p50, p99 = float(np.percentile(times, 50)), float(np.percentile(times, 99))
+    print(f">> CLASSIFIER COST | {hands} hands, window={model.window}, hidden={model.w1.shape[1]} | "
+          f"p50={p50:.3f}ms p99={p99:.3f}ms mean={times.mean():.3f}ms over {frames} frames")
+    return p50, p99
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train, evaluate and benchmark the gesture classifier")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_train = sub.add_parser("train", help="fit a model on recorded sessions")
+    p_train.add_argument("--data", action="append", required=True, metavar="GESTURE=PATH",
+                         help=f"session recorded while holding one gesture ({', '.join(GESTURES)}); repeat")
+    p_train.add_argument("--out", default="gestures.npz", help="where to save the model")
+    p_train.add_argument("--window", type=int, default=4, help="frames per classified window")
+    p_train.add_argument("--hidden", type=int, default=64, help="hidden layer width")
+    p_train.add_argument("--epochs", type=int, default=60)
+    p_train.add_argument("--lr", type=float, default=3e-3)
+    p_train.add_argument("--test-split", type=float, default=0.2,
+                         help="fraction of each session (its end) held out for evaluation")
+
+    p_eval = sub.add_parser("eval", help="score a model on recorded sessions")
+    p_eval.add_argument("--model", required=True)
+    p_eval.add_argument("--data", action="append", required=True, metavar="GESTURE=PATH")
+
+    p_bench = sub.add_parser("bench", help="measure per-frame runtime cost")
+    p_bench.add_argument("--model", help="trained model (default: random weights of the default size)")
+    p_bench.add_argument("--hands", type=int, default=2)
+    p_bench.add_argument("--frames", type=int, default=5000)
+    p_bench.add_argument("--budget-ms", type=float, default=0.5,
+                         help="exit non-zero if per-frame p99 exceeds this")
+    args = parser.parse_args()
+
+    if args.command == "train":
+        x, y, tx, ty = load_dataset(args.data, args.window, args.test_split)
+        classes = [g for g in GESTURES if GESTURE_INDEX[g] in y]
+        print(f">> TRAIN | {len(x)} train / {len(tx)} test windows, classes={','.join(classes)}")
+        model = train(x, y, classes, args.window, hidden=args.hidden, epochs=args.epochs, lr=args.lr)
+        evaluate(model, tx, ty)
+        model.save(args.out)
+    elif args.command == "eval":
+        model = GestureClassifier.load(args.model)
+        _, _, x, y = load_dataset(args.data, model.window, test_split=1.0)
+        evaluate(model, x, y)
+    else:
+        if args.model:
+            model = GestureClassifier.load(args.model)
+        else:
+            rng = np.random.default_rng(0)
+            d, hidden, k = 4 * 63, 64, len(GESTURES)
+            model = GestureClassifier(rng.normal(size=(d, hidden)), np.zeros(hidden), rng.normal(size=(hidden, k)),
+                                      np.zeros(k), np.zeros(d), np.ones(d), GESTURES, 4)
+        _, p99 = bench(model, args.hands, args.frames)
+        if p99 > args.budget_ms:
+            print(f">> FAIL | classifier p99 {p99:.3f}ms > {args.budget_ms}ms")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
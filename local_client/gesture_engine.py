@@ -1,24 +1,380 @@
+import threading
+import time
+
 import cv2
-import mediapipe as mp
 import numpy as np
 
+from pipeline import BufferPool
+
+# MediaPipe hand landmark indices
+WRIST = 0
+THUMB_TIP = 4
+INDEX_MCP = 5
+MIDDLE_MCP = 9
+TIP_IDS = [4, 8, 12, 16, 20]
+PINCH_IDS = [8, 12, 16, 20]  # fingertips measured against the thumb tip
+
+CLOSED_THRESHOLD = 0.08  # avg tip-to-wrist distance below this = fist (tune)
+MIRRORED_LABELS = {"Left": "Right", "Right": "Left"}
+
+
+class _NoHands:
+    """Stand-in result while the hand model is still loading."""
+    multi_hand_landmarks = None
+    multi_handedness = None
+
+
+NO_HANDS = _NoHands()
+
+
+class HandFeatures:
+    """Derived per-hand features for one frame."""
+    __slots__ = ("label", "points", "openness", "closed", "tilt", "height",
+                 "steering_angle", "pinch", "hand_size", "gestures")
+
+    def __init__(self, label, points, openness, tilt, height, steering_angle, pinch, hand_size=0.0,
+                 gestures=None):
+        self.update(label, points, openness, tilt, height, steering_angle, pinch, hand_size, gestures)
+
+    def update(self, label, points, openness, tilt, height, steering_angle, pinch, hand_size=0.0,
+               gestures=None):
+        self.label = label
+        self.points = points  # (21, 3) float32 view into the frame batch
+        self.openness = openness
+        self.closed = openness < CLOSED_THRESHOLD
+        self.tilt = tilt
+        self.height = height
+        self.steering_angle = steering_angle
+        self.pinch = pinch  # thumb-to-(index, middle, ring, pinky) tip distances
+        self.hand_size = hand_size  # wrist -> middle-finger MCP, to normalize distances (calibration.py)
+        self.gestures = gestures  # classifier probabilities per GESTURES entry, if a model is loaded
+
+
+class FrameFeatures:
+    """All hands found in one frame, addressable by handedness."""
+    __slots__ = ("hands", "left", "right", "spare")
+
+    def __init__(self, hands, spare=None):
+        self.spare = spare  # preallocated HandFeatures for compute_features(out=...)
+        self.assign(hands)
+
+    @classmethod
+    def reusable(cls, max_hands):
+        return cls([], [HandFeatures(None, None, 0.0, 0.0, 0.0, 0.0, None) for _ in range(max_hands)])
+
+    def assign(self, hands):
+        self.hands = hands
+        self.left = self.right = None
+        for hand in hands:
+            if hand.label == "Left":
+                self.left = hand
+            else:
+                self.right = hand
+
+
+def landmarks_to_array(landmarks, out=None):
+    """Copy a MediaPipe landmark list into a (21, 3) float32 array."""
+    if out is None:
+        out = np.empty((21, 3), dtype=np.float32)
+    out.reshape(-1)[:] = np.fromiter(
+        (v for lm in landmarks for v in (lm.x, lm.y, lm.z)), dtype=np.float32, count=63)
+    return out
+
+
+def compute_features(points, labels, gestures=None, out=None):
+    """Vectorized feature pass over a (hands, 21, 3) landmark batch.
+
+    gestures: optional (hands, len(GESTURES)) classifier probabilities.
+    out: a FrameFeatures.reusable() to refill instead of building new objects.
+    """
+    if len(labels) == 0:
+        if out is None:
+            return FrameFeatures([])
+        out.assign([])
+        return out
+
+    xy = points[:, :, :2]
+    wrist = xy[:, WRIST]
+
+    openness = np.linalg.norm(xy[:, TIP_IDS] - wrist[:, None], axis=2).mean(axis=1)
+    pinch = np.linalg.norm(xy[:, PINCH_IDS] - xy[:, THUMB_TIP][:, None], axis=2)
+    axis = xy[:, INDEX_MCP] - wrist
+    angle = np.degrees(np.arctan2(axis[:, 1], axis[:, 0]))
+    size = np.linalg.norm(xy[:, MIDDLE_MCP] - wrist, axis=1)
+
+    openness, tilt, height, angle, size = (a.tolist() for a in
+                                           (openness, axis[:, 0], wrist[:, 1], angle, size))
+    if out is None:
+        hands = [HandFeatures(label, points[i], openness[i], tilt[i], height[i], angle[i], pinch[i],
+                              size[i], None if gestures is None else gestures[i])
+                 for i, label in enumerate(labels)]
+        return FrameFeatures(hands)
+    hands = out.spare[:len(labels)]
+    for i, hand in enumerate(hands):
+        hand.update(labels[i], points[i], openness[i], tilt[i], height[i], angle[i], pinch[i],
+                    size[i], None if gestures is None else gestures[i])
+    out.assign(hands)
+    return out
+
+
 class GestureEngine:
-    def __init__(self):
-        self.mp_hands = mp.solutions.hands
-        self.mp_draw = mp.solutions.drawing_utils
-        self.hands = self.mp_hands.Hands(
-            max_num_hands=2,
+    def __init__(self, max_num_hands=2, roi_tracking=False, roi_margin=0.3,
+                 full_frame_interval=30, min_roi_size=160, smoother=None, flip_frame=True,
+                 background_load=False, warmup_size=(640, 360), classifier=None, pool=None,
+                 tracker=None, hands_factory=None):
+        self.mp_hands = None
+        self.mp_draw = None
+        self.hands = None
+        self.roi_hands = None
+        self.ready = threading.Event()
+        self.load_error = None  # the exception if a background load failed
+        self.keep_raw = False  # set by a recorder: keep each frame's detections as raw_landmarks
+        self.raw_landmarks = None  # (points copy, labels) before tracking and smoothing
+        self.load_seconds = None
+        self.ready_at = None
+        self.warmup_size = warmup_size
+        self.max_num_hands = max_num_hands
+        self.smoother = smoother  # optional filters.LandmarkSmoother
+        self.classifier = classifier  # optional gesture_classifier.GestureClassifier
+        # optional hand_tracker.HandTracker: stable left/right across crossings and dropouts
+        self.tracker = tracker
+        # Mirrored / resized / RGB frames, the landmark batch and the feature
+        # objects are written into reused buffers instead of allocated per
+        # frame. frame_buffers is the set of the frame processed last;
+        # pipelined callers that hold several frames at once pass an owned
+        # pool and release each frame's set (see pipeline.BufferPool)
+        self.pool = pool if pool is not None else BufferPool()
+        self.frame_buffers = None
+        # Stand-in for mediapipe's Hands graph (alloc_check.py, benchmarks):
+        # called for each graph, MediaPipe is then never imported
+        self.hands_factory = hands_factory
+        # flip_frame=False skips mirroring the image (nothing displays it in
+        # headless mode) and mirrors the landmarks and handedness instead
+        self.flip_frame = flip_frame
+
+        # --- ROI tracking ---
+        # When enabled, inference runs on a crop around the hands found last
+        # frame instead of the full image; a full-frame pass is forced when a
+        # hand is lost and, while fewer than max_num_hands are tracked, every
+        # full_frame_interval frames to pick up new ones.
+        # Crops go to their own hand graph (roi_hands): a video-mode graph
+        # tracks hands in normalized coordinates of its previous input, so one
+        # graph fed crops and full frames alternately would lose its tracking
+        # state at every switch and fall back to palm detection. For the same
+        # reason the crop keeps its size and only moves when a hand nears its edge.
+        self.roi_tracking = roi_tracking
+        self.roi_margin = roi_margin
+        self.full_frame_interval = full_frame_interval
+        self.min_roi_size = min_roi_size
+        self.roi = None  # (x0, y0, x1, y1) in pixels of the working image
+        self.roi_dims = None
+        self.roi_frames = 0
+        self.full_frames = 0
+        self._since_full = 0
+        self._last_hand_count = 0
+
+        # mediapipe import + graph construction + first inference take
+        # seconds; background_load lets the camera and preview start meanwhile
+        if background_load:
+            threading.Thread(target=self._load_in_background, name="model-loader", daemon=True).start()
+        else:
+            self.load()
+
+    def _load_in_background(self):
+        try:
+            self.load()
+        except Exception as e:
+            self.load_error = e  # ready never gets set; the caller decides how to fail
+            print(f">> HAND MODEL failed to load: {e}")
+
+    def load(self):
+        """Import MediaPipe, build the hand graph and warm it up on a dummy frame."""
+        t0 = time.perf_counter()
+        new_hands = self.hands_factory
+        if new_hands is None:
+            import mediapipe as mp
+            self.mp_hands = mp.solutions.hands
+            self.mp_draw = mp.solutions.drawing_utils
+            new_hands = self._new_hands
+        hands = new_hands()
+        # The first process() call initializes the graph; pay for it here, not on a live frame
+        w, h = self.warmup_size
+        hands.process(np.zeros((h, w, 3), dtype=np.uint8))
+        if self.roi_tracking:
+            roi_hands = new_hands()
+            roi_hands.process(np.zeros((self.min_roi_size, self.min_roi_size, 3), dtype=np.uint8))
+            self.roi_hands = roi_hands
+        self.hands = hands
+        self.ready_at = time.perf_counter()
+        self.load_seconds = self.ready_at - t0
+        self.ready.set()
+        print(f">> HAND MODEL ready in {self.load_seconds * 1000:.0f}ms")
+
+    def _new_hands(self):
+        return self.mp_hands.Hands(
+            max_num_hands=self.max_num_hands,
             min_detection_confidence=0.7,
             min_tracking_confidence=0.7
         )
 
-    def process_frame(self, frame):
-        """Standardize frame and detect hands."""
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = self.hands.process(rgb)
+    def process_frame(self, frame, infer_size=None):
+        """Standardize frame and detect hands.
+
+        infer_size=(w, h) downsamples the image MediaPipe sees; landmarks are
+        normalized so they still line up with the full-size frame returned.
+        With flip_frame=False the frame is returned unmirrored, but landmarks
+        and labels are the same as if it had been mirrored. Until the model
+        has loaded every frame reports no hands.
+        """
+        pool = self.frame_buffers = self.pool.next()
+        if self.flip_frame:
+            frame = cv2.flip(frame, 1, dst=pool.get("mirrored", frame.shape))
+        if not self.ready.is_set():
+            return NO_HANDS, frame
+        work = frame
+        if infer_size is not None:
+            work = cv2.resize(frame, infer_size, dst=pool.get("work", (infer_size[1], infer_size[0], 3)),
+                              interpolation=cv2.INTER_AREA)
+        h, w = work.shape[:2]
+        if (w, h) != self.roi_dims:
+            self.roi = None  # ROI is in working-image pixels
+            self.roi_dims = (w, h)
+
+        roi = self.next_roi()
+        if roi is None:
+            rgb = cv2.cvtColor(work, cv2.COLOR_BGR2RGB, dst=pool.get("rgb", work.shape))
+            self.full_frames += 1
+            self._since_full = 0
+        else:
+            x0, y0, x1, y1 = roi
+            crop = work[y0:y1, x0:x1]
+            rgb = cv2.cvtColor(crop, cv2.COLOR_BGR2RGB, dst=pool.get("rgb_roi", crop.shape))
+            self.roi_frames += 1
+            self._since_full += 1
+
+        result = (self.hands if roi is None else self.roi_hands).process(rgb)
+
+        if self.roi_tracking:
+            if roi is not None:
+                self._remap_landmarks(result, roi, w, h)
+            self._update_roi(result, roi, w, h)
+        if not self.flip_frame:
+            self._mirror_landmarks(result)
         return result, frame
 
+    def next_roi(self):
+        """Crop (x0, y0, x1, y1) the next frame is inferred on, or None for a full-frame pass."""
+        if not self.roi_tracking:
+            return None
+        # The periodic full pass looks for new hands; with every slot tracked there are none to find
+        if self._since_full < self.full_frame_interval or self._last_hand_count >= self.max_num_hands:
+            return self.roi
+        return None
+
+    def skip_frame(self, frame):
+        """Standardize a frame that gets no inference (governor-skipped frames)."""
+        pool = self.frame_buffers = self.pool.next()
+        if self.flip_frame:
+            frame = cv2.flip(frame, 1, dst=pool.get("mirrored", frame.shape))
+        return frame
+
+    @staticmethod
+    def _mirror_landmarks(result):
+        """Make a result from an unmirrored image match the mirrored (selfie) view.
+
+        MediaPipe assigns handedness assuming a mirrored input, so labels swap too.
+        """
+        if not result.multi_hand_landmarks:
+            return
+        for hand_landmarks in result.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = 1.0 - lm.x
+        for handedness in result.multi_handedness:
+            for c in handedness.classification:
+                c.label = MIRRORED_LABELS.get(c.label, c.label)
+
+    def _remap_landmarks(self, result, roi, w, h):
+        """Map landmarks normalized to the crop back into full-frame coordinates."""
+        if not result.multi_hand_landmarks:
+            return
+        x0, y0, x1, y1 = roi
+        sx, sy = (x1 - x0) / w, (y1 - y0) / h
+        ox, oy = x0 / w, y0 / h
+        for hand_landmarks in result.multi_hand_landmarks:
+            for lm in hand_landmarks.landmark:
+                lm.x = ox + lm.x * sx
+                lm.y = oy + lm.y * sy
+                lm.z = lm.z * sx  # z shares the x scale in MediaPipe
+
+    def _update_roi(self, result, used_roi, w, h):
+        hands = result.multi_hand_landmarks or []
+        lost = not hands or (used_roi is not None and len(hands) < self._last_hand_count)
+        self._last_hand_count = len(hands)
+        if lost:
+            self.roi = None
+            return
+
+        xy = np.array([(lm.x, lm.y) for hand in hands for lm in hand.landmark], dtype=np.float32)
+        bx0, by0 = xy.min(axis=0) * (w, h)
+        bx1, by1 = xy.max(axis=0) * (w, h)
+
+        extent = max(bx1 - bx0, by1 - by0)
+        cx, cy = (bx0 + bx1) / 2.0, (by0 + by1) / 2.0
+
+        # Keep the current crop while the hands stay well inside it, and its
+        # size while they still fit: the crop graph's tracking survives a
+        # small shift of its input, not a rescale.
+        if self.roi is not None:
+            x0, y0, x1, y1 = self.roi
+            side = x1 - x0
+            inset = 0.5 * self.roi_margin * side
+            if bx0 > x0 + inset and by0 > y0 + inset and bx1 < x1 - inset and by1 < y1 - inset:
+                return
+            if extent <= side - 2 * inset:
+                self.roi = self._place_roi(cx, cy, side, w, h)
+                return
+
+        side = int(max(self.min_roi_size, extent * (1 + 2 * self.roi_margin)))
+        if side > min(w, h) or side * side >= 0.8 * w * h:
+            self.roi = None  # crop would be nearly the full frame anyway
+        else:
+            self.roi = self._place_roi(cx, cy, side, w, h)
+
+    @staticmethod
+    def _place_roi(cx, cy, side, w, h):
+        """Square crop of `side` px centred on (cx, cy), shifted (not shrunk) to fit the image."""
+        x0 = int(min(max(0.0, cx - side / 2.0), w - side))
+        y0 = int(min(max(0.0, cy - side / 2.0), h - side))
+        return x0, y0, x0 + side, y0 + side
+
+    def landmark_batch(self, result):
+        """(hands, 21, 3) float32 landmarks and handedness labels of a MediaPipe result."""
+        hands = (result.multi_hand_landmarks or [])[:self.max_num_hands]
+        # Lives in this frame's buffer set: copy it to keep it past the set's release
+        batch = self.frame_buffers.get("landmarks", (self.max_num_hands, 21, 3), np.float32)[:len(hands)]
+        labels = []
+        for idx, hand_landmarks in enumerate(hands):
+            landmarks_to_array(hand_landmarks.landmark, out=batch[idx])
+            labels.append(result.multi_handedness[idx].classification[0].label)
+        return batch, labels
+
+    def extract_features(self, result, timestamp=None):
+        """Convert a MediaPipe result into one landmark batch and its features."""
+        batch, labels = self.landmark_batch(result)
+        if self.keep_raw:
+            # The tracker and smoother rewrite the batch; recordings need the detections
+            self.raw_landmarks = (batch.copy(), list(labels))
+        t = time.perf_counter() if timestamp is None else timestamp
+        if self.tracker is not None:
+            batch, labels = self.tracker.update(
+                batch, labels, t, out=self.frame_buffers.get("tracked", (self.tracker.max_tracks, 21, 3), np.float32))
+        if self.smoother is not None:
+            self.smoother.apply(batch, self.tracker.ids if self.tracker is not None else labels, t)
+        gestures = self.classifier.classify(batch, labels) if self.classifier is not None else None
+        pool = self.frame_buffers
+        out = pool.peek("features") or pool.keep("features", FrameFeatures.reusable(self.max_num_hands))
+        return compute_features(batch, labels, gestures, out)
+
     def draw_landmarks(self, frame, result):
         """Draw Standard MediaPipe Landmarks."""
         if result.multi_hand_landmarks:
@@ -27,20 +383,14 @@ class GestureEngine:
 
     def is_hand_closed(self, landmarks):
         """Detect if a hand is closed (fist)."""
-        wrist = landmarks[0]
-        tip_ids = [4, 8, 12, 16, 20]
-        
-        # Calculate average distance of tips to wrist
-        avg_dist = np.mean([np.linalg.norm(
-            np.array([landmarks[i].x, landmarks[i].y]) - np.array([wrist.x, wrist.y])
-        ) for i in tip_ids])
-        
-        return avg_dist < 0.08  # Tune threshold
+        xy = landmarks_to_array(landmarks)[:, :2]
+        avg_dist = np.linalg.norm(xy[TIP_IDS] - xy[WRIST], axis=1).mean()
+        return avg_dist < CLOSED_THRESHOLD
 
     def get_hand_tilt_and_height(self, landmarks):
         """Calculate hand tilt (X-axis) and height (Y-axis)."""
-        wrist = landmarks[0]
-        index_mcp = landmarks[5]
+        wrist = landmarks[WRIST]
+        index_mcp = landmarks[INDEX_MCP]
         
         tilt = index_mcp.x - wrist.x
         height = wrist.y
@@ -48,8 +398,8 @@ class GestureEngine:
 
     def get_steering_angle(self, hand_landmarks):
         """Calculate precise angle for racing games."""
-        wrist = hand_landmarks.landmark[0]
-        index = hand_landmarks.landmark[5]
+        wrist = hand_landmarks.landmark[WRIST]
+        index = hand_landmarks.landmark[INDEX_MCP]
         dx = index.x - wrist.x
         dy = index.y - wrist.y
         return np.degrees(np.arctan2(dy, dx))
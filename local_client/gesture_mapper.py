@@ -0,0 +1,107 @@
+import numpy as np
+
+from bindings import FEATURE_NAMES, compile_modes, feature_vector
+from calibration import Calibrator
+
+
+class GestureMapper:
+    """Runs the active mode's compiled binding table against each frame's features.
+
+    The user's calibration (calibration.py) is shared by all modes. Without
+    one, the first mode that needs it starts a Calibrator; its bindings stay
+    released until the fit is done, then on_calibrated(calibration) is called
+    (the client stores it on disk).
+    """
+
+    def __init__(self, controller, modes, default_mode="default", hysteresis=0.25,
+                 calibration=None, on_calibrated=None):
+        self.controller = controller
+        self.tables = compile_modes(modes, hysteresis)
+        self.default_mode = default_mode
+        self.calibration = calibration
+        self.calibrator = None
+        self.on_calibrated = on_calibrated
+        self._features = np.full(len(FEATURE_NAMES), np.nan, dtype=np.float32)
+        self._held = {name: np.zeros(len(t.targets), dtype=bool) for name, t in self.tables.items()}
+
+    def table(self, mode=None):
+        """Binding table for a mode (the active profile by default)."""
+        mode = mode or self.controller.current_profile
+        return self.tables.get(mode) or self.tables.get(self.default_mode)
+
+    def devices(self, mode=None):
+        """Input devices ("key", "mouse", "pointer") a mode's bindings drive."""
+        table = self.table(mode)
+        if table is None:
+            return set()
+        devices = {device for device, _ in table.targets}
+        if table.axes:
+            devices.add("key")  # key / PWM steering
+        if table.cursor is not None:
+            devices.add("pointer")
+        return devices
+
+    @property
+    def calibrating(self):
+        return self.calibrator is not None
+
+    def recalibrate(self, fists=True):
+        """Fit the calibration again from the next frames (replaces the current one when done)."""
+        self.calibrator = Calibrator(fists=fists)
+
+    def reset(self):
+        """Forget binding states (e.g. after a profile switch); the calibration stays."""
+        for name, table in self.tables.items():
+            table.reset()
+            self._held[name][:] = False
+
+    def apply(self, features):
+        table = self.table()
+        if table is None:
+            return
+
+        # recalibrate() may swap the calibrator from the UI thread; work on one
+        calibrator = self.calibrator
+        if calibrator is None and table.uses_calibration and self.calibration is None:
+            calibrator = self.calibrator = Calibrator()
+        if calibrator is not None:
+            calibration = calibrator.add(features)
+            if calibration is not None:
+                self.calibration = calibration
+                if self.calibrator is calibrator:
+                    self.calibrator = calibrator = None
+                print(f">> CALIBRATED | {calibration.describe()}")
+                if self.on_calibrated is not None:
+                    self.on_calibrated(calibration)
+
+        f = feature_vector(features, self.calibration, self._features)
+        if calibrator is None:
+            held = table.evaluate(f)
+        else:
+            # Nothing fires while the user holds the calibration pose
+            table.reset()
+            held = np.zeros(len(table.targets), dtype=bool)
+
+        # Only touch the controller for targets that changed this frame
+        prev = self._held[table.name]
+        for i in np.flatnonzero(held != prev):
+            device, name = table.targets[i]
+            self.controller.set(device, name, bool(held[i]))
+        prev[:] = held
+
+        for idx, axis, scale in table.axes:
+            if not np.isnan(f[idx]):
+                self.controller.set_axis(axis, float(f[idx]) * scale)
+
+        if table.cursor is not None:
+            hand = features.right if table.cursor_hand == "right" else features.left
+            point = None
+            if hand is not None:
+                tip = hand.points[table.cursor_landmark]
+                point = (float(tip[0]), float(tip[1]))
+            self.controller.set_pointer(point, table.cursor)
+
+    def chatter(self):
+        """(toggles, suppressed toggles) summed over all modes."""
+        return (sum(t.toggles for t in self.tables.values()),
+                sum(t.suppressed for t in self.tables.values()))
@@ -0,0 +1,115 @@
+import cv2
+
+
+class CaptureGovernor:
+    """Negotiates camera settings and trades inference quality for latency.
+
+    The governor walks a ladder of operating points, best quality first:
+    full working width, then smaller inference widths, then skipping
+    inference on every 2nd / 3rd frame at the smallest width. It steps down
+    when the smoothed per-frame processing time stays above the latency
+    budget and steps back up once there is clear headroom again.
+    """
+
+    def __init__(self, width=1280, height=720, fps=60, buffer_size=1,
+                 work_width=640, budget_ms=25.0, min_work_width=256,
+                 patience=15, headroom=0.6):
+        self.requested = {"width": width, "height": height, "fps": fps, "buffer_size": buffer_size}
+        self.capture = {}
+        self.budget_ms = budget_ms
+        self.patience = patience
+        self.headroom = headroom
+
+        self.levels = []
+        w = work_width
+        while w >= min_work_width:
+            self.levels.append((w, 1))
+            w = int(w * 0.75)
+        smallest = self.levels[-1][0] if self.levels else work_width
+        self.levels += [(smallest, 2), (smallest, 3)]
+
+        self.level = 0
+        self.frame_ms = 0.0
+        self._over = 0
+        self._under = 0
+        self._frame_index = 0
+
+    def open(self, source=0):
+        """Open the camera and negotiate resolution, FPS and buffer size.
+
+        source: camera index, video file or URL, or an object with
+        cv2.VideoCapture's read / get / set (e.g. alloc_check.py's synthetic camera).
+        """
+        cap = source if hasattr(source, "read") else cv2.VideoCapture(source)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.requested["width"])
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.requested["height"])
+        cap.set(cv2.CAP_PROP_FPS, self.requested["fps"])
+        # A 1-frame driver buffer stops us from reading frames that are already stale
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, self.requested["buffer_size"])
+
+        # Drivers silently clamp to what they support; record what we actually got
+        self.capture = {
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": cap.get(cv2.CAP_PROP_FPS),
+            "buffer_size": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+        }
+        print(f">> CAMERA | requested={self.requested} got={self.capture}")
+        return cap
+
+    @property
+    def work_width(self):
+        return self.levels[self.level][0]
+
+    @property
+    def infer_every(self):
+        return self.levels[self.level][1]
+
+    def should_infer(self):
+        """False on frames the current operating point skips."""
+        self._frame_index += 1
+        return self._frame_index % self.infer_every == 0
+
+    def infer_size(self, frame):
+        """(w, h) to downsample a frame to before inference, or None to keep it."""
+        h, w = frame.shape[:2]
+        if w <= self.work_width:
+            return None
+        return self.work_width, int(round(h * self.work_width / w))
+
+    def record(self, seconds):
+        """Feed one frame's processing time and adjust the operating point."""
+        ms = seconds * 1000.0
+        self.frame_ms = ms if self.frame_ms == 0.0 else 0.9 * self.frame_ms + 0.1 * ms
+
+        if self.frame_ms > self.budget_ms:
+            self._over += 1
+            self._under = 0
+        elif self.frame_ms < self.budget_ms * self.headroom:
+            self._under += 1
+            self._over = 0
+        else:
+            self._over = self._under = 0
+
+        if self._over >= self.patience and self.level < len(self.levels) - 1:
+            self.level += 1
+            self._over = 0
+            print(f">> GOVERNOR | over budget, stepping down to {self.describe()}")
+        elif self._under >= self.patience * 2 and self.level > 0:
+            self.level -= 1
+            self._under = 0
+            print(f">> GOVERNOR | headroom, stepping up to {self.describe()}")
+
+    def operating_point(self):
+        return {
+            "capture": self.capture,
+            "work_width": self.work_width,
+            "infer_every": self.infer_every,
+            "level": self.level,
+            "frame_ms": round(self.frame_ms, 2),
+            "budget_ms": self.budget_ms,
+        }
+
+    def describe(self):
+        skip = f" 1/{self.infer_every}" if self.infer_every > 1 else ""
+        return f"{self.work_width}px{skip}"
@@ -0,0 +1,381 @@
+"""Hand identity tracking across frames, independent of MediaPipe's handedness.
+
+MediaPipe labels every detection "Left" or "Right" from that frame alone: the
+label flips when hands cross, both hands sometimes get the same label, and a
+hand missed for a frame or two disappears. Each of those reaches the
+bindings as the wrong mouse button or a WASD key released mid-move.
+
+HandTracker keeps one track per hand and associates each frame's detections
+with the tracks by position:
+
+    predict   palm centre + velocity * dt for every track
+    cost      distance predicted -> detected (+ a small penalty when the
+              detector's label disagrees with the track's side)
+    assign    Hungarian assignment on the (tracks x detections) matrix,
+              pairs costlier than `gate` are split
+    update    matched tracks take the detection; unmatched tracks coast on
+              their prediction for up to coast_frames; unmatched detections
+              start new tracks
+
+A track's side is set when it starts (the detector's label unless another
+track already has it) and only changes when the detector disagrees for a
+sustained run and the other side is free. Downstream code keeps addressing
+hands as left / right, but those names now follow the hands.
+
+    python hand_tracker.py --bench                     # synthetic crossing hands
+    python hand_tracker.py --bench session.npz ...     # recorded sessions
+    python replay.py session.npz                       # through the whole control path
+
+Sessions hold MediaPipe's own labels (client.py records detections before
+tracking). The recorded-session bench treats them as ground truth and
+corrupts them the same way, so record it with the hands kept apart.
+"""
+import time
+
+import numpy as np
+
+PALM = [0, 5, 9, 17]  # wrist + index / middle / pinky MCPs
+SIDES = ("Left", "Right")
+OTHER_SIDE = {"Left": "Right", "Right": "Left"}
+
+
+def hungarian(cost):
+    """Minimum-cost assignment for a (rows, cols) cost matrix; returns [(row, col), ...].
+
+    Shortest-augmenting-path Hungarian algorithm, O(n^2 m) on plain lists:
+    the matrices here are at most a few hands on a side.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    transposed = cost.shape[0] > cost.shape[1]
+    if transposed:
+        cost = cost.T
+    n, m = cost.shape
+    if n == 0:
+        return []
+    a = cost.tolist()
+    inf = float("inf")
+    u, v = [0.0] * (n + 1), [0.0] * (m + 1)
+    match, way = [0] * (m + 1), [0] * (m + 1)  # match[col] = row (1-based), 0 = free
+    for i in range(1, n + 1):
+        match[0] = i
+        j0 = 0
+        minv = [inf] * (m + 1)
+        used = [False] * (m + 1)
+        while True:
+            used[j0] = True
+            i0, delta, j1 = match[j0], inf, 0
+            row = a[i0 - 1]
+            for j in range(1, m + 1):
+                if not used[j]:
+                    cur = row[j - 1] - u[i0] - v[j]
+                    if cur < minv[j]:
+                        minv[j], way[j] = cur, j0
+                    if minv[j] < delta:
+                        delta, j1 = minv[j], j
+            for j in range(m + 1):
+                if used[j]:
+                    u[match[j]] += delta
+                    v[j] -= delta
+                else:
+                    minv[j] -= delta
+            j0 = j1
+            if match[j0] == 0:
+                break
+        while j0:
+            j1 = way[j0]
+            match[j0] = match[j1]
+            j0 = j1
+    pairs = [(match[j] - 1, j - 1) for j in range(1, m + 1) if match[j]]
+    return sorted((c, r) for r, c in pairs) if transposed else sorted(pairs)
+
+
+class Track:
+    """One hand followed across frames."""
+
+    def __init__(self, track_id, side, points, center, t):
+        self.id = track_id
+        self.side = side
+        self.points = points.copy()  # last (21, 3) landmarks, moved along while coasting
+        self.center = center
+        self.velocity = np.zeros(2, dtype=np.float32)
+        self.t = t  # time of center / velocity
+        self.seen = t  # time of the last detection
+        self.missed = 0  # consecutive frames without a detection
+        self.hits = 1
+        self.confidence = 0.5
+        self.right_votes = 1.0 if side == "Right" else 0.0  # smoothed detector opinion
+
+    def predict(self, t):
+        return self.center + self.velocity * (t - self.t)
+
+    def wanted_side(self, threshold):
+        """The side the detector has been insisting on, else the current one."""
+        if self.right_votes > threshold:
+            return "Right"
+        if self.right_votes < 1.0 - threshold:
+            return "Left"
+        return self.side
+
+
+class HandTracker:
+    """Stable hand identities from per-frame detections (see module docstring).
+
+    update() returns the tracked hands as (points, labels): coasting tracks
+    are included with predicted landmarks, labels are the tracks' sides.
+    After each call, ids / confidence describe the returned rows and
+    detection_rows maps every input detection to its row (-1 = dropped).
+    """
+
+    def __init__(self, max_tracks=2, gate=0.25, label_cost=0.01, coast_frames=5,
+                 coast_seconds=0.25, velocity_smoothing=0.5, side_switch=0.9, vote_rate=0.1):
+        self.max_tracks = max_tracks
+        self.gate = gate  # max distance (frame widths) a hand may move between frames
+        self.label_cost = label_cost
+        self.coast_frames = coast_frames
+        self.coast_seconds = coast_seconds
+        self.velocity_smoothing = velocity_smoothing
+        self.side_switch = side_switch
+        self.vote_rate = vote_rate
+        self.tracks = []
+        self.ids = []
+        self.confidence = []
+        self.detection_rows = np.empty(0, dtype=np.intp)
+        self.coasted = 0  # hand-frames bridged by prediction, for reporting
+        self.side_changes = 0
+        self._next_id = 0
+
+    def reset(self):
+        self.tracks = []
+
+    def update(self, points, labels, t, out=None):
+        """Associate one frame's (hands, 21, 3) detections; returns (points, labels).
+
+        out: optional (max_tracks, 21, 3) float32 buffer to write the result into.
+        """
+        n = len(labels)
+        centers = points[:n, PALM, :2].mean(axis=1) if n else np.empty((0, 2), dtype=np.float32)
+        tracks = self.tracks
+        det_track = [None] * n
+
+        pairs = []
+        if tracks and n:
+            predicted = np.array([tr.predict(t) for tr in tracks], dtype=np.float32)
+            cost = np.linalg.norm(predicted[:, None] - centers[None], axis=2)
+            cost += self.label_cost * np.array([[label != tr.side for label in labels] for tr in tracks])
+            pairs = [(i, j) for i, j in hungarian(cost) if cost[i, j] <= self.gate]
+
+        matched = set()
+        for i, j in pairs:
+            self._hit(tracks[i], points[j], centers[j], labels[j], t)
+            det_track[j] = tracks[i]
+            matched.add(i)
+        for i, tr in enumerate(tracks):
+            if i not in matched:
+                tr.missed += 1
+        # Coasting tracks past their window are gone
+        self.tracks = tracks = [tr for tr in tracks
+                                if tr.missed == 0 or (tr.missed <= self.coast_frames
+                                                      and t - tr.seen <= self.coast_seconds)]
+
+        # Leftover detections, left to right: new tracks, or a hand coming back
+        # elsewhere. While every track is coasting, a detection labelled with a
+        # coasting track's side is that hand moving past the gate: re-acquire
+        # it rather than start a new track on the opposite side.
+        for j in sorted((j for j in range(n) if det_track[j] is None), key=lambda j: centers[j, 0]):
+            coasting = [tr for tr in tracks if tr.missed]
+            returning = [tr for tr in coasting if tr.side == labels[j]] if len(coasting) == len(tracks) else []
+            if len(tracks) < self.max_tracks and not returning:
+                used = {tr.side for tr in tracks}
+                side = labels[j] if labels[j] not in used else OTHER_SIDE.get(labels[j], labels[j])
+                tr = Track(self._next_id, side, points[j], centers[j], t)
+                self._next_id += 1
+                tracks.append(tr)
+                det_track[j] = tr
+                continue
+            if coasting:
+                tr = max(returning or coasting, key=lambda tr: tr.missed)
+                tr.velocity[:] = 0.0  # it jumped: the old motion says nothing
+                self._hit(tr, points[j], centers[j], labels[j], t)
+                det_track[j] = tr
+
+        for tr in tracks:
+            if tr.missed:
+                self._coast(tr, t)
+        self._settle_sides()
+
+        if out is None:
+            out = np.empty((self.max_tracks, 21, 3), dtype=np.float32)
+        rows = {}
+        for row, tr in enumerate(tracks):
+            out[row] = tr.points
+            rows[tr.id] = row
+        self.ids = [tr.id for tr in tracks]
+        self.confidence = [tr.confidence for tr in tracks]
+        self.detection_rows = np.array([rows[tr.id] if tr is not None else -1 for tr in det_track],
+                                       dtype=np.intp)
+        return out[:len(tracks)], [tr.side for tr in tracks]
+
+    def _hit(self, tr, points, center, label, t):
+        dt = t - tr.t
+        if dt > 0 and tr.missed == 0:
+            a = self.velocity_smoothing
+            tr.velocity += a * ((center - tr.center) / dt - tr.velocity)
+        tr.center = center
+        tr.points[:] = points
+        tr.t = tr.seen = t
+        tr.missed = 0
+        tr.hits += 1
+        tr.confidence += 0.5 * (1.0 - tr.confidence)
+
+        tr.right_votes += self.vote_rate * ((label == "Right") - tr.right_votes)
+
+    def _settle_sides(self):
+        """The detector's labels only move a track's side after a sustained run.
+
+        A track takes the side it is voted onto if no other track holds it;
+        two tracks voted onto each other's sides swap.
+        """
+        for tr in self.tracks:
+            wanted = tr.wanted_side(self.side_switch)
+            if wanted == tr.side:
+                continue
+            holder = next((other for other in self.tracks if other is not tr and other.side == wanted), None)
+            if holder is None:
+                tr.side = wanted
+                self.side_changes += 1
+            elif holder.wanted_side(self.side_switch) == tr.side:
+                holder.side, tr.side = tr.side, wanted
+                self.side_changes += 2
+
+    def _coast(self, tr, t):
+        center = tr.predict(t)
+        tr.points[:, :2] += center - tr.center
+        tr.center = center
+        tr.velocity *= 0.5  # don't let a lost hand drift off
+        tr.t = t
+        tr.confidence *= 0.6
+        self.coasted += 1
+
+
+# --- BENCHMARK ---
+# Detections with known identities are corrupted the way MediaPipe fails:
+# random label flips, swapped labels while the hands cross, and short
+# dropouts. "raw" uses the corrupted labels as the client did; "tracked" runs
+# them through HandTracker. Per frame and hand:
+#   wrong side  the hand reached the bindings as the other side
+#   missing     a hand in view did not reach the bindings at all (released input)
+#   switches    the side a hand maps to changed from one frame to the next
+
+def synthetic_session(seconds=60.0, fps=30.0, seed=0):
+    """Two hands swaying and crossing: (t, (n, 2, 21, 3) points, (n, 2) true side codes)."""
+    rng = np.random.default_rng(seed)
+    template = rng.normal(0.0, 0.03, (21, 3)).astype(np.float32)
+    template[PALM, :2] -= template[PALM, :2].mean(axis=0)
+    t = np.arange(int(seconds * fps)) / fps
+    sway = np.sin(2 * np.pi * t / 4.0)
+    centers = np.stack([np.stack([0.35 + 0.2 * sway, 0.55 + 0.05 * np.cos(t)], axis=1),
+                        np.stack([0.65 - 0.2 * sway, 0.45 + 0.05 * np.sin(t)], axis=1)], axis=1)
+    points = np.repeat(template[None, None], len(t), axis=0).repeat(2, axis=1)
+    points[..., :2] += centers[:, :, None, :]
+    points += rng.normal(0.0, 0.002, points.shape).astype(np.float32)
+    return t, points, np.tile(np.array([0, 1], dtype=np.int8), (len(t), 1))
+
+
+def corrupt(points, sides, flip=0.03, dropout=0.02, max_dropout=4, seed=1):
+    """Per-frame detector output: ([(hands, 21, 3)], [[label]], [[true side code]])."""
+    rng = np.random.default_rng(seed)
+    frames, hands = sides.shape
+    missing = np.zeros((frames, hands), dtype=bool)
+    for hand in range(hands):
+        for start in np.flatnonzero(rng.random(frames) < dropout):
+            missing[start:start + rng.integers(1, max_dropout + 1), hand] = True
+    out_points, out_labels, out_truth = [], [], []
+    for i in range(frames):
+        present = [h for h in range(hands) if sides[i, h] >= 0 and not missing[i, h]]
+        labels = [SIDES[sides[i, h]] for h in present]
+        crossing = len(present) == 2 and abs(points[i, present[0], 0, 0] - points[i, present[1], 0, 0]) < 0.1
+        if crossing and rng.random() < 0.5:
+            labels = labels[::-1]  # detector swaps the pair
+        labels = [OTHER_SIDE[label] if rng.random() < flip else label for label in labels]
+        order = rng.permutation(len(present))  # detection order carries no identity
+        out_points.append(points[i, [present[k] for k in order]] if present else points[i, :0])
+        out_labels.append([labels[k] for k in order])
+        out_truth.append([int(sides[i, present[k]]) for k in order])
+    return out_points, out_labels, out_truth, missing
+
+
+def _score(t, frames, truth, in_view, tracker=None):
+    wrong = missing = switches = hand_frames = 0
+    last_side = {}
+    costs = []
+    for i in range(len(t)):
+        points, labels = frames[i]
+        if tracker is not None:
+            t0 = time.perf_counter()
+            _, out_labels = tracker.update(points, labels, float(t[i]))
+            costs.append(time.perf_counter() - t0)
+            side_of = {truth[i][j]: out_labels[row] for j, row in enumerate(tracker.detection_rows)
+                       if row >= 0}
+            reached = set(out_labels)
+        else:
+            # FrameFeatures keeps one hand per label: the last one wins
+            side_of = {}
+            for j, label in enumerate(labels):
+                side_of = {k: v for k, v in side_of.items() if v != label}
+                side_of[truth[i][j]] = label
+            reached = set(labels)
+        for hand in in_view[i]:
+            hand_frames += 1
+            side = side_of.get(hand)
+            if side is None:
+                # A coasting track still holds the hand's inputs
+                if SIDES[hand] not in reached:
+                    missing += 1
+                continue
+            wrong += side != SIDES[hand]
+            if hand in last_side and last_side[hand] != side:
+                switches += 1
+            last_side[hand] = side
+    return wrong, missing, switches, hand_frames, sorted(costs)
+
+
+def _bench(paths, flip, dropout, seed):
+    from recording import Session
+    sessions = []
+    if paths:
+        for path in paths:
+            s = Session(path)
+            sessions.append((path, s.t, s.points, s.labels))
+    else:
+        sessions.append(("synthetic", *synthetic_session(seed=seed)))
+
+    for name, t, points, sides in sessions:
+        det_points, det_labels, truth, dropped = corrupt(points, sides, flip, dropout, seed=seed)
+        frames = list(zip(det_points, det_labels))
+        in_view = [[int(c) for c in row if c >= 0] for row in sides]
+        minutes = max(float(t[-1] - t[0]), 1e-9) / 60.0
+        print(f">> SESSION {name} | {len(t)} frames | label flips {flip:.0%}/hand-frame, swaps while "
+              f"crossing, dropouts {dropout:.0%} (1-4 frames, {int(dropped.sum())} hand-frames)")
+        for method, tracker in (("raw", None), ("tracked", HandTracker())):
+            wrong, missing, switches, hand_frames, costs = _score(t, frames, truth, in_view, tracker)
+            line = (f">> {method:<8}| wrong side {wrong / hand_frames:6.2%} | missing {missing / hand_frames:6.2%} | "
+                    f"identity switches {switches / minutes:7.1f}/min")
+            if costs:
+                line += (f" | update p50={costs[len(costs) // 2] * 1e6:.0f}us "
+                         f"p99={costs[int(len(costs) * 0.99)] * 1e6:.0f}us")
+            print(line)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Hand identity tracker")
+    parser.add_argument("--bench", action="store_true", help="identity-switch rate and per-frame cost")
+    parser.add_argument("sessions", nargs="*", help="sessions from client.py --record (default: synthetic)")
+    parser.add_argument("--flip", type=float, default=0.03, help="chance a detection's label is flipped")
+    parser.add_argument("--dropout", type=float, default=0.02, help="chance per frame a hand starts a dropout")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.sessions, args.flip, args.dropout, args.seed)
+    else:
+        parser.print_help()
@@ -0,0 +1,250 @@
+"""Pluggable OS input injection backends.
+
+Every backend takes batches of (device, name, down) events, where device is
+"key" (name = key like 'w'), "mouse" (name = 'left' / 'right') or
+"pointer" (name = 'move', and (dx, dy) pixels in place of down). Platform
+libraries are imported only when their backend is created, and
+create_backend() defers that until a device is first needed.
+"""
+import queue
+import sys
+import threading
+import time
+
+
+class InputBackend:
+    name = "base"
+
+    def key(self, name, down):
+        raise NotImplementedError
+
+    def mouse(self, button, down):
+        raise NotImplementedError
+
+    def move(self, dx, dy):
+        """Relative pointer motion in pixels."""
+        raise NotImplementedError
+
+    def apply(self, batch):
+        for device, name, down in batch:
+            if device == "key":
+                self.key(name, down)
+            elif device == "mouse":
+                self.mouse(name, down)
+            elif device == "pointer":
+                self.move(*down)
+
+    def prepare(self, devices):
+        """Get ready to drive these devices ("key", "mouse", "pointer") before the first event."""
+
+    def close(self):
+        pass
+
+
+class PyAutoGuiBackend(InputBackend):
+    name = "pyautogui"
+
+    def __init__(self, failsafe=True):
+        import pyautogui
+        self.pyautogui = pyautogui
+        pyautogui.PAUSE = 0  # default adds 100ms sleep after every call
+        pyautogui.FAILSAFE = failsafe
+
+    def key(self, name, down):
+        self.pyautogui.keyDown(name) if down else self.pyautogui.keyUp(name)
+
+    def mouse(self, button, down):
+        self.pyautogui.mouseDown(button=button) if down else self.pyautogui.mouseUp(button=button)
+
+    def move(self, dx, dy):
+        self.pyautogui.moveRel(dx, dy)
+
+
+class KeyboardBackend(InputBackend):
+    """`keyboard` library for keys (scan codes, works in most games); no mouse."""
+    name = "keyboard"
+
+    def __init__(self):
+        import keyboard
+        self.keyboard = keyboard
+
+    def key(self, name, down):
+        self.keyboard.press(name) if down else self.keyboard.release(name)
+
+
+class LazyBackend(InputBackend):
+    """Routes each device to a backend class, created the first time it is needed.
+
+    Importing pyautogui / keyboard / evdev and opening devices costs hundreds
+    of milliseconds, so nothing is built until prepare() (called when a
+    profile is activated) or the first event. Devices routed to the same
+    class share one instance; if a class fails to build, `fallback` is used.
+    """
+
+    def __init__(self, routes, fallback=None):
+        self.routes = routes  # device -> backend class
+        self.fallback = fallback
+        self.name = "+".join(dict.fromkeys(cls.name for cls in routes.values()))
+        self._instances = {}  # backend class -> instance
+        self._by_device = {}
+
+    def _build(self, cls):
+        backend = self._instances.get(cls)
+        if backend is None:
+            try:
+                backend = cls()
+            except Exception as e:  # e.g. no evdev / no permission on /dev/uinput
+                if self.fallback is None or cls is self.fallback:
+                    raise
+                print(f">> {cls.name} unavailable ({e}), falling back to {self.fallback.name}")
+                backend = self._build(self.fallback)
+            self._instances[cls] = backend
+        return backend
+
+    def backend_for(self, device):
+        backend = self._by_device.get(device)
+        if backend is None:
+            backend = self._by_device[device] = self._build(self.routes[device])
+        return backend
+
+    def prepare(self, devices):
+        for device in devices:
+            if device in self.routes:
+                self.backend_for(device)
+
+    def apply(self, batch):
+        # Keep each backend's events together (uinput commits a batch with one SYN)
+        groups = {}
+        for event in batch:
+            groups.setdefault(self.backend_for(event[0]), []).append(event)
+        for backend, events in groups.items():
+            backend.apply(events)
+
+    def close(self):
+        for backend in set(self._instances.values()):
+            backend.close()
+
+
+class UInputBackend(InputBackend):
+    """Linux /dev/uinput virtual device via python-evdev.
+
+    A whole batch is written and then committed with a single SYN_REPORT, so
+    the kernel sees one frame's changes as one atomic input report.
+    """
+    name = "uinput"
+
+    def __init__(self):
+        from evdev import UInput, ecodes
+        self.ecodes = ecodes
+        self.buttons = {"left": ecodes.BTN_LEFT, "right": ecodes.BTN_RIGHT, "middle": ecodes.BTN_MIDDLE}
+        keys = {code for name, code in ecodes.ecodes.items()
+                if name.startswith("KEY_") and code < ecodes.KEY_MAX}
+        self.device = UInput({ecodes.EV_KEY: sorted(keys | set(self.buttons.values())),
+                              ecodes.EV_REL: [ecodes.REL_X, ecodes.REL_Y]},
+                             name="handsfreeplay-input")
+
+    def _code(self, device, name):
+        if device == "mouse":
+            return self.buttons[name]
+        return self.ecodes.ecodes[f"KEY_{name.upper()}"]
+
+    def key(self, name, down):
+        self.apply([("key", name, down)])
+
+    def mouse(self, button, down):
+        self.apply([("mouse", button, down)])
+
+    def move(self, dx, dy):
+        self.apply([("pointer", "move", (dx, dy))])
+
+    def apply(self, batch):
+        for device, name, down in batch:
+            if device == "pointer":
+                dx, dy = down
+                if dx:
+                    self.device.write(self.ecodes.EV_REL, self.ecodes.REL_X, dx)
+                if dy:
+                    self.device.write(self.ecodes.EV_REL, self.ecodes.REL_Y, dy)
+                continue
+            self.device.write(self.ecodes.EV_KEY, self._code(device, name), 1 if down else 0)
+        self.device.syn()
+
+    def close(self):
+        self.device.close()
+
+
+class StubBackend(InputBackend):
+    """Records events in memory instead of touching the OS (replay / tests)."""
+    name = "stub"
+
+    def __init__(self, clock=None):
+        self.events = []  # (timestamp, device, name, down)
+        self.clock = clock or time.perf_counter
+
+    def apply(self, batch):
+        t = self.clock()
+        for device, name, down in batch:
+            self.events.append((t, device, name, down))
+
+
+BACKENDS = {
+    "pyautogui": lambda: LazyBackend({"key": PyAutoGuiBackend, "mouse": PyAutoGuiBackend,
+                                      "pointer": PyAutoGuiBackend}),
+    "keyboard": lambda: LazyBackend({"key": KeyboardBackend, "mouse": PyAutoGuiBackend,
+                                     "pointer": PyAutoGuiBackend}),
+    "uinput": lambda: LazyBackend({"key": UInputBackend, "mouse": UInputBackend, "pointer": UInputBackend}),
+    "stub": StubBackend,
+}
+
+
+def create_backend(name="auto"):
+    """Build a backend by name; "auto" picks the best one for this platform."""
+    if name != "auto":
+        return BACKENDS[name]()
+    if sys.platform.startswith("linux"):
+        return LazyBackend({"key": UInputBackend, "mouse": UInputBackend, "pointer": UInputBackend},
+                           fallback=PyAutoGuiBackend)
+    # keyboard's scan-code injection is what games pick up on Windows
+    return BACKENDS["keyboard"]()
+
+
+class Actuator:
+    """Applies event batches on a dedicated thread so injection never blocks the vision loop."""
+
+    def __init__(self, backend, stats=None):
+        self.backend = backend
+        self.stats = stats
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._loop, name="actuator", daemon=True)
+        self._thread.start()
+
+    def submit(self, batch):
+        self._queue.put((time.perf_counter(), batch))
+
+    def prepare(self, devices):
+        """Build backends for these devices on the actuator thread, ahead of the first event."""
+        self._queue.put((None, devices))
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+            t_submit, batch = item
+            if t_submit is None:
+                try:
+                    self.backend.prepare(batch)
+                except Exception as e:
+                    print(f">> INPUT ERROR ({self.backend.name}): {e}")
+                continue
+            try:
+                self.backend.apply(batch)
+            except Exception as e:
+                print(f">> INPUT ERROR ({self.backend.name}): {e}")
+            if self.stats is not None:
+                self.stats.add("inject", time.perf_counter() - t_submit)
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=1.0)
+        self.backend.close()
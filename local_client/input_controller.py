@@ -1,90 +1,144 @@
-import pyautogui
-import keyboard
+from cursor import CursorOutput
+from input_backends import Actuator, StubBackend, create_backend
+from steering import GamepadSteering, KeySteering, PwmSteering
 
 class InputController:
-    def __init__(self):
+    """Tracks which keys/buttons should be held and flushes changes once per frame.
+
+    set() and set_axis() only update the wanted state; flush() diffs it
+    against what is actually held and sends the difference to the backend as
+    one batch (on the actuator thread when threaded=True).
+    """
+
+    def __init__(self, backend="auto", threaded=True, stats=None, steering="keys", hysteresis=0.25,
+                 on_change=None):
         self.current_profile = "default"
-        self.pressing = {'w': False, 'a': False, 's': False, 'd': False}
-        self.clicking = {'left': False, 'right': False}
-        self.prev_steering_key = None
+        self.steering_mode = steering  # "keys" (on/off), "pwm" or "gamepad"
+        self.hysteresis = hysteresis
+        self.steering = None
+        self.cursor = None
+        self._cursor_config = None
+        self.cursor_overrides = {}  # CursorOutput keywords that win over the mode's (replay)
+        self.backend = create_backend(backend) if isinstance(backend, str) else backend
+        self.actuator = Actuator(self.backend, stats) if threaded else None
+        self.held = {}     # (device, name) -> True for everything currently held down
+        self._wanted = {}  # changes requested since the last flush
+        self.on_change = on_change  # called with each flushed batch (e.g. telemetry)
+        if steering == "gamepad":
+            # Probe the virtual gamepad now: failing mid-game would drop steering
+            try:
+                self.steering = GamepadSteering()
+            except Exception as e:  # no evdev, not Linux, or no /dev/uinput access
+                print(f">> GAMEPAD unavailable ({e}); steering with PWM keys instead")
+                self.steering_mode = "pwm"
 
     def set_profile(self, profile_name):
         self.current_profile = profile_name
         print(f"Switched to profile: {profile_name}")
 
-    def reset_inputs(self):
-        """Release all held keys."""
-        for key in self.pressing:
-            if self.pressing[key]:
-                keyboard.release(key)
-                self.pressing[key] = False
-        if self.prev_steering_key:
-            pyautogui.keyUp(self.prev_steering_key)
-            self.prev_steering_key = None
-
-    def handle_mouse_clicks(self, left_closed, right_closed):
-        if left_closed and not self.clicking['left']:
-            pyautogui.mouseDown(button='left')
-            self.clicking['left'] = True
-        elif not left_closed and self.clicking['left']:
-            pyautogui.mouseUp(button='left')
-            self.clicking['left'] = False
-
-        if right_closed and not self.clicking['right']:
-            pyautogui.mouseDown(button='right')
-            self.clicking['right'] = True
-        elif not right_closed and self.clicking['right']:
-            pyautogui.mouseUp(button='right')
-            self.clicking['right'] = False
-
-    def handle_wasd(self, avg_tilt, avg_height, neutral_height):
-        if neutral_height is None: 
+    def prepare(self, devices):
+        """Create the input backends these devices need without blocking the caller."""
+        if self.actuator is not None:
+            self.actuator.prepare(devices)
+        else:
+            self.backend.prepare(devices)
+
+    def set(self, device, name, down):
+        """Request a key ("key", 'w') or mouse button ("mouse", 'left') to be held or released."""
+        self._wanted[(device, name)] = down
+
+    def set_axis(self, axis, value):
+        """Drive an analog axis in [-1, 1]; only "steering" exists today."""
+        if axis != "steering":
             return
+        if self.steering is None:
+            if self.steering_mode == "pwm":
+                self.steering = PwmSteering(self._send)
+            else:
+                self.steering = KeySteering(self.set, hysteresis=self.hysteresis)
+        self.steering.set(value)
 
-        height_diff = avg_height - neutral_height
+    def set_pointer(self, point, config):
+        """Move the cursor toward a normalized camera point; None means the hand was lost.
 
-        # A/D - Left/Right
-        if avg_tilt < -0.02:
-            self._update_key('a', True)
-            self._update_key('d', False)
-        elif avg_tilt > 0.02:
-            self._update_key('d', True)
-            self._update_key('a', False)
+        config is the mode's "cursor" settings (cursor.CursorOutput keywords);
+        switching to a mode with different settings rebuilds the output.
+        """
+        if self._cursor_config is not config:
+            if self.cursor is not None:
+                self.cursor.stop()
+            self.cursor = CursorOutput(self._send, **{**config, **self.cursor_overrides})
+            self._cursor_config = config
+        if point is None:
+            self.cursor.release()
         else:
-            self._update_key('a', False)
-            self._update_key('d', False)
-
-        # W/S - Forward/Backward
-        if height_diff < -0.03:
-            self._update_key('w', True)
-            self._update_key('s', False)
-        elif height_diff > 0.03:
-            self._update_key('s', True)
-            self._update_key('w', False)
+            self.cursor.update(*point)
+
+    def flush(self):
+        """Send this frame's state changes as a single batch."""
+        if not self._wanted:
+            return
+        releases, presses = [], []
+        for (device, name), down in self._wanted.items():
+            if down and (device, name) not in self.held:
+                presses.append((device, name, True))
+                self.held[(device, name)] = True
+            elif not down and (device, name) in self.held:
+                releases.append((device, name, False))
+                del self.held[(device, name)]
+        self._wanted.clear()
+
+        # Releases first so e.g. an a -> d switch never has both keys down
+        batch = releases + presses
+        if batch:
+            self._send(batch)
+            if self.on_change is not None:
+                self.on_change(batch)
+
+    def _send(self, batch):
+        if self.actuator is not None:
+            self.actuator.submit(batch)
         else:
-            self._update_key('w', False)
-            self._update_key('s', False)
-
-    def handle_steering(self, angle):
-        """Racing mode steering logic."""
-        # Normalize and decide key
-        strength = angle / 45.0
-        target_key = None
-        
-        if strength < -0.2: target_key = 'a'
-        elif strength > 0.2: target_key = 'd'
-        
-        if target_key != self.prev_steering_key:
-            if self.prev_steering_key:
-                pyautogui.keyUp(self.prev_steering_key)
-            if target_key:
-                pyautogui.keyDown(target_key)
-            self.prev_steering_key = target_key
-
-    def _update_key(self, key, press):
-        if press and not self.pressing[key]:
-            keyboard.press(key)
-            self.pressing[key] = True
-        elif not press and self.pressing[key]:
-            keyboard.release(key)
-            self.pressing[key] = False
+            self.backend.apply(batch)
+
+    def reset_inputs(self):
+        """Release all held keys."""
+        if self.steering is not None:
+            self.steering.set(0.0)
+        if self.cursor is not None:
+            # Idle until the next pointer sample: a mode without a cursor
+            # must not keep the pointer thread ticking
+            self.cursor.release()
+            self.cursor.stop()
+        for device, name in list(self.held):
+            self.set(device, name, False)
+        self.flush()
+
+    def close(self):
+        self.reset_inputs()
+        if self.steering is not None:
+            self.steering.stop()
+            self.flush()
+        if self.cursor is not None:
+            self.cursor.stop()
+        if self.actuator is not None:
+            self.actuator.close()
+        else:
+            self.backend.close()
+
+
+class RecordingController(InputController):
+    """InputController on the in-memory stub backend (replay/tests).
+
+    The cursor sends each sample's step directly, timed by cursor_clock
+    (default: clock), so replayed pointer events do not depend on a thread.
+    """
+
+    def __init__(self, clock=None, cursor_clock=None, **kwargs):
+        clock = clock or (lambda: 0.0)
+        super().__init__(backend=StubBackend(clock), threaded=False, **kwargs)
+        self.cursor_overrides = {"rate": 0, "clock": cursor_clock or clock}
+
+    @property
+    def events(self):
+        return self.backend.events
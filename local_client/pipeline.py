@@ -0,0 +1,202 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import deque
+
+import numpy as np
+
+# Latency samples StageStats keeps per stage
+STATS_WINDOW = 300
+
+class LatestSlot:
+    """Single-slot queue where the newest item always wins.
+
+    put() never blocks: if the consumer has not picked up the previous item
+    yet it is overwritten (and counted as dropped), so a slow stage only ever
+    sees the freshest frame instead of working through a backlog. on_drop is
+    called with each overwritten item (e.g. to release its buffers).
+    """
+
+    def __init__(self, on_drop=None):
+        self._cond = threading.Condition()
+        self._item = None
+        self._full = False
+        self.dropped = 0
+        self.on_drop = on_drop
+
+    def put(self, item):
+        with self._cond:
+            if self._full:
+                self.dropped += 1
+                if self.on_drop is not None:
+                    self.on_drop(self._item)
+            self._item = item
+            self._full = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Return the newest item, or None if nothing arrived within timeout."""
+        with self._cond:
+            if not self._full:
+                self._cond.wait(timeout)
+            if not self._full:
+                return None
+            item = self._item
+            self._item = None
+            self._full = False
+            return item
+
+
+class BufferSet:
+    """One frame's reusable arrays and objects, from a BufferPool."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.buffers = {}
+        self.refs = 0
+
+    def get(self, name, shape, dtype=np.uint8):
+        """This set's buffer `name`, reallocated only when the shape changes."""
+        buf = self.buffers.get(name)
+        if buf is None or buf.shape != shape or buf.dtype != dtype:
+            buf = self.buffers[name] = np.empty(shape, dtype=dtype)
+            self.pool.allocations += 1
+        return buf
+
+    def peek(self, name):
+        """This set's buffer or object `name` if there is one (e.g. for cap.read(image))."""
+        return self.buffers.get(name)
+
+    def keep(self, name, value):
+        """Store an array or object produced elsewhere for reuse by this set."""
+        self.buffers[name] = value
+        return value
+
+    def retain(self):
+        """One more holder of this frame; each holder calls release() once."""
+        self.pool.retain(self)
+        return self
+
+    def release(self):
+        self.pool.release(self)
+
+
+class BufferPool:
+    """Reusable per-frame output arrays, in BufferSets.
+
+    Call next() once per frame, then get() each buffer that frame writes
+    (cv2 dst=, np out=). Without `owned`, next() hands out the `depth` sets
+    round-robin, which is safe when a set is done with before it comes round
+    again: a serial loop with depth=1.
+
+    With owned=True (frames held by several threads), next() takes the least
+    recently freed set with one reference for the caller. Whoever the frame
+    is handed to releases it, extra holders retain() first, and a set is only
+    reused after its last release. If every set is held a new one is made, so
+    a frame is never overwritten while in use; `depth` sets are made up front
+    and cycled, so their buffers are allocated while the pipeline warms up.
+    """
+
+    def __init__(self, depth=1, owned=False):
+        self.owned = owned
+        self._lock = threading.Lock()
+        self._sets = [BufferSet(self) for _ in range(depth)]
+        self._free = deque(self._sets)
+        self._index = 0
+        self.allocations = 0
+
+    @property
+    def depth(self):
+        return len(self._sets)
+
+    def next(self):
+        if not self.owned:
+            self._index = (self._index + 1) % len(self._sets)
+            return self._sets[self._index]
+        with self._lock:
+            if self._free:
+                buffers = self._free.popleft()
+            else:
+                buffers = BufferSet(self)
+                self._sets.append(buffers)
+            buffers.refs = 1
+        return buffers
+
+    def retain(self, buffers):
+        if self.owned:
+            with self._lock:
+                buffers.refs += 1
+
+    def release(self, buffers):
+        if self.owned:
+            with self._lock:
+                buffers.refs -= 1
+                if buffers.refs == 0:
+                    self._free.append(buffers)
+
+
+class StageStats:
+    """Rolling per-stage latency samples (milliseconds)."""
+
+    def __init__(self, window=STATS_WINDOW):
+        self._lock = threading.Lock()
+        self._window = window
+        self._samples = {}
+
+    def add(self, stage, seconds):
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = deque(maxlen=self._window)
+            self._samples[stage].append(seconds * 1000.0)
+
+    def summary(self):
+        """Return {stage: (p50, p95, p99, count)} over the current window."""
+        with self._lock:
+            snapshot = {k: sorted(v) for k, v in self._samples.items()}
+        out = {}
+        for stage, values in snapshot.items():
+            if not values:
+                continue
+            n = len(values)
+            pick = lambda q: values[min(n - 1, int(n * q))]
+            out[stage] = (pick(0.50), pick(0.95), pick(0.99), n)
+        return out
+
+    def histogram(self, edges):
+        """Return {stage: [count per bucket]} over the current window.
+
+        edges are ascending upper bounds in ms; the last bucket counts
+        everything above edges[-1].
+        """
+        with self._lock:
+            snapshot = {k: list(v) for k, v in self._samples.items()}
+        out = {}
+        for stage, values in snapshot.items():
+            counts = [0] * (len(edges) + 1)
+            for v in values:
+                counts[bisect_left(edges, v)] += 1
+            out[stage] = counts
+        return out
+
+    def report(self, prefix=">> LATENCY"):
+        parts = [f"{stage} p50={p50:.1f}ms p95={p95:.1f}ms"
+                 for stage, (p50, p95, _, _) in self.summary().items()]
+        if parts:
+            print(f"{prefix} | " + " | ".join(parts))
+
+
+class PeriodicReporter:
+    """Calls StageStats.report() at most once per interval."""
+
+    def __init__(self, stats, interval=5.0):
+        self.stats = stats
+        self.interval = interval
+        self._last = time.perf_counter()
+
+    def tick(self, extra=""):
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self.stats.report()
+            if extra:
+                print(extra)
+            self._last = now
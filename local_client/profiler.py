@@ -0,0 +1,305 @@
+"""Hot-path span profiler for the client frame loop.
+
+    with profiler.span("imshow"):
+        cv2.imshow(...)
+
+Each span lands in a fixed-size ring buffer (the most recent N spans per
+stage, for traces) and a log-linear HDR-style histogram (all spans, ~3%
+bucket precision, for percentiles). Nothing is allocated per span. While
+disabled, span() returns a shared no-op context manager, so instrumented
+code pays one attribute check and an empty with-block.
+
+    python profiler.py --bench    # measure the per-span overhead
+"""
+import json
+import threading
+import time
+import tracemalloc
+
+SUB_BITS = 6            # 2^(SUB_BITS-1) = 32 linear sub-buckets per power of two
+MAX_US = 10_000_000     # spans are clamped to 10 s
+
+
+def _bucket(us):
+    if us < (1 << SUB_BITS):
+        return us
+    shift = us.bit_length() - SUB_BITS
+    return (shift << (SUB_BITS - 1)) + (us >> shift)
+
+
+def _bucket_value(idx):
+    """Midpoint (in us) of the values that fall into bucket idx."""
+    if idx < (1 << SUB_BITS):
+        return float(idx)
+    shift = (idx >> (SUB_BITS - 1)) - 1
+    sub = idx - (shift << (SUB_BITS - 1))
+    return ((sub << shift) + ((sub + 1) << shift) - 1) / 2.0
+
+
+class HdrHistogram:
+    """Log-linear latency histogram over microseconds with a fixed bucket array."""
+
+    def __init__(self, max_us=MAX_US):
+        self.max_us = max_us
+        self.counts = [0] * (_bucket(max_us) + 1)
+        self.total = 0
+        self.sum_us = 0
+        self.max_seen = 0
+
+    def record(self, us):
+        if us > self.max_us:
+            us = self.max_us
+        self.counts[_bucket(us)] += 1
+        self.total += 1
+        self.sum_us += us
+        if us > self.max_seen:
+            self.max_seen = us
+
+    def percentile(self, q):
+        """Value (us) at quantile q in [0, 1]."""
+        if not self.total:
+            return 0.0
+        rank = max(1, int(round(q * self.total)))
+        seen = 0
+        for idx, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return min(_bucket_value(idx), float(self.max_seen))
+        return float(self.max_seen)
+
+    def mean(self):
+        return self.sum_us / self.total if self.total else 0.0
+
+
+class SpanRing:
+    """The last `capacity` spans of one stage: start (ns), duration (us), thread."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.start_ns = [0] * capacity
+        self.dur_us = [0] * capacity
+        self.thread = [0] * capacity
+        self.count = 0
+
+    def add(self, start_ns, dur_us, thread):
+        i = self.count % self.capacity
+        self.start_ns[i] = start_ns
+        self.dur_us[i] = dur_us
+        self.thread[i] = thread
+        self.count += 1
+
+    def spans(self):
+        """Stored spans, oldest first."""
+        n = min(self.count, self.capacity)
+        first = self.count - n
+        return [(self.start_ns[j % self.capacity], self.dur_us[j % self.capacity],
+                 self.thread[j % self.capacity]) for j in range(first, self.count)]
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("stage", "t0")
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.t0 = 0
+
+    def __enter__(self):
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        t1 = time.perf_counter_ns()
+        self.stage.record(self.t0, t1)
+        return False
+
+
+class Stage:
+    def __init__(self, name, capacity):
+        self.name = name
+        self.histogram = HdrHistogram()
+        self.ring = SpanRing(capacity)
+        # One reusable span object per thread: spans of a stage never nest
+        self._local = threading.local()
+
+    def span(self):
+        span = getattr(self._local, "span", None)
+        if span is None:
+            span = self._local.span = _Span(self)
+        return span
+
+    def record(self, t0_ns, t1_ns):
+        us = (t1_ns - t0_ns) // 1000
+        self.histogram.record(us)
+        self.ring.add(t0_ns, us, threading.get_ident())
+
+
+class Profiler:
+    """Named spans on the monotonic clock, togglable at runtime."""
+
+    def __init__(self, enabled=False, capacity=2048):
+        self.enabled = enabled
+        self.capacity = capacity
+        self.stages = {}
+        self._lock = threading.Lock()
+        self._origin_ns = time.perf_counter_ns()
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        stage = self.stages.get(name)
+        if stage is None:
+            with self._lock:
+                stage = self.stages.setdefault(name, Stage(name, self.capacity))
+        return stage.span()
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        print(f">> PROFILER {'ON' if self.enabled else 'OFF'}")
+        return self.enabled
+
+    def summary(self):
+        """{stage: (count, mean_ms, p50_ms, p99_ms, max_ms)} in first-seen order."""
+        out = {}
+        for name, stage in list(self.stages.items()):
+            h = stage.histogram
+            out[name] = (h.total, h.mean() / 1000, h.percentile(0.50) / 1000,
+                         h.percentile(0.99) / 1000, h.max_seen / 1000)
+        return out
+
+    def report(self, prefix=">> PROFILE"):
+        for name, (n, mean, p50, p99, peak) in self.summary().items():
+            print(f"{prefix} | {name:<16} n={n:<6} mean={mean:6.2f}ms p50={p50:6.2f}ms "
+                  f"p99={p99:6.2f}ms max={peak:6.2f}ms")
+
+    def overlay(self, frame, origin=(10, 90)):
+        """Draw per-stage p50/p99 onto a preview frame."""
+        import cv2
+        x, y = origin
+        for name, (n, mean, p50, p99, peak) in self.summary().items():
+            cv2.putText(frame, f"{name:<14} {p50:5.1f} / {p99:5.1f} ms", (x, y),
+                        cv2.FONT_HERSHEY_PLAIN, 1.0, (0, 255, 255), 1)
+            y += 16
+
+    def export(self, path):
+        """Write a Chrome trace (chrome://tracing, Perfetto) plus histograms as JSON."""
+        events = []
+        threads = {}
+        for name, stage in list(self.stages.items()):
+            for start_ns, dur_us, thread in stage.ring.spans():
+                tid = threads.setdefault(thread, len(threads) + 1)
+                events.append({"name": name, "ph": "X", "pid": 1, "tid": tid,
+                               "ts": (start_ns - self._origin_ns) / 1000, "dur": dur_us})
+        events.sort(key=lambda e: e["ts"])
+        histograms = {}
+        for name, stage in list(self.stages.items()):
+            h = stage.histogram
+            histograms[name] = {
+                "count": h.total, "mean_us": h.mean(), "max_us": h.max_seen,
+                "percentiles_us": {str(q): h.percentile(q) for q in (0.5, 0.9, 0.99, 0.999)},
+                "buckets": [[_bucket_value(i), c] for i, c in enumerate(h.counts) if c],
+            }
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms",
+                       "otherData": {"histograms": histograms}}, f)
+        print(f">> PROFILE exported {len(events)} spans to {path}")
+
+
+class AllocationCheck:
+    """tracemalloc self-check that a frame loop has no steady-state heap growth.
+
+    Call tick() once per frame. After `warmup` frames (buffers allocated,
+    caches filled) tracing starts; over the next `frames` frames it records
+    each frame's transient peak and, at the end, the net heap growth by
+    allocation site.
+    """
+
+    def __init__(self, frames=300, warmup=300, budget_bytes=64 * 1024):
+        self.frames = frames
+        self.warmup = warmup
+        self.budget_bytes = budget_bytes
+        self.count = 0
+        self.peaks = [0] * frames  # preallocated: the check must not grow the heap itself
+        self._before = None
+        self._base = 0
+
+    def tick(self):
+        """Mark a frame boundary; returns True once the check has seen enough frames."""
+        self.count += 1
+        if self.count == self.warmup:
+            tracemalloc.start()
+            self._before = tracemalloc.take_snapshot()
+        elif self.count > self.warmup:
+            current, peak = tracemalloc.get_traced_memory()
+            self.peaks[self.count - self.warmup - 1] = peak - self._base
+        if self.count >= self.warmup:
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+        return self.count >= self.warmup + self.frames
+
+    def report(self, top=5):
+        """Print growth and per-frame allocation; returns True if growth is within budget."""
+        if self.count < self.warmup + self.frames:
+            if self._before is not None:
+                tracemalloc.stop()
+            print(f">> ALLOC CHECK | source ended after {self.count} frames, need {self.warmup + self.frames}")
+            return False
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = after.filter_traces(ignore).compare_to(self._before.filter_traces(ignore), "lineno")
+        growth = sum(d.size_diff for d in diff)
+        frames = self.count - self.warmup
+        peaks = sorted(self.peaks[:frames])
+        ok = growth <= self.budget_bytes
+        print(f">> ALLOC CHECK | {frames} frames after {self.warmup} warm-up | "
+              f"heap growth {growth / 1024:+.1f} KiB ({growth / max(frames, 1):+.0f} B/frame, "
+              f"budget {self.budget_bytes / 1024:.0f} KiB) | per-frame transient peak "
+              f"p50={peaks[len(peaks) // 2] / 1024:.1f} KiB max={peaks[-1] / 1024:.1f} KiB | "
+              f"{'OK' if ok else 'FAIL'}")
+        for d in sorted(diff, key=lambda d: d.size_diff, reverse=True)[:top]:
+            if d.size_diff > 0:
+                print(f"   {d.size_diff / 1024:+8.1f} KiB {d.count_diff:+6d} blocks  {d.traceback}")
+        return ok
+
+
+def _bench(iterations=200_000):
+    """Per-span cost with the profiler disabled and enabled."""
+    results = {}
+    for enabled in (False, True):
+        profiler = Profiler(enabled=enabled)
+        t0 = time.perf_counter()
+        for _ in range(iterations):
+            with profiler.span("bench"):
+                pass
+        results[enabled] = (time.perf_counter() - t0) / iterations * 1e9
+    t0 = time.perf_counter()
+    for _ in range(iterations):
+        pass
+    baseline = (time.perf_counter() - t0) / iterations * 1e9
+    print(f">> SPAN OVERHEAD | empty loop {baseline:.0f}ns | disabled {results[False] - baseline:.0f}ns "
+          f"| enabled {results[True] - baseline:.0f}ns per span")
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="Hot-path profiler")
+    parser.add_argument("--bench", action="store_true", help="measure per-span overhead")
+    parser.add_argument("--iterations", type=int, default=200_000)
+    args = parser.parse_args()
+    if args.bench:
+        _bench(args.iterations)
+    else:
+        parser.print_help()
@@ -0,0 +1,82 @@
+import json
+import time
+
+import numpy as np
+
+# Handedness label <-> compact code stored on disk
+LABEL_CODES = {"Left": 0, "Right": 1}
+LABEL_NAMES = {v: k for k, v in LABEL_CODES.items()}
+MAX_HANDS = 2
+
+
+class SessionRecorder:
+    """Collects per-frame landmarks with timestamps and saves them as .npz.
+
+    Layout: t (N,) float64 seconds since the first frame, points
+    (N, MAX_HANDS, 21, 3) float32 with NaN for missing hands, labels
+    (N, MAX_HANDS) int8 with -1 for missing hands.
+    """
+
+    def __init__(self, path, meta=None):
+        self.path = path
+        self.meta = dict(meta or {})
+        self._t0 = None
+        self._t = []
+        self._points = []
+        self._labels = []
+
+    def add(self, timestamp, points, labels):
+        """Record one frame's raw detections: (hands, 21, 3) points and their labels.
+
+        Pass the detector output before tracking and smoothing; replay.py
+        runs those stages again.
+        """
+        if self._t0 is None:
+            self._t0 = timestamp
+        n = min(len(labels), MAX_HANDS)
+        frame_points = np.full((MAX_HANDS, 21, 3), np.nan, dtype=np.float32)
+        frame_labels = np.full(MAX_HANDS, -1, dtype=np.int8)
+        frame_points[:n] = points[:n]
+        frame_labels[:n] = [LABEL_CODES.get(label, 1) for label in labels[:n]]
+        self._t.append(timestamp - self._t0)
+        self._points.append(frame_points)
+        self._labels.append(frame_labels)
+
+    def __len__(self):
+        return len(self._t)
+
+    def save(self):
+        self.meta.setdefault("recorded_at", time.strftime("%Y-%m-%d %H:%M:%S"))
+        np.savez_compressed(
+            self.path,
+            t=np.asarray(self._t, dtype=np.float64),
+            points=np.asarray(self._points, dtype=np.float32).reshape(-1, MAX_HANDS, 21, 3),
+            labels=np.asarray(self._labels, dtype=np.int8).reshape(-1, MAX_HANDS),
+            meta=np.array(json.dumps(self.meta)),
+        )
+        print(f">> RECORDED {len(self)} frames to {self.path}")
+
+
+class Session:
+    """A recorded session loaded back from disk."""
+
+    def __init__(self, path):
+        with np.load(path) as data:
+            self.t = data["t"]
+            self.points = data["points"]
+            self.labels = data["labels"]
+            self.meta = json.loads(str(data["meta"])) if "meta" in data else {}
+
+    def __len__(self):
+        return len(self.t)
+
+    @property
+    def duration(self):
+        return float(self.t[-1]) if len(self.t) else 0.0
+
+    def frames(self):
+        """Yield (timestamp, (hands, 21, 3) batch, [labels]) per frame."""
+        for i in range(len(self.t)):
+            present = self.labels[i] >= 0
+            labels = [LABEL_NAMES[int(code)] for code in self.labels[i][present]]
+            yield float(self.t[i]), self.points[i][present], labels
@@ -0,0 +1,161 @@
+"""Headless replay of recorded sessions through the client control pipeline.
+
+Record on a machine with a camera:
+    python client.py --record session.npz
+Replay anywhere (no camera, display or input devices needed):
+    python replay.py session.npz --profile fps --events events.csv
+"""
+import argparse
+import os
+import sys
+import time
+
+from bindings import load_profiles
+from calibration import DEFAULT_PATH as CALIBRATION_PATH, CalibrationStore
+from filters import LandmarkSmoother
+from gesture_classifier import GestureClassifier
+from gesture_engine import compute_features
+from gesture_mapper import GestureMapper
+from hand_tracker import HandTracker
+from input_controller import RecordingController
+from pipeline import StageStats
+from recording import Session
+
+PROFILES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles.json")
+
+
+def replay(session, profile=None, realtime=False, repeat=1, steering="keys",
+           smoothing=True, predict_ms=0.0, hysteresis=0.25, profiles_path=PROFILES_PATH,
+           classifier=None, calibration=None, tracking=True):
+    """Feed a session through feature extraction + mapping with a stub controller.
+
+    Without a calibration, modes that need one fit it from the session's first
+    two-hand frames (as a first run of the client would) and nothing fires until then.
+
+    Returns (stats, events, frames_per_second, (toggles, suppressed)). Event
+    timestamps are session time plus the processing time spent on that frame.
+    """
+    stats = StageStats(window=len(session) * repeat or 1)
+    frame_clock = {"t": 0.0, "start": 0.0}
+    controller = RecordingController(
+        clock=lambda: frame_clock["t"] + (time.perf_counter() - frame_clock["start"]),
+        cursor_clock=lambda: frame_clock["t"],  # pointer gain must not depend on processing time
+        steering=steering, hysteresis=hysteresis)
+    _, default_mode, modes = load_profiles(profiles_path)
+    controller.current_profile = profile or default_mode
+    mapper = GestureMapper(controller, modes, default_mode, hysteresis, calibration=calibration)
+    smoother = LandmarkSmoother(predict_ms=predict_ms) if smoothing else None
+    tracker = HandTracker() if tracking else None
+
+    frames = 0
+    wall_start = time.perf_counter()
+    for _ in range(repeat):
+        mapper.reset()
+        if smoother is not None:
+            smoother.filters.clear()
+        if classifier is not None:
+            classifier.reset()
+        if tracker is not None:
+            tracker.reset()
+        for t, points, labels in session.frames():
+            if realtime:
+                delay = t - (time.perf_counter() - wall_start)
+                if delay > 0:
+                    time.sleep(delay)
+            t0 = time.perf_counter()
+            frame_clock["t"], frame_clock["start"] = t, t0
+            if tracker is not None:
+                points, labels = tracker.update(points, labels, t)
+            if smoother is not None:
+                points = smoother.apply(points.copy(), tracker.ids if tracker is not None else labels, t)
+            gestures = classifier.classify(points, labels) if classifier is not None else None
+            features = compute_features(points, labels, gestures)
+            t1 = time.perf_counter()
+            mapper.apply(features)
+            controller.flush()
+            t2 = time.perf_counter()
+            stats.add("features", t1 - t0)
+            stats.add("controls", t2 - t1)
+            stats.add("frame", t2 - t0)
+            frames += 1
+        controller.reset_inputs()
+    controller.close()
+    elapsed = time.perf_counter() - wall_start
+    chatter = mapper.chatter()
+    return stats, controller.events, frames / elapsed if elapsed > 0 else 0.0, chatter
+
+
+def write_events(events, path):
+    with open(path, "w") as f:
+        f.write("time_s,device,name,down\n")
+        for t, device, name, down in events:
+            # pointer moves carry (dx, dy) instead of a button state
+            state = "{} {}".format(*down) if device == "pointer" else int(down)
+            f.write(f"{t:.6f},{device},{name},{state}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded HandsFreePlay session headlessly")
+    parser.add_argument("session", help=".npz file written by client.py --record")
+    parser.add_argument("--profile", help="mode from profiles.json (default: its default_mode)")
+    parser.add_argument("--profiles", default=PROFILES_PATH, help="profiles file to load modes from")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the session N times")
+    parser.add_argument("--realtime", action="store_true", help="pace frames at recorded timestamps")
+    parser.add_argument("--steering", default="keys", choices=["keys", "pwm"],
+                        help="racing output to replay through (pwm needs --realtime to be meaningful)")
+    parser.add_argument("--no-smoothing", action="store_true", help="replay raw landmarks")
+    parser.add_argument("--predict-ms", type=float, default=0.0, help="landmark prediction horizon")
+    parser.add_argument("--hysteresis", type=float, default=0.25, help="threshold release band")
+    parser.add_argument("--classifier", metavar="MODEL",
+                        help="gesture model from gesture_classifier.py train (adds gesture.* features)")
+    parser.add_argument("--no-track", action="store_true",
+                        help="take the recorded per-frame labels instead of tracking hand identities "
+                             "(as client.py --no-tracking)")
+    parser.add_argument("--user", help="replay with this user's stored calibration (see calibration.py)")
+    parser.add_argument("--camera", default="0@1280x720", help="camera key of the stored calibration")
+    parser.add_argument("--calibration", default=CALIBRATION_PATH, metavar="PATH", help="calibration file")
+    parser.add_argument("--events", metavar="CSV", help="write the emitted input timeline here")
+    parser.add_argument("--max-p99-ms", type=float,
+                        help="exit non-zero if per-frame p99 exceeds this (release gate)")
+    args = parser.parse_args()
+
+    session = Session(args.session)
+    print(f">> SESSION | {len(session)} frames, {session.duration:.1f}s, meta={session.meta}")
+
+    classifier = GestureClassifier.load(args.classifier) if args.classifier else None
+    calibration = None
+    if args.user:
+        calibration = CalibrationStore(args.calibration).load(args.user, args.camera)
+        if calibration is None:
+            print(f">> FAIL | no calibration for {args.user} @ {args.camera} in {args.calibration}")
+            return 1
+        print(f">> CALIBRATION | {calibration.describe()}")
+    stats, events, fps, (toggles, suppressed) = replay(
+        session, args.profile, args.realtime, args.repeat, args.steering,
+        not args.no_smoothing, args.predict_ms, args.hysteresis, args.profiles, classifier, calibration,
+        not args.no_track)
+
+    print(f">> THROUGHPUT | {fps:.0f} frames/s")
+    summary = stats.summary()
+    for stage, (p50, p95, p99, n) in summary.items():
+        print(f">> {stage:<9}| p50={p50:.3f}ms p95={p95:.3f}ms p99={p99:.3f}ms n={n}")
+    print(f">> EVENTS | {len(events)} input events")
+    print(f">> CHATTER | toggles={toggles} suppressed={suppressed}")
+    for t, device, name, down in events[:20]:
+        state = "{:+d},{:+d}".format(*down) if device == "pointer" else ("DOWN" if down else "UP")
+        print(f"   {t:8.3f}s {device:<5} {name:<5} {state}")
+    if len(events) > 20:
+        print(f"   ... {len(events) - 20} more")
+
+    if args.events:
+        write_events(events, args.events)
+        print(f">> EVENTS written to {args.events}")
+
+    if args.max_p99_ms is not None and "frame" in summary and summary["frame"][2] > args.max_p99_ms:
+        print(f">> FAIL | frame p99 {summary['frame'][2]:.3f}ms > {args.max_p99_ms}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Continuous steering outputs for racing mode.
+
+The camera only updates the steering strength at camera rate; the analog
+outputs turn it into something a game can read continuously: a PWM-modulated
+key (duty cycle proportional to strength) on its own high-rate timer thread,
+or a virtual gamepad axis on Linux. Strength is in [-1, 1].
+"""
+import threading
+import time
+
+
+def shape_strength(strength, dead_zone=0.05):
+    """Apply a small dead zone to a [-1, 1] strength, rescaling the rest."""
+    magnitude = abs(strength)
+    if magnitude <= dead_zone:
+        return 0.0
+    scaled = (min(magnitude, 1.0) - dead_zone) / (1.0 - dead_zone)
+    return scaled if strength > 0 else -scaled
+
+
+class KeySteering:
+    """Plain on/off steering keys past a threshold (the original racing behaviour)."""
+
+    def __init__(self, set_key, keys=("a", "d"), threshold=0.2, hysteresis=0.25):
+        self.set_key = set_key
+        self.left_key, self.right_key = keys
+        self.threshold = threshold
+        self.release = threshold * (1.0 - hysteresis)
+        self.held = None
+        self.updates = 0
+
+    def set(self, strength):
+        limit = self.release if self.held else self.threshold
+        want = None
+        if strength < -limit:
+            want = self.left_key
+        elif strength > limit:
+            want = self.right_key
+        if want != self.held:
+            self.updates += 1
+            self.held = want
+        self.set_key("key", self.left_key, want == self.left_key)
+        self.set_key("key", self.right_key, want == self.right_key)
+
+    def stop(self):
+        self.set(0.0)
+
+
+class PwmSteering:
+    """Holds left/right keys for a fraction of each period proportional to strength.
+
+    At period=0.05 a strength of 0.3 holds the key for 15ms out of every 50ms.
+    Key changes are sent through emit(batch), normally the controller's own
+    injection path, so all OS input stays on one actuator thread.
+    """
+
+    def __init__(self, emit, keys=("a", "d"), period=0.05, tick=0.002):
+        self.emit = emit
+        self.left_key, self.right_key = keys
+        self.period = period
+        self.tick = tick
+        self.strength = 0.0
+        self.held = None
+        self.updates = 0  # key state changes sent, for reporting
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="pwm-steering", daemon=True)
+        self._thread.start()
+
+    def set(self, strength):
+        self.strength = shape_strength(strength)
+
+    def _loop(self):
+        start = time.perf_counter()
+        next_tick = start
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            strength = self.strength
+            phase = ((now - start) % self.period) / self.period
+            want = None
+            if strength != 0.0 and phase < abs(strength):
+                want = self.left_key if strength < 0 else self.right_key
+            self._hold(want)
+
+            next_tick += self.tick
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()  # fell behind; don't try to catch up
+
+        self._hold(None)
+
+    def _hold(self, key):
+        if key == self.held:
+            return
+        batch = []
+        if self.held is not None:
+            batch.append(("key", self.held, False))
+        if key is not None:
+            batch.append(("key", key, True))
+        self.held = key
+        self.updates += 1
+        self.emit(batch)
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=1.0)
+
+
+class GamepadSteering:
+    """Drives ABS_X of a virtual uinput gamepad (Linux, needs python-evdev)."""
+
+    AXIS_MAX = 32767
+
+    def __init__(self):
+        from evdev import AbsInfo, UInput, ecodes
+        self.ecodes = ecodes
+        axis = AbsInfo(value=0, min=-self.AXIS_MAX, max=self.AXIS_MAX, fuzz=0, flat=0, resolution=0)
+        # Games only recognise a joystick if it also exposes a gamepad button
+        self.device = UInput({ecodes.EV_ABS: [(ecodes.ABS_X, axis)],
+                              ecodes.EV_KEY: [ecodes.BTN_SOUTH]},
+                             name="handsfreeplay-wheel")
+        self.value = 0
+        self.updates = 0
+
+    def set(self, strength):
+        value = int(round(shape_strength(strength) * self.AXIS_MAX))
+        if value == self.value:
+            return
+        self.device.write(self.ecodes.EV_ABS, self.ecodes.ABS_X, value)
+        self.device.syn()
+        self.value = value
+        self.updates += 1
+
+    def stop(self):
+        self.set(0.0)
+        self.device.close()
@@ -0,0 +1,123 @@
+"""Live telemetry from the client to the web dashboard.
+
+TelemetryEmitter batches everything on its own thread and sends one compact
+JSON snapshot per interval over a WebSocket (server: /ws/telemetry):
+
+    {"v": 1, "id": "host-1234", "t": 1700000000.0, "fps": 58.9, "profile": "fps",
+     "stages": {"inference": [p50, p95, p99, n], ...},
+     "hist": {"inference": [count per HIST_EDGES_MS bucket], ...},
+     "keys": [[dt, "key", "w", 1], ...], "lost": 0}
+
+The frame loop only bumps a counter and appends key changes to a bounded
+deque, so a slow or unreachable server never costs frame time: snapshots
+are simply not sent until the connection comes back.
+"""
+import json
+import os
+import platform
+import threading
+import time
+from collections import deque
+
+HIST_EDGES_MS = (1, 2, 4, 8, 16, 33, 66, 133)
+PROTOCOL_VERSION = 1
+
+
+class TelemetryEmitter:
+    """Sends a telemetry snapshot every `interval` seconds (needs websocket-client)."""
+
+    def __init__(self, url, stats, state=None, interval=1.0, max_events=256, client_id=None):
+        self.url = url
+        self.stats = stats
+        self.state = state  # callable returning extra fields, e.g. {"profile": ...}
+        self.interval = interval
+        self.client_id = client_id or f"{platform.node()}-{os.getpid()}"
+        self.frames = 0
+        self.sent = 0
+        self.events_lost = 0
+        self._events = deque(maxlen=max_events)
+        self._last_frames = 0
+        self._last_time = time.perf_counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="telemetry", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+
+    # --- called from the frame loop ---
+
+    def frame(self):
+        self.frames += 1
+
+    def key_changes(self, batch):
+        """Record one flushed batch of (device, name, down) changes."""
+        if len(self._events) + len(batch) > self._events.maxlen:
+            self.events_lost += len(self._events) + len(batch) - self._events.maxlen
+        now = time.perf_counter()
+        self._events.extend((now, device, name, down) for device, name, down in batch)
+
+    # --- telemetry thread ---
+
+    def snapshot(self):
+        now = time.perf_counter()
+        frames = self.frames
+        fps = (frames - self._last_frames) / max(now - self._last_time, 1e-6)
+        self._last_frames, self._last_time = frames, now
+
+        keys = []
+        while self._events:
+            t, device, name, down = self._events.popleft()
+            keys.append([round(t - now, 3), device, name, int(down)])
+
+        message = {
+            "v": PROTOCOL_VERSION,
+            "id": self.client_id,
+            "t": time.time(),
+            "fps": round(fps, 1),
+            "stages": {stage: [round(p50, 2), round(p95, 2), round(p99, 2), n]
+                       for stage, (p50, p95, p99, n) in self.stats.summary().items()},
+            "hist": self.stats.histogram(HIST_EDGES_MS),
+            "keys": keys,
+            "lost": self.events_lost,
+        }
+        if self.state is not None:
+            message.update(self.state())
+        return json.dumps(message, separators=(",", ":"))
+
+    def _run(self):
+        try:
+            import websocket
+        except ImportError as e:
+            print(f">> TELEMETRY disabled: {e}")
+            return
+        ws = None
+        backoff = self.interval
+        next_send = time.perf_counter() + self.interval
+        while not self._stop.wait(max(0.0, next_send - time.perf_counter())):
+            next_send += self.interval
+            message = self.snapshot()  # always taken so fps/keys cover one interval
+            try:
+                if ws is None:
+                    ws = websocket.create_connection(self.url, timeout=2.0)
+                    backoff = self.interval
+                ws.send(message)
+                self.sent += 1
+            except Exception as e:
+                if ws is None:
+                    # Server unreachable: back off instead of retrying every interval
+                    next_send = time.perf_counter() + backoff
+                    backoff = min(backoff * 2, 30.0)
+                    if backoff == self.interval * 2:
+                        print(f">> TELEMETRY offline ({e}); retrying in the background")
+                else:
+                    ws.close()
+                    ws = None
+        if ws is not None:
+            ws.close()
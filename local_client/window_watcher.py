@@ -0,0 +1,125 @@
+"""Active-window tracking for automatic profile switching.
+
+WindowWatcher runs off the frame loop: on Windows it listens for
+foreground-change events via SetWinEventHook, elsewhere it polls
+pygetwindow on its own thread. Titles are resolved by ProfileMatcher and
+only *changes* of profile are published.
+"""
+import re
+import sys
+import threading
+from functools import lru_cache
+
+
+class ProfileMatcher:
+    """Title -> profile lookup compiled into one case-insensitive regex.
+
+    Same semantics as scanning profiles.json in order for the first key that
+    is a substring of the title, but one regex pass instead of N lower() +
+    substring checks, and repeated titles are answered from an LRU cache.
+    """
+
+    def __init__(self, profiles, default="default", cache_size=256):
+        self.default = default
+        self.priority = {}
+        for idx, (key, profile) in enumerate(profiles.items()):
+            self.priority.setdefault(key.lower(), (idx, profile))
+        # The scan reports the longest key starting at each position; every
+        # key also answers for the keys inside it, so a shorter or overlapping
+        # key listed earlier still wins
+        self.best = {key: min(v for k, v in self.priority.items() if k in key) for key in self.priority}
+        keys = sorted(self.priority, key=len, reverse=True)
+        self.regex = re.compile("(?=(" + "|".join(re.escape(k) for k in keys) + "))") if keys else None
+        self.match = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, title):
+        if not title or self.regex is None:
+            return self.default
+        hits = [self.best[m.group(1)] for m in self.regex.finditer(title.lower())]
+        return min(hits)[1] if hits else self.default
+
+
+class WindowWatcher:
+    """Publishes the active window title to on_title(title) whenever it changes."""
+
+    def __init__(self, on_title, interval=0.5):
+        self.on_title = on_title
+        self.interval = interval
+        self.last_title = None
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_id = None
+
+    def start(self):
+        target = self._run_win_events if sys.platform == "win32" else self._run_polling
+        self._thread = threading.Thread(target=target, name="window-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread_id is not None:
+            import ctypes
+            WM_QUIT = 0x0012
+            ctypes.windll.user32.PostThreadMessageW(self._thread_id, WM_QUIT, 0, 0)
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+    def _publish(self, title):
+        if title != self.last_title:
+            self.last_title = title
+            self.on_title(title)
+
+    def _run_polling(self):
+        try:
+            import pygetwindow as gw
+        except Exception as e:  # pygetwindow has no Linux support
+            print(f">> WINDOW WATCHER disabled: {e}")
+            return
+        errors = 0
+        while not self._stop.is_set():
+            try:
+                window = gw.getActiveWindow()
+                self._publish(window.title if window else "")
+            except Exception as e:
+                errors += 1
+                if errors == 1:
+                    print(f">> WINDOW WATCHER error (further errors muted): {e}")
+            self._stop.wait(self.interval)
+
+    def _run_win_events(self):
+        import ctypes
+        from ctypes import wintypes
+
+        user32 = ctypes.windll.user32
+        EVENT_SYSTEM_FOREGROUND = 0x0003
+        EVENT_OBJECT_NAMECHANGE = 0x800C
+        WINEVENT_OUTOFCONTEXT = 0x0000
+        WinEventProc = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+
+        def window_title(hwnd):
+            length = user32.GetWindowTextLengthW(hwnd)
+            buf = ctypes.create_unicode_buffer(length + 1)
+            user32.GetWindowTextW(hwnd, buf, length + 1)
+            return buf.value
+
+        def callback(hook, event, hwnd, id_object, id_child, thread, timestamp):
+            # Name changes fire for every control; only follow the foreground window
+            if event == EVENT_OBJECT_NAMECHANGE and hwnd != user32.GetForegroundWindow():
+                return
+            self._publish(window_title(hwnd))
+
+        proc = WinEventProc(callback)  # keep a reference for the hook's lifetime
+        hooks = [user32.SetWinEventHook(event, event, 0, proc, 0, 0, WINEVENT_OUTOFCONTEXT)
+                 for event in (EVENT_SYSTEM_FOREGROUND, EVENT_OBJECT_NAMECHANGE)]
+        self._thread_id = ctypes.windll.kernel32.GetCurrentThreadId()
+        self._publish(window_title(user32.GetForegroundWindow()))
+
+        msg = wintypes.MSG()
+        while not self._stop.is_set() and user32.GetMessageW(ctypes.byref(msg), 0, 0, 0) > 0:
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+        for hook in hooks:
+            user32.UnhookWinEvent(hook)
@@ -0,0 +1,92 @@
+"""Concurrent /download load benchmark: per-request zip (old) vs prebuilt bundle (new).
+
+Runs the app on a local uvicorn server and hammers both handlers with httpx:
+    python web_app/bench_download.py --concurrency 16 --requests 64
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import httpx
+import uvicorn
+from fastapi.responses import FileResponse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from web_app.server import app  # noqa: E402
+
+
+async def legacy_download():
+    """The original handler: zip local_client on the event loop for every request."""
+    shutil.make_archive("client_pack", 'zip', "local_client")
+    return FileResponse("client_pack.zip", media_type='application/zip', filename="HandsFreePlay_Client.zip")
+
+app.add_api_route("/download_legacy", legacy_download)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def hammer(url, total, concurrency):
+    latencies, sizes, errors = [], [], 0
+    sem = asyncio.Semaphore(concurrency)
+    async with httpx.AsyncClient(timeout=120) as client:
+        async def one():
+            nonlocal errors
+            async with sem:
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(url)
+                    r.raise_for_status()
+                    sizes.append(len(r.content))
+                except Exception:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(total)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, sizes, errors
+
+
+def report(name, elapsed, latencies, sizes, errors):
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    mb = sum(sizes) / 1e6
+    print(f">> {name:<8} | {len(sizes) / elapsed:7.1f} req/s | {mb / elapsed:7.2f} MB/s | "
+          f"p50={statistics.median(latencies) * 1000:.0f}ms p95={p95 * 1000:.0f}ms | errors={errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=64)
+    args = parser.parse_args()
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base = f"http://127.0.0.1:{port}"
+    for name, path in (("before", "/download_legacy"), ("after", "/download")):
+        report(name, *asyncio.run(hammer(base + path, args.requests, args.concurrency)))
+
+    server.should_exit = True
+    thread.join()
+    if os.path.exists("client_pack.zip"):
+        os.remove("client_pack.zip")
+
+
+if __name__ == "__main__":
+    main()
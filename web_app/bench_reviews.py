@@ -0,0 +1,181 @@
+"""GET / latency while POST /submit_review is hammered: the app before the ingest queue vs now.
+
+Both servers are real checkouts started the same way: the baseline is
+web_app + local_client from a git revision (default: the one before
+review_ingest.py was added, i.e. inline SQLite writes on the event loop),
+the other is the working tree. Each runs in its own uvicorn process on a
+fresh review DB in a temporary copy, and the load generator gets its own
+process so it doesn't share the GIL. A few readers loop on GET / while a
+flood of writers posts reviews from many simulated clients
+(X-Forwarded-For from loopback, a trusted proxy). Rounds alternate between
+the two servers and the medians are reported:
+    python web_app/bench_reviews.py --seconds 5 --writers 32 --clients 50 --rounds 3
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from collections import Counter
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TREES = ("web_app", "local_client")
+
+
+def serve(tree, port):
+    """Server process: the app of one checkout, run from inside it (its paths are relative)."""
+    os.chdir(tree)
+    sys.path.insert(0, tree)
+    import uvicorn
+    from web_app import server
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="critical")
+
+
+def default_baseline():
+    """The revision before the review ingest queue was added."""
+    added = subprocess.run(["git", "log", "--diff-filter=A", "--format=%H", "--", "web_app/review_ingest.py"],
+                           cwd=ROOT, capture_output=True, text=True, check=True).stdout.split()
+    if not added:
+        sys.exit(">> no commit adds web_app/review_ingest.py; pass --baseline")
+    return added[-1] + "^"
+
+
+def checkout(rev, dest):
+    """web_app + local_client at `rev` into dest (without touching the working tree)."""
+    data = subprocess.run(["git", "archive", "--format=tar", rev, *TREES], cwd=ROOT,
+                          capture_output=True, check=True).stdout
+    with tarfile.open(fileobj=io.BytesIO(data)) as tar:
+        tar.extractall(dest)
+    clean(dest)
+
+
+def copy_worktree(dest):
+    for name in TREES:
+        shutil.copytree(os.path.join(ROOT, name), os.path.join(dest, name),
+                        ignore=shutil.ignore_patterns("__pycache__", "build"))
+    clean(dest)
+
+
+def clean(tree):
+    """Start from an empty review DB: drop any committed or local DB and legacy JSON."""
+    for name in os.listdir(os.path.join(tree, "web_app")):
+        if name.startswith(("reviews.db", "reviews.json")):
+            os.remove(os.path.join(tree, "web_app", name))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start(tree):
+    port = free_port()
+    proc = multiprocessing.get_context("spawn").Process(target=serve, args=(tree, port), daemon=True)
+    proc.start()
+    base = f"http://127.0.0.1:{port}"
+    while True:
+        try:
+            httpx.get(base + "/about")
+            return proc, base
+        except httpx.TransportError:
+            if not proc.is_alive():
+                sys.exit(f">> server in {tree} exited with {proc.exitcode}")
+            time.sleep(0.1)
+
+
+def pct(values, q):
+    return values[min(len(values) - 1, int(len(values) * q))] * 1000 if values else float("nan")
+
+
+async def run_phase(base, seconds, readers, writers, clients):
+    """Returns (GET req/s, p50 ms, p99 ms, POST req/s, POST status counts)."""
+    get_latencies, statuses = [], Counter()
+    deadline = time.perf_counter() + seconds
+    addresses = itertools.cycle([f"10.0.{i // 256}.{i % 256}" for i in range(clients)])
+    limits = httpx.Limits(max_connections=readers + writers)
+    async with httpx.AsyncClient(base_url=base, timeout=30, limits=limits) as client:
+        async def reader():
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                r = await client.get("/")
+                if r.status_code == 200:
+                    get_latencies.append(time.perf_counter() - t0)
+
+        async def writer(n):
+            for i in itertools.count():
+                if time.perf_counter() >= deadline:
+                    break
+                r = await client.post("/submit_review", headers={"X-Forwarded-For": next(addresses)},
+                                      data={"gamertag": f"bench{n}", "rating": "5", "message": f"review {i}"})
+                statuses[r.status_code] += 1
+
+        start_time = time.perf_counter()
+        await asyncio.gather(*(reader() for _ in range(readers)), *(writer(n) for n in range(writers)))
+        elapsed = time.perf_counter() - start_time
+    get_latencies.sort()
+    return (len(get_latencies) / elapsed, pct(get_latencies, 0.50), pct(get_latencies, 0.99),
+            sum(statuses.values()) / elapsed, statuses)
+
+
+def report(name, get_rate, p50, p99, post_rate, statuses=None):
+    status_text = f" {dict(sorted(statuses.items()))}" if statuses else ""
+    print(f">> {name:<14} | GET / {get_rate:6.1f} req/s p50={p50:6.1f}ms p99={p99:6.1f}ms | "
+          f"POST {post_rate:6.1f} req/s{status_text}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--baseline", help="git revision to compare against "
+                                           "(default: the one before review_ingest.py was added)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of each phase")
+    parser.add_argument("--rounds", type=int, default=3, help="phases per server, alternating")
+    parser.add_argument("--readers", type=int, default=4, help="concurrent GET / loops")
+    parser.add_argument("--writers", type=int, default=32, help="concurrent POST loops")
+    parser.add_argument("--clients", type=int, default=50, help="distinct simulated client addresses")
+    args = parser.parse_args()
+    baseline = args.baseline or default_baseline()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trees = {"before": os.path.join(tmp, "before"), "after": os.path.join(tmp, "after")}
+        checkout(baseline, trees["before"])
+        copy_worktree(trees["after"])
+        servers = {name: start(tree) for name, tree in trees.items()}
+        rev = subprocess.run(["git", "rev-parse", "--short", baseline], cwd=ROOT, capture_output=True,
+                             text=True).stdout.strip()
+        print(f">> before = {baseline} ({rev}), after = working tree | {args.readers} GET / readers, "
+              f"{args.writers} POST writers from {args.clients} clients, {args.seconds:.0f}s x {args.rounds}")
+
+        results = {name: [] for name in servers}
+        for round_no in range(args.rounds):
+            for name, (_, base) in servers.items():
+                result = asyncio.run(run_phase(base, args.seconds, args.readers, args.writers, args.clients))
+                results[name].append(result)
+                report(f"{name} #{round_no + 1}", *result)
+                time.sleep(0.5)  # let the server drain before the other one runs
+        for name, runs in results.items():
+            report(f"{name} median", *(statistics.median(run[i] for run in runs) for i in range(4)))
+
+        stats = json.loads(httpx.get(servers["after"][1] + "/reviews/stats").text)
+        print(f">> INGEST | {stats['written']} written in {stats['batches']} batches "
+              f"({stats['written'] / max(stats['batches'], 1):.1f}/batch) | "
+              f"rate_limited={stats['rate_limited']} queue_full={stats['queue_full']}")
+        for proc, _ in servers.values():
+            proc.terminate()
+            proc.join()
+
+
+if __name__ == "__main__":
+    main()
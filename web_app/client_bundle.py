@@ -0,0 +1,76 @@
+import hashlib
+import os
+import threading
+import zipfile
+
+# Fixed timestamp inside the zip so identical sources give identical bytes
+ZIP_DATE = (2020, 1, 1, 0, 0, 0)
+SKIP_DIRS = {"__pycache__", ".pytest_cache"}
+SKIP_SUFFIXES = (".pyc", ".pyo", ".npz")
+
+
+class ClientBundle:
+    """Builds the local_client download once and rebuilds only when sources change.
+
+    Bundles are written as HandsFreePlay_Client-<sha256 prefix>.zip, so the
+    file name doubles as the ETag and an in-progress download keeps reading
+    its old file even if a rebuild happens meanwhile.
+    """
+
+    def __init__(self, source_dir="local_client", out_dir="web_app/build"):
+        self.source_dir = source_dir
+        self.out_dir = out_dir
+        self.path = None
+        self.digest = None
+        self._fingerprint = None
+        self._lock = threading.Lock()
+
+    def _files(self):
+        for root, dirs, files in os.walk(self.source_dir):
+            dirs[:] = sorted(d for d in dirs if d not in SKIP_DIRS)
+            for name in sorted(files):
+                if not name.endswith(SKIP_SUFFIXES):
+                    yield os.path.join(root, name)
+
+    def _stat_fingerprint(self):
+        """Cheap change check: (path, size, mtime) of every source file."""
+        return tuple((p, st.st_size, st.st_mtime_ns) for p in self._files() for st in [os.stat(p)])
+
+    def current(self):
+        """Path of an up-to-date bundle, building it if needed (blocking; run off the event loop)."""
+        fingerprint = self._stat_fingerprint()
+        if fingerprint == self._fingerprint and self.path and os.path.exists(self.path):
+            return self.path
+        with self._lock:
+            if fingerprint != self._fingerprint or not self.path or not os.path.exists(self.path):
+                self._build()
+                self._fingerprint = fingerprint
+        return self.path
+
+    def _build(self):
+        os.makedirs(self.out_dir, exist_ok=True)
+        sha = hashlib.sha256()
+        tmp = os.path.join(self.out_dir, f".building-{os.getpid()}-{threading.get_ident()}.zip")
+        with zipfile.ZipFile(tmp, "w", zipfile.ZIP_DEFLATED) as zf:
+            for path in self._files():
+                arcname = os.path.relpath(path, self.source_dir).replace(os.sep, "/")
+                with open(path, "rb") as f:
+                    data = f.read()
+                sha.update(arcname.encode() + b"\0" + data)
+                info = zipfile.ZipInfo(arcname, ZIP_DATE)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = 0o644 << 16
+                zf.writestr(info, data)
+
+        digest = sha.hexdigest()[:16]
+        final = os.path.join(self.out_dir, f"HandsFreePlay_Client-{digest}.zip")
+        os.replace(tmp, final)  # atomic; concurrent builders of the same content agree
+        for name in os.listdir(self.out_dir):
+            old = os.path.join(self.out_dir, name)
+            if name.startswith("HandsFreePlay_Client-") and old != final:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass  # still being served on Windows; cleaned up next build
+        self.path, self.digest = final, digest
+        print(f">> Client bundle built: {final}")
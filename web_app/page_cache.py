@@ -0,0 +1,52 @@
+import hashlib
+import time
+from email.utils import formatdate
+
+from fastapi.responses import HTMLResponse, Response
+
+
+class CachedPage:
+    """A fully rendered HTML page with its validators."""
+
+    def __init__(self, html):
+        self.body = html.encode("utf-8")
+        self.etag = '"' + hashlib.sha1(self.body).hexdigest()[:20] + '"'
+        self.last_modified = formatdate(time.time(), usegmt=True)
+
+    def headers(self):
+        # no-cache = browsers may store it but must revalidate (cheap 304s)
+        return {"ETag": self.etag, "Last-Modified": self.last_modified, "Cache-Control": "no-cache"}
+
+    def response(self, request):
+        """200 with the body, or 304 if the browser's copy is still current."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            fresh = self.etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+        else:
+            fresh = request.headers.get("if-modified-since") == self.last_modified
+        if fresh:
+            return Response(status_code=304, headers=self.headers())
+        return HTMLResponse(self.body, headers=self.headers())
+
+
+class PageCache:
+    """Renders Jinja templates once and keeps the result until invalidated."""
+
+    def __init__(self, env):
+        self.env = env
+        self._pages = {}
+
+    def get(self, key, template, context=None, version=None):
+        """Cached page for key; re-rendered when `version` differs from the cached one."""
+        entry = self._pages.get(key)
+        if entry is None or entry[0] != version:
+            html = self.env.get_template(template).render(**(context() if callable(context) else context or {}))
+            entry = (version, CachedPage(html))
+            self._pages[key] = entry
+        return entry[1]
+
+    def invalidate(self, key=None):
+        if key is None:
+            self._pages.clear()
+        else:
+            self._pages.pop(key, None)
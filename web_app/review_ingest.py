@@ -0,0 +1,136 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from starlette.concurrency import run_in_threadpool
+
+ACCEPTED = "accepted"
+RATE_LIMITED = "rate_limited"
+QUEUE_FULL = "queue_full"
+
+
+class TokenBucket:
+    """Per-client token buckets: `burst` requests at once, refilled at `rate` per second.
+
+    At most `max_clients` buckets are kept; the least recently seen client is
+    forgotten first (and simply starts again with a full bucket).
+    """
+
+    def __init__(self, rate=0.5, burst=5, max_clients=10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()  # client -> (tokens, updated_at)
+        self.limited = 0
+
+    def allow(self, client, now=None):
+        now = time.monotonic() if now is None else now
+        tokens, updated = self._buckets.pop(client, (self.burst, now))
+        tokens = min(self.burst, tokens + (now - updated) * self.rate)
+        allowed = tokens >= 1.0
+        if allowed:
+            tokens -= 1.0
+        else:
+            self.limited += 1
+        self._buckets[client] = (tokens, now)
+        while len(self._buckets) > self.max_clients:
+            self._buckets.popitem(last=False)
+        return allowed
+
+    def retry_after(self, client):
+        """Seconds until `client` has a token again."""
+        tokens, _ = self._buckets.get(client, (self.burst, 0.0))
+        return max(1, int((1.0 - tokens) / self.rate + 0.999))
+
+
+class ReviewIngest:
+    """Accepts reviews into a bounded queue; a background task writes them in batches.
+
+    submit() never touches the database, so the POST handler returns without
+    blocking the event loop. The writer drains whatever is queued (up to
+    batch_size, waiting `linger` seconds for stragglers) and commits it as
+    one ReviewStore.add_many transaction on the threadpool, so under load
+    many reviews share one write and one page-cache invalidation.
+    """
+
+    def __init__(self, store, max_queue=1000, batch_size=200, linger=0.05, limiter=None, on_flush=None):
+        self.store = store
+        self.queue = asyncio.Queue(maxsize=max_queue)
+        self.batch_size = batch_size
+        self.linger = linger
+        self.limiter = limiter if limiter is not None else TokenBucket()
+        self.on_flush = on_flush  # called on the event loop after each committed batch
+        self.accepted = 0
+        self.rejected_full = 0
+        self.batches = 0
+        self.written = 0
+        self.errors = 0
+        self._task = None
+        self._batch = None  # dequeued by the writer, not yet handed to a flush
+        self._flushing = None
+
+    def submit(self, review, client):
+        """Queue a review from `client`; returns ACCEPTED, RATE_LIMITED or QUEUE_FULL."""
+        if not self.limiter.allow(client):
+            return RATE_LIMITED
+        try:
+            self.queue.put_nowait(review)
+        except asyncio.QueueFull:
+            self.rejected_full += 1
+            return QUEUE_FULL
+        self.accepted += 1
+        return ACCEPTED
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer after flushing everything already accepted."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._flushing is not None:
+            await self._flushing  # a write already under way completes once, not twice
+            self._flushing = None
+        batch, self._batch = self._batch or [], None  # cancelled while lingering
+        while not self.queue.empty():
+            batch.append(self.queue.get_nowait())
+        if batch:
+            await self._flush(batch)
+
+    async def _run(self):
+        while True:
+            self._batch = batch = [await self.queue.get()]
+            if self.linger:
+                await asyncio.sleep(self.linger)
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            # Shielded: a cancel from stop() must not abandon a batch mid-write
+            self._flushing = asyncio.ensure_future(self._flush(batch))
+            self._batch = None
+            await asyncio.shield(self._flushing)
+            self._flushing = None
+
+    async def _flush(self, batch):
+        try:
+            await run_in_threadpool(self.store.add_many, batch)
+        except Exception as e:
+            # Dropped rather than retried forever: a broken DB must not wedge the queue
+            self.errors += len(batch)
+            print(f">> REVIEW WRITE failed for {len(batch)} reviews: {e}")
+            return
+        self.batches += 1
+        self.written += len(batch)
+        if self.on_flush is not None:
+            self.on_flush()
+
+    def stats(self):
+        return {"queued": self.queue.qsize(), "accepted": self.accepted, "written": self.written,
+                "batches": self.batches, "rate_limited": self.limiter.limited,
+                "queue_full": self.rejected_full, "write_errors": self.errors}
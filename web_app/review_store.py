@@ -0,0 +1,116 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+INSERT_SQL = "INSERT INTO reviews (gamertag, rating, message, timestamp, created_at) VALUES (?, ?, ?, ?, ?)"
+
+
+class ReviewStore:
+    """Append-only review storage on SQLite in WAL mode.
+
+    Writes are single INSERTs (no read-modify-write of the whole file), reads
+    for "latest N" / pages walk the created_at index, and WAL + busy_timeout
+    let several uvicorn workers write to the same file safely.
+    """
+
+    def __init__(self, path="web_app/reviews.db", legacy_json="web_app/reviews.json"):
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as db:
+            db.execute("""
+                CREATE TABLE IF NOT EXISTS reviews (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    gamertag TEXT NOT NULL,
+                    rating TEXT NOT NULL,
+                    message TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )""")
+            db.execute("CREATE INDEX IF NOT EXISTS idx_reviews_created ON reviews (created_at DESC, id DESC)")
+        if legacy_json and os.path.exists(legacy_json):
+            self._import_legacy(legacy_json)
+
+    def _connect(self):
+        # One connection per thread; sqlite3 connections can't be shared across threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5.0)
+            db.row_factory = sqlite3.Row
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("PRAGMA busy_timeout=5000")
+            self._local.db = db
+        return db
+
+    def _import_legacy(self, path):
+        """One-time import of the old newest-first reviews.json.
+
+        Several workers may start at once: the emptiness check and the insert
+        share one write transaction, so exactly one of them imports.
+        """
+        try:
+            with open(path, "r") as f:
+                reviews = json.load(f)
+        except FileNotFoundError:
+            return  # another worker imported and moved it
+        except Exception as e:
+            print(f"Could not import {path}: {e}")
+            return
+        db = self._connect()
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            if db.execute("SELECT COUNT(*) FROM reviews").fetchone()[0]:
+                return
+            db.executemany(INSERT_SQL, [self._row(r) for r in reversed(reviews)])
+        try:
+            os.replace(path, path + ".imported")
+        except FileNotFoundError:
+            pass
+        print(f">> Imported {len(reviews)} reviews from {path}")
+
+    @staticmethod
+    def _row(review):
+        try:
+            created = datetime.strptime(review["timestamp"], "%Y-%m-%d %H:%M").timestamp()
+        except (KeyError, ValueError):
+            created = time.time()
+        return (review["gamertag"], review["rating"], review["message"],
+                review.get("timestamp", ""), review.get("created_at", created))
+
+    def add(self, review):
+        self.add_many([review])
+
+    def add_many(self, reviews):
+        """Append reviews (oldest first) in one transaction."""
+        rows = [self._row(r) for r in reviews]
+        if not rows:
+            return
+        db = self._connect()
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            db.executemany(INSERT_SQL, rows)
+
+    def latest(self, limit=3):
+        return self.page(1, limit)
+
+    def page(self, page=1, per_page=20):
+        """Newest-first page of reviews (1-based)."""
+        rows = self._connect().execute(
+            "SELECT gamertag, rating, message, timestamp FROM reviews "
+            "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (per_page, (max(page, 1) - 1) * per_page)).fetchall()
+        return [dict(row) for row in rows]
+
+    def version(self):
+        """Changes whenever another connection (e.g. another worker) commits.
+
+        Writes made through this thread's own connection don't bump it, so
+        callers must also invalidate on their own writes.
+        """
+        return self._connect().execute("PRAGMA data_version").fetchone()[0]
+
+    def count(self):
+        return self._connect().execute("SELECT COUNT(*) FROM reviews").fetchone()[0]
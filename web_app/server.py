@@ -1,13 +1,28 @@
-from fastapi import FastAPI, Request, Form
+from fastapi import FastAPI, Request, Form, WebSocket, WebSocketDisconnect
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, FileResponse, RedirectResponse, Response
+from starlette.concurrency import run_in_threadpool
 import uvicorn
-import shutil
+import asyncio
+import ipaddress
 import os
-import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+try:
+    from web_app.client_bundle import ClientBundle
+    from web_app.page_cache import PageCache
+    from web_app.review_ingest import ACCEPTED, RATE_LIMITED, ReviewIngest, TokenBucket
+    from web_app.review_store import ReviewStore
+    from web_app.telemetry_hub import TelemetryHub
+except ImportError:  # started as `python web_app/server.py`
+    from client_bundle import ClientBundle
+    from page_cache import PageCache
+    from review_ingest import ACCEPTED, RATE_LIMITED, ReviewIngest, TokenBucket
+    from review_store import ReviewStore
+    from telemetry_hub import TelemetryHub
+
 app = FastAPI()
 
 # Mount static files
@@ -17,7 +32,67 @@ app.mount("/static", StaticFiles(directory="web_app/static"), name="static")
 templates = Jinja2Templates(directory="web_app/templates")
 
 # Data Storage
-REVIEWS_FILE = "web_app/reviews.json"
+REVIEWS_DB = "web_app/reviews.db"
+REVIEWS_FILE = "web_app/reviews.json"  # legacy store, imported into the DB once
+reviews = ReviewStore(REVIEWS_DB, legacy_json=REVIEWS_FILE)
+
+# Rendered pages, kept until their inputs change
+pages = PageCache(templates.env)
+latest_reviews = {"version": None, "reviews": None, "generation": 0}
+# Landing-page review reads run on one thread off the event loop: PRAGMA
+# data_version is per connection, so versions only compare on one connection
+review_reader = ThreadPoolExecutor(max_workers=1, thread_name_prefix="review-reader")
+
+# Prebuilt local_client zip, rebuilt only when the sources change
+client_bundle = ClientBundle("local_client", "web_app/build")
+
+# Live client telemetry, fanned out to dashboard viewers
+telemetry = TelemetryHub()
+
+# Review submissions: rate limited per client, queued, written in batches
+MAX_FIELD_CHARS = {"gamertag": 64, "rating": 8, "message": 2000}
+
+@app.on_event("startup")
+async def build_client_bundle():
+    await run_in_threadpool(client_bundle.current)
+
+@app.on_event("startup")
+async def start_review_writer():
+    review_ingest.start()
+
+@app.on_event("shutdown")
+async def flush_reviews():
+    await review_ingest.stop()
+
+def _networks(text):
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in text.split(",") if part.strip()]
+
+# Proxies whose X-Forwarded-For is believed (comma-separated addresses / CIDRs)
+TRUSTED_PROXIES = _networks(os.environ.get("TRUSTED_PROXIES", "127.0.0.1,::1"))
+
+def is_trusted_proxy(address):
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in net for net in TRUSTED_PROXIES)
+
+def client_key(request: Request):
+    """Rate-limit key: the client address, as seen by the nearest untrusted hop.
+
+    X-Forwarded-For is only read when the peer is a trusted proxy, walking
+    it from the right past further trusted proxies; anything to the left of
+    that came from the client and can be forged. A peer that is not a
+    trusted proxy is keyed by its own address, whatever headers it sends.
+    """
+    peer = request.client.host if request.client else "unknown"
+    if not is_trusted_proxy(peer):
+        return peer
+    hops = [hop.strip() for hop in request.headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+    for hop in reversed(hops):
+        if not is_trusted_proxy(hop):
+            return hop
+    return hops[0] if hops else peer
 
 # Team Data from teams.txt
 TEAM_MEMBERS = [
@@ -58,38 +133,43 @@ TEAM_MEMBERS = [
     }
 ]
 
-def load_reviews():
-    if os.path.exists(REVIEWS_FILE):
-        try:
-            with open(REVIEWS_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
-
-def save_review(review):
-    reviews = load_reviews()
-    reviews.insert(0, review) # Prepend new review
-    with open(REVIEWS_FILE, "w") as f:
-        json.dump(reviews, f, indent=4)
+def get_latest_reviews():
+    """Top 3 reviews for the landing page and their generation, refreshed only when the store changed.
+
+    Blocking SQLite calls: run it on review_reader, not on the event loop.
+    """
+    version = reviews.version()
+    if latest_reviews["reviews"] is None or latest_reviews["version"] != version:
+        latest_reviews["reviews"] = reviews.latest(3)
+        latest_reviews["version"] = version
+        latest_reviews["generation"] += 1
+    return latest_reviews["reviews"], latest_reviews["generation"]
+
+def invalidate_reviews():
+    latest_reviews["reviews"] = None
+    pages.invalidate("index")
+
+review_ingest = ReviewIngest(reviews, max_queue=1000, limiter=TokenBucket(rate=0.2, burst=5),
+                             on_flush=invalidate_reviews)
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
-    reviews = load_reviews()
-    # Limit to top 3 for the landing page
-    recent_reviews = reviews[:3]
-    return templates.TemplateResponse("index.html", {"request": request, "reviews": recent_reviews})
+    loop = asyncio.get_running_loop()
+    recent_reviews, generation = await loop.run_in_executor(review_reader, get_latest_reviews)
+    page = pages.get("index", "index.html", {"reviews": recent_reviews}, version=generation)
+    return page.response(request)
 
 @app.get("/dashboard", response_class=HTMLResponse)
 async def dashboard(request: Request):
-    return templates.TemplateResponse("dashboard.html", {"request": request})
+    return pages.get("dashboard", "dashboard.html").response(request)
 
 @app.get("/about", response_class=HTMLResponse)
 async def about(request: Request):
-    return templates.TemplateResponse("about.html", {"request": request, "team": TEAM_MEMBERS})
+    return pages.get("about", "about.html", {"team": TEAM_MEMBERS}).response(request)
 
 @app.post("/submit_review")
 async def submit_review(
+    request: Request,
     gamertag: str = Form(...), 
     rating: str = Form(...), 
     message: str = Form(...)
@@ -100,14 +180,59 @@ async def submit_review(
         "message": message,
         "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M")
     }
-    save_review(review)
+    if any(len(review[k]) > limit for k, limit in MAX_FIELD_CHARS.items()):
+        return Response("Review too long", status_code=413)
+    # Queued only: the background writer commits it (off the event loop) within ~50ms
+    key = client_key(request)
+    status = review_ingest.submit(review, key)
+    if status == RATE_LIMITED:
+        return Response("Too many reviews, slow down", status_code=429,
+                        headers={"Retry-After": str(review_ingest.limiter.retry_after(key))})
+    if status != ACCEPTED:
+        return Response("Busy, try again shortly", status_code=503, headers={"Retry-After": "5"})
     return RedirectResponse(url="/?success=true", status_code=303)
 
+@app.get("/reviews")
+async def list_reviews(page: int = 1, per_page: int = 20):
+    per_page = max(1, min(per_page, 100))
+    # SQLite reads block, so they run on the threadpool like /download's stat check
+    total = await run_in_threadpool(reviews.count)
+    return {"page": page, "per_page": per_page, "total": total,
+            "reviews": await run_in_threadpool(reviews.page, page, per_page)}
+
 @app.get("/download")
-async def download_client():
-    # Create a zip of the local_client directory
-    shutil.make_archive("client_pack", 'zip', "local_client")
-    return FileResponse("client_pack.zip", media_type='application/zip', filename="HandsFreePlay_Client.zip")
+async def download_client(request: Request):
+    # Stat check (and rebuild if local_client changed) happens off the event loop
+    path = await run_in_threadpool(client_bundle.current)
+    etag = f'"{client_bundle.digest}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    # FileResponse streams in chunks and handles Range / Content-Length
+    return FileResponse(path, media_type='application/zip', filename="HandsFreePlay_Client.zip",
+                        headers={"ETag": etag, "Cache-Control": "no-cache"})
+
+@app.websocket("/ws/telemetry")
+async def telemetry_ingest(websocket: WebSocket):
+    """Local clients push one JSON snapshot per interval (see local_client/telemetry.py)."""
+    await websocket.accept()
+    try:
+        while True:
+            telemetry.publish(await websocket.receive_text())
+    except WebSocketDisconnect:
+        pass
+
+@app.websocket("/ws/dashboard")
+async def telemetry_feed(websocket: WebSocket):
+    await websocket.accept()
+    await telemetry.serve_viewer(websocket)
+
+@app.get("/telemetry/stats")
+async def telemetry_stats():
+    return telemetry.stats()
+
+@app.get("/reviews/stats")
+async def review_stats():
+    return review_ingest.stats()
 
 if __name__ == "__main__":
     uvicorn.run("web_app.server:app", host="0.0.0.0", port=8000, reload=True)
@@ -0,0 +1,129 @@
+"""Local telemetry soak: simulated clients -> /ws/telemetry -> dashboard viewers.
+
+Runs the app on a local uvicorn server, starts N real TelemetryEmitters
+(local_client/telemetry.py) fed with synthetic frame/latency/key data, and
+attaches dashboard viewers, one of them deliberately slow, to show that
+per-viewer buffers stay bounded:
+    python web_app/sim_telemetry.py --clients 8 --interval 0.1 --seconds 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import threading
+import time
+
+import uvicorn
+import websockets
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "local_client"))
+from web_app.server import app, telemetry  # noqa: E402
+from pipeline import StageStats  # noqa: E402
+from telemetry import TelemetryEmitter  # noqa: E402
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def simulate_client(emitter, stats, stop, fps=60):
+    """Pretend to be a client frame loop: latency samples, frames and key flips."""
+    keys = ("w", "a", "s", "d")
+    held = set()
+    while not stop.is_set():
+        stats.add("capture", random.uniform(0.001, 0.004))
+        stats.add("inference", random.lognormvariate(-4.2, 0.3))
+        stats.add("actuation", random.uniform(0.0001, 0.0005))
+        if random.random() < 0.05:
+            key = random.choice(keys)
+            down = key not in held
+            held.symmetric_difference_update({key})
+            emitter.key_changes([("key", key, down)])
+        emitter.frame()
+        time.sleep(1.0 / fps)
+
+
+async def view(url, seconds, delay, results):
+    """One dashboard viewer; `delay` per message simulates a slow browser."""
+    latencies, count = [], 0
+    async with websockets.connect(url, close_timeout=0.5) as ws:
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            try:
+                text = await asyncio.wait_for(ws.recv(), timeout=deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                break
+            latencies.append(time.time() - json.loads(text)["t"])
+            count += 1
+            if delay:
+                await asyncio.sleep(delay)
+            await ws.send("ack")
+    results.append((delay, count, latencies))
+
+
+async def run_viewers(url, seconds, viewers, slow_delay):
+    results = []
+    delays = [0.0] * (viewers - 1) + [slow_delay]
+    await asyncio.gather(*(view(url, seconds, d, results) for d in delays))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=8)
+    parser.add_argument("--viewers", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=0.1, help="client snapshot interval (s)")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--slow-delay", type=float, default=0.05,
+                        help="per-message delay of the slow viewer (s)")
+    args = parser.parse_args()
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="critical"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    stop = threading.Event()
+    emitters = []
+    for i in range(args.clients):
+        stats = StageStats()
+        emitter = TelemetryEmitter(f"ws://127.0.0.1:{port}/ws/telemetry", stats,
+                                   state=lambda: {"profile": random.choice(("mouse", "fps", "racing"))},
+                                   interval=args.interval, client_id=f"sim-{i}").start()
+        threading.Thread(target=simulate_client, args=(emitter, stats, stop), daemon=True).start()
+        emitters.append(emitter)
+
+    results = asyncio.run(run_viewers(f"ws://127.0.0.1:{port}/ws/dashboard", args.seconds,
+                                      args.viewers, args.slow_delay))
+    hub = telemetry.stats()
+    stop.set()
+    for emitter in emitters:
+        emitter.stop()
+
+    expected = args.clients * args.seconds / args.interval
+    print(f">> CLIENTS  | {args.clients} x {1 / args.interval:.0f} msg/s | sent={sum(e.sent for e in emitters)} "
+          f"(~{expected:.0f} expected) | hub received={hub['received']} rejected={hub['rejected']}")
+    for delay, count, latencies in sorted(results):
+        latencies.sort()
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0
+        kind = "slow" if delay else "fast"
+        print(f">> VIEWER   | {kind} | {count / args.seconds:6.1f} msg/s | "
+              f"p50={statistics.median(latencies or [0]) * 1000:.1f}ms p95={p95 * 1000:.1f}ms")
+    print(f">> HUB      | buffer={telemetry.buffer_size} window={telemetry.window} per viewer | dropped for slow viewers={hub['dropped']}")
+
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
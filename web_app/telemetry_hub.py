@@ -0,0 +1,108 @@
+import asyncio
+import json
+import time
+
+
+class Viewer:
+    """One dashboard connection with a bounded outgoing buffer.
+
+    Viewers ack every message they have rendered and at most `window`
+    messages are in flight, so a slow viewer's backlog builds up here (where
+    it is bounded) rather than in socket buffers.
+    """
+
+    def __init__(self, websocket, buffer_size, window):
+        self.websocket = websocket
+        self.queue = asyncio.Queue(maxsize=buffer_size)
+        self.window = window
+        self.in_flight = 0
+        self.dropped = 0
+        self._credit = asyncio.Event()
+
+    def offer(self, message):
+        # A viewer that can't keep up loses its oldest snapshots; it never
+        # stalls the publisher or the other viewers
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    def ack(self):
+        if self.in_flight > 0:
+            self.in_flight -= 1
+            self._credit.set()
+
+    async def pump(self):
+        while True:
+            message = await self.queue.get()
+            while self.in_flight >= self.window:
+                self._credit.clear()
+                await self._credit.wait()
+            self.in_flight += 1
+            await self.websocket.send_text(message)
+
+
+class TelemetryHub:
+    """Fans client telemetry snapshots out to dashboard viewers.
+
+    Messages are forwarded as the raw JSON text the client sent, so each one
+    is parsed once (to validate it and read the client id) and never
+    re-serialized. The last snapshot per client is kept so a new viewer sees
+    every live client straight away.
+    """
+
+    def __init__(self, buffer_size=16, window=4, max_message_bytes=65536, client_ttl=10.0):
+        self.buffer_size = buffer_size
+        self.window = window
+        self.max_message_bytes = max_message_bytes
+        self.client_ttl = client_ttl
+        self.viewers = set()
+        self.latest = {}  # client id -> (received_at, message)
+        self.received = 0
+        self.rejected = 0
+        self.dropped = 0  # snapshots dropped for viewers that have since left
+
+    def publish(self, text):
+        """Validate one client message and queue it for every viewer; returns the client id."""
+        if len(text) > self.max_message_bytes:
+            self.rejected += 1
+            return None
+        try:
+            client_id = str(json.loads(text)["id"])
+        except (ValueError, KeyError, TypeError):
+            self.rejected += 1
+            return None
+        self.received += 1
+        self.latest[client_id] = (time.monotonic(), text)
+        for viewer in self.viewers:
+            viewer.offer(text)
+        return client_id
+
+    def live_snapshots(self):
+        cutoff = time.monotonic() - self.client_ttl
+        for client_id, (received_at, text) in list(self.latest.items()):
+            if received_at < cutoff:
+                del self.latest[client_id]
+        return [text for _, text in self.latest.values()]
+
+    async def serve_viewer(self, websocket):
+        """Stream snapshots to one dashboard until it disconnects."""
+        viewer = Viewer(websocket, self.buffer_size, self.window)
+        for text in self.live_snapshots():
+            viewer.offer(text)
+        self.viewers.add(viewer)
+        pump = asyncio.ensure_future(viewer.pump())
+        try:
+            # The only thing viewers send is an ack per rendered message
+            while (await websocket.receive())["type"] != "websocket.disconnect":
+                viewer.ack()
+        finally:
+            self.viewers.discard(viewer)
+            self.dropped += viewer.dropped
+            pump.cancel()
+        return viewer
+
+    def stats(self):
+        return {"clients": len(self.live_snapshots()), "viewers": len(self.viewers),
+                "received": self.received, "rejected": self.rejected,
+                "dropped": self.dropped + sum(v.dropped for v in self.viewers)}